@@ -0,0 +1,14 @@
+# benchmarks/__init__.py
+"""
+Planner benchmark suite.
+
+- `benchmarks.generators`: seeded synthetic maps (random obstacles, maze,
+  rooms and corridors, open warehouse).
+- `benchmarks.run`: times a_star, compute_obstacle_distance, inflate and
+  load_ros_yaml_map on those maps, writes JSON and compares it against a
+  stored baseline (`benchmarks/baseline.json`).
+
+Run from the repository root:
+
+    python -m benchmarks.run --preset quick --out bench.json
+"""
@@ -0,0 +1,146 @@
+# benchmarks/generators.py
+"""
+Seeded synthetic occupancy grids (uint8, 1 = occupied) for benchmarking.
+
+Every generator takes (height, width, seed) plus a few shape knobs and is
+deterministic for a given seed. Free space is connected for maze, rooms and
+warehouse; random obstacles make no such promise.
+"""
+
+from __future__ import annotations
+import itertools
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from planner.grid_map import GridMap
+
+Cell = Tuple[int, int]
+Generator = Callable[..., np.ndarray]
+
+
+def random_obstacles(height: int, width: int, seed: int = 0, density: float = 0.2) -> np.ndarray:
+    """Independent obstacles with probability `density` per cell."""
+    rng = np.random.default_rng(seed)
+    return (rng.random((height, width)) < density).astype(np.uint8)
+
+
+def maze(height: int, width: int, seed: int = 0, corridor: int = 4) -> np.ndarray:
+    """
+    Perfect maze (randomized depth-first search) with corridors and walls
+    `corridor` cells thick. Cells outside the last full maze cell stay walls.
+    """
+    rng = np.random.default_rng(seed)
+    pitch = 2 * corridor
+    rows, cols = max(1, height // pitch), max(1, width // pitch)
+    grid = np.ones((height, width), dtype=np.uint8)
+
+    def carve(r0: int, c0: int, r1: int, c1: int) -> None:
+        grid[r0 * pitch + corridor // 2:r1 * pitch + corridor // 2 + corridor,
+             c0 * pitch + corridor // 2:c1 * pitch + corridor // 2 + corridor] = 0
+
+    visited = np.zeros((rows, cols), dtype=bool)
+    visited[0, 0] = True
+    carve(0, 0, 0, 0)
+    stack = [(0, 0)]
+    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    orders = [[moves[k] for k in perm] for perm in itertools.permutations(range(4))]
+    # every cell is on top of the stack at most 5 times (4 pushes + 1 pop)
+    draws = iter(rng.integers(len(orders), size=5 * rows * cols).tolist())
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc) for dr, dc in orders[next(draws)]
+                   if 0 <= r + dr < rows and 0 <= c + dc < cols and not visited[r + dr, c + dc]]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc = options[0]
+        visited[nr, nc] = True
+        carve(min(r, nr), min(c, nc), max(r, nr), max(c, nc))
+        stack.append((nr, nc))
+    return grid
+
+
+def rooms(height: int, width: int, seed: int = 0, room: int = 40, door: int = 4,
+          clutter: float = 0.02) -> np.ndarray:
+    """
+    Square rooms of side `room` separated by one-cell walls, with a door of
+    width `door` at a random place in every wall segment, plus sparse clutter
+    kept away from doorways.
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.zeros((height, width), dtype=np.uint8)
+    grid[rng.random((height, width)) < clutter] = 1
+
+    walls_r = np.arange(room, height, room + 1)
+    walls_c = np.arange(room, width, room + 1)
+    grid[walls_r, :] = 1
+    grid[:, walls_c] = 1
+    edges_r = np.concatenate(([0], walls_r + 1))
+    edges_c = np.concatenate(([0], walls_c + 1))
+    for r in walls_r:
+        for c0 in edges_c:
+            c1 = min(c0 + room, width)
+            d = int(rng.integers(c0, max(c0 + 1, c1 - door)))
+            grid[max(r - door, 0):r + door + 1, d:d + door] = 0
+    for c in walls_c:
+        for r0 in edges_r:
+            r1 = min(r0 + room, height)
+            d = int(rng.integers(r0, max(r0 + 1, r1 - door)))
+            grid[d:d + door, max(c - door, 0):c + door + 1] = 0
+    return grid
+
+
+def warehouse(height: int, width: int, seed: int = 0, rack: int = 2, aisle: int = 4,
+              block: int = 30) -> np.ndarray:
+    """
+    Open floor with rows of racks (`rack` cells deep, `aisle` apart), broken
+    into blocks of `block` cells by cross aisles, and a clear perimeter lane.
+    A few racks are left out at random.
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.zeros((height, width), dtype=np.uint8)
+    margin = 2 * aisle
+    pitch = rack + aisle
+    for r in range(margin, height - margin - rack, pitch):
+        for c in range(margin, width - margin, block + aisle):
+            if rng.random() < 0.9:
+                grid[r:r + rack, c:min(c + block, width - margin)] = 1
+    return grid
+
+
+GENERATORS: Dict[str, Generator] = {
+    "random": random_obstacles,
+    "maze": maze,
+    "rooms": rooms,
+    "warehouse": warehouse,
+}
+
+
+def make_map(kind: str, size: int, seed: int = 0, resolution: float = 0.05) -> GridMap:
+    """Square GridMap of side `size` from the named generator."""
+    if kind not in GENERATORS:
+        raise ValueError(f"unknown map kind: {kind!r}")
+    gm = GridMap(size, size, resolution=resolution)
+    gm.grid = GENERATORS[kind](size, size, seed=seed)
+    return gm
+
+
+def query_pairs(gm: GridMap, n: int, seed: int = 0, min_separation: float = 0.5) -> List[Tuple[Cell, Cell]]:
+    """
+    `n` seeded (start, goal) pairs of free cells, at least min_separation x
+    the map diagonal apart when such pairs can be drawn.
+    """
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(gm.grid == 0)
+    if len(free) < 2:
+        return []
+    need = min_separation * float(np.hypot(gm.height, gm.width))
+    pairs: List[Tuple[Cell, Cell]] = []
+    for _ in range(100 * n):
+        if len(pairs) == n:
+            break
+        a, b = free[rng.integers(len(free), size=2)]
+        if np.hypot(*(a - b)) >= need:
+            pairs.append(((int(a[0]), int(a[1])), (int(b[0]), int(b[1]))))
+    return pairs
@@ -0,0 +1,309 @@
+# benchmarks/run.py
+"""
+Benchmark runner.
+
+For each map kind and size it times:
+  - a_star:                    start/goal queries (latency, expansions/sec)
+  - compute_obstacle_distance: 8-connected grid metric
+  - inflate:                   radius-3 disc into a layer
+  - load_ros_yaml_map:         the map written as PGM + YAML
+
+Latencies are wall-clock over repeated runs (p50/p90/p99/mean): at least
+`repeats` runs per timed operation (each a_star query counts as one), and
+more until the operation has run for `min_seconds`, so sub-millisecond
+benchmarks get enough samples for their percentiles to mean something
+before they are gated. Peak memory is measured in a separate tracemalloc
+pass so tracing does not skew timings.
+
+Results go to JSON, each with the time of a fixed calibration workload run
+right before and after it (best of those runs). Comparisons against a
+baseline divide every p50 by its calibration time, so a machine that is
+slower or busier (another CPU, frequency scaling, a loaded CI runner) does
+not read as a regression. Benchmarks whose normalized p50 grew by more
+than the tolerance (and by at least --min-delta seconds) are run again
+(--retries) and reported as regressions (exit status 1) only if no run
+comes within it.
+
+    python -m benchmarks.run --preset quick --out bench.json
+    python -m benchmarks.run --preset full --sizes 100 1000 4000
+    python -m benchmarks.run --preset quick --save-baseline
+"""
+
+from __future__ import annotations
+import argparse
+import heapq
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+from planner.a_star import a_star
+from planner.costs import compute_obstacle_distance
+from planner.grid_map import GridMap
+from planner.heuristics import octile
+from planner.instrumentation import SearchStats
+from planner.io.map_loader import load_ros_yaml_map
+
+from .generators import GENERATORS, make_map, query_pairs
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+PRESETS: Dict[str, Dict] = {
+    "quick": {"sizes": [100, 500], "queries": 5, "repeats": 5, "min_seconds": 0.05},
+    "full": {"sizes": [100, 500, 1000, 2000, 4000], "queries": 5, "repeats": 5, "min_seconds": 0.2},
+}
+
+
+def cost8(u, v):
+    return math.sqrt(2.0) if u[0] != v[0] and u[1] != v[1] else 1.0
+
+
+def _summary(samples: Sequence[float]) -> Dict[str, float]:
+    arr = np.asarray(samples, dtype=np.float64)
+    p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99),
+            "mean": float(arr.mean()), "n": int(arr.size)}
+
+
+def _timed(fn: Callable[[], object], repeats: int, min_seconds: float = 0.0,
+           max_samples: int = 1000) -> List[float]:
+    """At least `repeats` timings of fn, more until they add up to min_seconds."""
+    samples: List[float] = []
+    total = 0.0
+    while len(samples) < repeats or (total < min_seconds and len(samples) < max_samples):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+        total += samples[-1]
+    return samples
+
+
+def calibrate(repeats: int = 3) -> float:
+    """
+    Seconds for a fixed reference workload, best of `repeats`: heap and dict
+    traffic like a search's, plus a NumPy sort, so it tracks both the
+    interpreter and the array code the benchmarks exercise.
+    """
+    data = np.random.default_rng(0).random(1 << 16)
+
+    def work() -> None:
+        heap: List = []
+        seen: Dict = {}
+        for k in range(20000):
+            heapq.heappush(heap, (k * 7919 % 10007, k))
+            seen[(k, k + 1)] = k
+        while heap:
+            heapq.heappop(heap)
+        np.sort(data)
+
+    return min(_timed(work, repeats))
+
+
+def _peak_bytes(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# -------- benchmarks --------
+def bench_a_star(gm: GridMap, queries: int, seed: int, repeats: int = 1, min_seconds: float = 0.0) -> Dict:
+    pairs = query_pairs(gm, queries, seed=seed)
+    latencies, expansions, found, search_seconds = [], 0, 0, 0.0
+    for start, goal in pairs:
+        stats = SearchStats(timing=False)
+        a_star(gm, start, goal, heuristic=octile, cost_fn=cost8, connectivity=8, stats=stats)
+        expansions += stats.expansions
+        found += stats.outcome == "found"
+        # timed without instrumentation
+        samples = _timed(lambda: a_star(gm, start, goal, heuristic=octile, cost_fn=cost8, connectivity=8),
+                         repeats, min_seconds / len(pairs))
+        latencies += samples
+        search_seconds += float(np.mean(samples))
+    out = {"seconds": _summary(latencies) if latencies else None,
+           "expansions": expansions, "found": found, "queries": len(pairs),
+           "expansions_per_sec": expansions / search_seconds if latencies else 0.0}
+    if pairs:
+        start, goal = pairs[0]
+        out["peak_bytes"] = _peak_bytes(lambda: a_star(gm, start, goal, heuristic=octile,
+                                                       cost_fn=cost8, connectivity=8))
+    return out
+
+
+def bench_obstacle_distance(gm: GridMap, repeats: int, min_seconds: float = 0.0) -> Dict:
+    run = lambda: compute_obstacle_distance(gm, connectivity=8)
+    return {"seconds": _summary(_timed(run, repeats, min_seconds)), "peak_bytes": _peak_bytes(run)}
+
+
+def bench_inflate(gm: GridMap, repeats: int, min_seconds: float = 0.0) -> Dict:
+    run = lambda: gm.inflate(3, footprint="disc", layer="bench")
+    return {"seconds": _summary(_timed(run, repeats, min_seconds)), "peak_bytes": _peak_bytes(run)}
+
+
+def bench_load(gm: GridMap, repeats: int, workdir: Path, min_seconds: float = 0.0) -> Dict:
+    stem = workdir / f"map_{gm.width}x{gm.height}"
+    # map_server images: 0 = occupied (black), 254 = free; row 0 is the top
+    Image.fromarray(np.where(np.flipud(gm.grid) != 0, 0, 254).astype(np.uint8)).save(stem.with_suffix(".pgm"))
+    stem.with_suffix(".yaml").write_text(
+        f"image: {stem.name}.pgm\nresolution: {gm.resolution}\norigin: [0.0, 0.0, 0.0]\n"
+        "negate: 0\noccupied_thresh: 0.65\nfree_thresh: 0.196\n"
+    )
+    run = lambda: load_ros_yaml_map(stem.with_suffix(".yaml"))
+    return {"seconds": _summary(_timed(run, repeats, min_seconds)), "peak_bytes": _peak_bytes(run)}
+
+
+# -------- suite --------
+def run_suite(
+    sizes: Sequence[int],
+    kinds: Sequence[str],
+    queries: int = 5,
+    repeats: int = 5,
+    min_seconds: float = 0.0,
+    seed: int = 0,
+    benches: Optional[Sequence[str]] = None,
+    log: Callable[[str], None] = print,
+) -> Dict:
+    """Run every selected benchmark; returns the JSON-ready report."""
+    benches = list(benches or ["a_star", "obstacle_distance", "inflate", "load"])
+    results = []
+    calibrate()                     # warm-up: the first benchmark is not timed cold
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in kinds:
+            for size in sizes:
+                gm = make_map(kind, size, seed=seed)
+                for bench in benches:
+                    calibration = calibrate()
+                    if bench == "a_star":
+                        data = bench_a_star(gm, queries, seed, repeats, min_seconds)
+                    elif bench == "obstacle_distance":
+                        data = bench_obstacle_distance(gm, repeats, min_seconds)
+                    elif bench == "inflate":
+                        data = bench_inflate(gm, repeats, min_seconds)
+                    elif bench == "load":
+                        data = bench_load(gm, repeats, Path(tmp), min_seconds)
+                    else:
+                        raise ValueError(f"unknown benchmark: {bench!r}")
+                    data["calibration_seconds"] = min(calibration, calibrate())
+                    name = f"{bench}/{kind}/{size}"
+                    results.append({"name": name, "bench": bench, "map": kind, "size": size, **data})
+                    if data.get("seconds"):
+                        log(f"{name:36s} p50 {data['seconds']['p50'] * 1e3:10.2f} ms")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def _calibrated(result: Dict) -> float:
+    return result["seconds"]["p50"] / result.get("calibration_seconds", 1.0)
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.25, min_delta: float = 5e-4) -> List[Dict]:
+    """
+    Per benchmark present in both, p50 ratio current / baseline, each p50
+    first divided by its `calibration_seconds` (when both entries have one;
+    older baselines are compared in raw seconds). Entries with
+    ratio > 1 + tolerance and at least `min_delta` seconds slower (after
+    scaling the baseline to this machine) are flagged `regression` (below
+    that, sub-millisecond benchmarks trip on noise).
+    """
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    rows = []
+    for r in report["results"]:
+        b = base.get(r["name"])
+        if not b or not r.get("seconds") or not b.get("seconds"):
+            continue
+        cal, base_cal = r.get("calibration_seconds"), b.get("calibration_seconds")
+        scale = cal / base_cal if cal and base_cal else 1.0     # baseline seconds -> now
+        expected = b["seconds"]["p50"] * scale
+        ratio = r["seconds"]["p50"] / max(expected, 1e-12)
+        rows.append({"name": r["name"], "p50": r["seconds"]["p50"],
+                     "baseline_p50": b["seconds"]["p50"], "ratio": ratio,
+                     "regression": ratio > 1.0 + tolerance
+                                   and r["seconds"]["p50"] - expected >= min_delta})
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    ap.add_argument("--sizes", type=int, nargs="+", help="override the preset's map sizes")
+    ap.add_argument("--maps", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    ap.add_argument("--bench", nargs="+", choices=["a_star", "obstacle_distance", "inflate", "load"])
+    ap.add_argument("--queries", type=int, help="a_star queries per map")
+    ap.add_argument("--repeats", type=int, help="minimum runs per timed operation (and per a_star query)")
+    ap.add_argument("--min-seconds", type=float, help="keep repeating a timed operation until it has run this long")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, help="write the JSON report here")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    ap.add_argument("--min-delta", type=float, default=5e-4,
+                    help="ignore p50 slowdowns smaller than this many seconds")
+    ap.add_argument("--retries", type=int, default=2,
+                    help="re-run a flagged benchmark up to this many times before reporting it")
+    ap.add_argument("--save-baseline", action="store_true", help="write the report as the new baseline")
+    args = ap.parse_args(argv)
+
+    preset = PRESETS[args.preset]
+    options = dict(
+        queries=args.queries or preset["queries"],
+        repeats=args.repeats or preset["repeats"],
+        min_seconds=preset["min_seconds"] if args.min_seconds is None else args.min_seconds,
+        seed=args.seed,
+    )
+    report = run_suite(sizes=args.sizes or preset["sizes"], kinds=args.maps, benches=args.bench, **options)
+    report["meta"]["preset"] = args.preset
+
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    rows = compare(report, baseline, args.tolerance, args.min_delta)
+    # a regression has to reproduce: flagged benchmarks are run again and
+    # keep their best calibrated p50, so one noisy stretch does not fail
+    for _ in range(args.retries):
+        flagged = {r["name"] for r in rows if r["regression"]}
+        if not flagged:
+            break
+        for k, r in enumerate(report["results"]):
+            if r["name"] in flagged:
+                again = run_suite(sizes=[r["size"]], kinds=[r["map"]], benches=[r["bench"]],
+                                  log=lambda _: None, **options)["results"][0]
+                if _calibrated(again) < _calibrated(r):
+                    report["results"][k] = again
+        rows = compare(report, baseline, args.tolerance, args.min_delta)
+    regressions = [r for r in rows if r["regression"]]
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else ""
+        print(f"{r['name']:36s} {r['ratio']:6.2f}x baseline {flag}")
+    if args.out:
+        report["comparison"] = rows
+        args.out.write_text(json.dumps(report, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,15 @@
 
 import heapq
 import itertools
+import time
 from typing import Callable, Dict, List, Optional, Tuple
-from .grid_map import GridMap
+import numpy as np
+
+from .grid_map import MOVE_TABLE, GridMap
+from .costs import CostField
+from .heuristics import TABLES
+from . import instrumentation as instr
+from .instrumentation import SearchStats
 
 Cell = Tuple[int, int]
 Heuristic = Callable[[Cell, Cell], float]
@@ -31,6 +38,9 @@ def a_star(
     cost_fn: CostFn,
     connectivity: int = 4,
     max_expansions: Optional[int] = None,
+    stats: Optional[SearchStats] = None,
+    use_table: Optional[bool] = None,
+    allowed: Optional[np.ndarray] = None,
 ) -> Optional[List[Cell]]:
     """
     A* search on a GridMap.
@@ -42,22 +52,64 @@ def a_star(
     start, goal : (i, j)
         Grid indices for start and target.
     heuristic : callable(u, v) -> float
-        Admissible/consistent estimate from u to v.
+        Admissible/consistent estimate from u to v. Heuristics with a
+        `table` (those in planner.heuristics) can be read from a cached
+        per-goal array instead (no Python call per push), see `use_table`.
     cost_fn : callable(u, v) -> float
-        Transition cost from u to v.
+        Transition cost from u to v. A `CostField` is read directly
+        (no Python call per edge).
     connectivity : int
         4 or 8 neighbor connectivity.
     max_expansions : int | None
         Optional cap on node expansions to avoid runaway searches.
+    stats : SearchStats | None
+        If given, filled with counters, timings and the outcome (why a None
+        was returned), then emitted to its sinks; `SearchStats(timing=False)`
+        keeps the counters but skips the per-edge clock reads. None skips
+        both; the search is the same either way.
+    use_table : bool | None
+        True builds the heuristic's per-goal table (up to TABLES.max_bytes;
+        warns when it cannot) when it is not cached: worth it when the search
+        will expand a sizeable part of the map, or many searches share the
+        goal. None (the default) only uses a table already cached; False
+        never does.
+    allowed : array (H, W) | None
+        Cells the search may enter (nonzero), e.g. a corridor; the others
+        are skipped before their edge is priced.
 
     Returns
     -------
     list[(i, j)] or None
         Path from start to goal (inclusive), or None if unreachable.
     """
+    # Stats hooks: with stats=None (or timing off) the checks below are all
+    # that is paid for the counters (timers)
+    counting = stats is not None
+    timed = counting and stats.timing
+    clock = time.perf_counter
+    if counting:
+        t_start = clock()
+        stats.planner = "a_star"
+        stats.time_neighbors = stats.time_cost = stats.time_heuristic = 0.0   # per search
+
+    def done(path: Optional[List[Cell]], outcome: str) -> Optional[List[Cell]]:
+        if counting:
+            stats.expansions = expansions
+            stats.pushes = pushes
+            stats.stale_pops = stale_pops
+            stats.peak_open = peak_open
+            stats.path_length = len(path) if path else 0
+            stats.time_total = clock() - t_start
+            stats.finish(outcome)
+        return path
+
+    expansions = pushes = stale_pops = peak_open = 0
+
     # Check for blocked endpoints
-    if not grid_map.is_free(start) or not grid_map.is_free(goal):
-        return None
+    if not grid_map.is_free(start):
+        return done(None, instr.START_BLOCKED)
+    if not grid_map.is_free(goal):
+        return done(None, instr.GOAL_BLOCKED)
 
     # Min-heap entries: (f, g, tie, cell)
     open_heap: List[Tuple[float, float, int, Cell]] = []
@@ -66,34 +118,94 @@ def a_star(
     came_from: Dict[Cell, Cell] = {}
     closed_set: set[Cell] = set()
 
+    # Precompiled cost field: per-edge cost is an array read, not a call
+    mult = None
+    if isinstance(cost_fn, CostField):
+        mult = memoryview(np.ascontiguousarray(cost_fn.multiplier, dtype=np.float32))
+        step_4 = cost_fn.base_step_cost_4
+        step_diag = cost_fn.base_step_cost_diag
+
+    # Legal moves straight from the map's per-cell masks (one table read)
+    moves = None
+    if grid_map.use_move_masks:
+        moves = memoryview(grid_map.move_masks())
+        move_bits = 0xFF if connectivity == 8 else 0x0F
+
+    # Restriction to a region (one read per edge)
+    allow = None
+    if allowed is not None:
+        allow = memoryview(np.ascontiguousarray(allowed, dtype=np.uint8))
+
+    # Per-goal heuristic array (one read per push), if wanted and available
+    h_table = TABLES.for_search(heuristic, (grid_map.height, grid_map.width), goal, use_table)
+    if h_table is not None:
+        h_table = memoryview(h_table)
+
+    if timed:
+        t0 = clock()
     h0 = heuristic(start, goal)
+    if timed:
+        stats.time_heuristic += clock() - t0
+    if counting:
+        pushes = peak_open = 1
     heapq.heappush(open_heap, (h0, 0.0, next(tie), start))
 
-    expansions = 0
-
     while open_heap:
         f_curr, g_curr, _, current = heapq.heappop(open_heap)
 
         if current in closed_set:
+            stale_pops += 1
             continue
         closed_set.add(current)
 
         if current == goal:
-            return reconstruct_path(came_from, current)
+            return done(reconstruct_path(came_from, current), instr.FOUND)
 
         expansions += 1
         if max_expansions is not None and expansions > max_expansions:
-            return None
-
-        for nbr in grid_map.get_neighbors(current, connectivity):
+            expansions = max_expansions
+            return done(None, instr.MAX_EXPANSIONS)
+
+        if mult is not None:
+            m_curr = mult[current]
+        if timed:
+            t0 = clock()
+        if moves is None:
+            nbrs = grid_map.get_neighbors(current, connectivity)
+        else:
+            ci, cj = current
+            nbrs = [(ci + di, cj + dj) for di, dj in MOVE_TABLE[moves[current] & move_bits]]
+        if timed:
+            stats.time_neighbors += clock() - t0
+
+        for nbr in nbrs:
             if nbr in closed_set:
                 continue
+            if allow is not None and not allow[nbr]:
+                continue
 
-            tentative_g = g_curr + cost_fn(current, nbr)
+            if timed:
+                t0 = clock()
+            if mult is None:
+                tentative_g = g_curr + cost_fn(current, nbr)
+            else:
+                m_nbr = mult[nbr]
+                step = step_diag if nbr[0] != current[0] and nbr[1] != current[1] else step_4
+                tentative_g = g_curr + step * (m_curr if m_curr > m_nbr else m_nbr)
+            if timed:
+                stats.time_cost += clock() - t0
             if tentative_g < g_score.get(nbr, float("inf")):
                 g_score[nbr] = tentative_g
                 came_from[nbr] = current
-                f = tentative_g + heuristic(nbr, goal)
+                if timed:
+                    t0 = clock()
+                f = tentative_g + (heuristic(nbr, goal) if h_table is None else h_table[nbr])
+                if timed:
+                    stats.time_heuristic += clock() - t0
                 heapq.heappush(open_heap, (f, tentative_g, next(tie), nbr))
+                if counting:
+                    pushes += 1
+                    if len(open_heap) > peak_open:
+                        peak_open = len(open_heap)
 
-    return None
\ No newline at end of file
+    return done(None, instr.UNREACHABLE)
@@ -0,0 +1,277 @@
+# planner/a_star_flat.py
+"""
+Array-backed A* on flat cell indices.
+
+Same contract and results as `planner.a_star.a_star`, but the search state
+(g-scores, parents, closed flags) lives in preallocated NumPy arrays indexed by
+flat cell id instead of dicts/sets keyed by (i, j) tuples.
+
+The occupancy grid is copied into a buffer padded with a one-cell blocked
+border, so neighbor generation is a fixed table of flat offsets with no bounds
+checks (out-of-bounds and occupied are the same thing for corner cutting).
+Buffers are reused across calls on same-sized maps; a generation stamp marks
+which entries belong to the current search, so nothing is cleared per query,
+and `load_map` only rewrites the cells edited since the same map was loaded.
+"""
+
+from __future__ import annotations
+import heapq
+import itertools
+import math
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .a_star import Cell, CostFn, Heuristic
+from .costs import CostField
+from .grid_map import GridMap
+from .heuristics import TABLES, manhattan, octile
+
+# Same order as GridMap.get_neighbors so ties break identically to a_star.
+STEPS_4: List[Tuple[int, int]] = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+STEPS_8: List[Tuple[int, int]] = STEPS_4 + [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+_MAX_GENERATION = np.iinfo(np.uint32).max
+
+
+class FlatSearchBuffers:
+    """
+    Preallocated search state for one (height, width) grid shape.
+
+    Arrays are laid out over the padded grid of shape (height + 2, width + 2);
+    cell (i, j) has flat id (i + 1) * stride + (j + 1).
+    """
+
+    def __init__(self, height: int, width: int):
+        self.height = int(height)
+        self.width = int(width)
+        self.stride = self.width + 2
+        n = (self.height + 2) * self.stride
+        self.occ = np.ones(n, dtype=np.uint8)          # padded occupancy, border = 1
+        self.mult = np.ones(n, dtype=np.float32)       # padded CostField multiplier
+        self.g = np.full(n, np.inf, dtype=np.float64)
+        self.parent = np.full(n, -1, dtype=np.int64)
+        self.seen = np.zeros(n, dtype=np.uint32)       # generation that wrote g/parent
+        self.closed = np.zeros(n, dtype=np.uint32)     # generation that closed the cell
+        self.generation = 0
+        # Per padded cell, bit b set if neighbor STEPS_8[b] is blocked (see
+        # jps.neighbor_patterns); kept current by load_map once computed.
+        self.patterns: Optional[np.ndarray] = None
+        self._source: Optional[weakref.ref] = None    # map loaded by load_map
+        self._version = -1
+
+    def load(self, grid: np.ndarray) -> None:
+        """Copy occupancy into the padded buffer (border stays blocked)."""
+        occ2d = self.occ.reshape(self.height + 2, self.stride)
+        np.not_equal(grid, 0, out=occ2d[1:-1, 1:-1].view(bool))
+        self.patterns = None
+        self._source = None
+
+    def load_map(self, grid_map: GridMap) -> None:
+        """
+        Bring the padded occupancy up to date with `grid_map`. If it is the
+        map loaded last time, only the cells edited since (its journal) are
+        rewritten, so repeated queries on a large map cost nothing here;
+        otherwise the whole grid is copied.
+        """
+        source = self._source() if self._source is not None else None
+        if source is grid_map and grid_map.version == self._version:
+            return
+        changed = grid_map.changes_since(self._version) if source is grid_map else None
+        if changed is None:
+            self.load(grid_map.grid)
+        elif changed:
+            cells = np.array(changed, dtype=np.int64)
+            ii, jj = cells[:, 0], cells[:, 1]
+            idx = (ii + 1) * self.stride + (jj + 1)
+            self.occ[idx] = grid_map._occupied_cells(ii, jj)
+            if self.patterns is not None:
+                self._patch_patterns(ii, jj, idx)
+        self._source = weakref.ref(grid_map)
+        self._version = grid_map.version
+
+    def _patch_patterns(self, ii: np.ndarray, jj: np.ndarray, idx: np.ndarray) -> None:
+        """Rewrite the pattern bits that refer to the cells `idx` (in-map neighbors only)."""
+        occ = self.occ[idx]
+        for b, (di, dj) in enumerate(STEPS_8):
+            # cell (i - di, j - dj) sees (i, j) as its neighbor b
+            inside = (ii >= di) & (ii < self.height + di) & (jj >= dj) & (jj < self.width + dj)
+            nb = idx[inside] - (di * self.stride + dj)
+            bit = np.uint8(1 << b)
+            self.patterns[nb] = (self.patterns[nb] & ~bit) | (occ[inside] << np.uint8(b))
+
+    def load_multiplier(self, multiplier: np.ndarray) -> None:
+        """Copy a CostField multiplier into the padded buffer."""
+        mult2d = self.mult.reshape(self.height + 2, self.stride)
+        mult2d[1:-1, 1:-1] = multiplier
+
+    def next_generation(self) -> int:
+        """Start a new search; stale stamps from earlier searches become invalid."""
+        self.generation += 1
+        if self.generation == _MAX_GENERATION:
+            self.seen.fill(0)
+            self.closed.fill(0)
+            self.generation = 1
+        return self.generation
+
+    def flat(self, cell: Cell) -> int:
+        return (cell[0] + 1) * self.stride + (cell[1] + 1)
+
+    def cell(self, idx: int) -> Cell:
+        i, j = divmod(idx, self.stride)
+        return (i - 1, j - 1)
+
+    def offsets(self, connectivity: int) -> List[Tuple[int, int, int, bool]]:
+        """(flat offset, di, dj, is_diagonal) per move, in get_neighbors order."""
+        steps = STEPS_8 if connectivity == 8 else STEPS_4
+        return [(di * self.stride + dj, di, dj, di != 0 and dj != 0) for di, dj in steps]
+
+
+_local = threading.local()
+
+
+def get_buffers(height: int, width: int) -> FlatSearchBuffers:
+    """Per-thread buffer cache keyed by grid shape."""
+    cache: Dict[Tuple[int, int], FlatSearchBuffers] = getattr(_local, "buffers", None)
+    if cache is None:
+        cache = _local.buffers = {}
+    key = (int(height), int(width))
+    buf = cache.get(key)
+    if buf is None:
+        buf = cache[key] = FlatSearchBuffers(height, width)
+    return buf
+
+
+def a_star_flat(
+    grid_map: GridMap,
+    start: Cell,
+    goal: Cell,
+    heuristic: Heuristic,
+    cost_fn: CostFn,
+    connectivity: int = 4,
+    max_expansions: Optional[int] = None,
+    use_table: Optional[bool] = None,
+) -> Optional[List[Cell]]:
+    """
+    A* search on a GridMap using flat indices and array-backed state.
+
+    Parameters and return value are identical to `planner.a_star.a_star`;
+    for the same inputs both return the same path. Diagonal corner cutting
+    follows `GridMap.get_neighbors` defaults (blocked when both orthogonal
+    sides are blocked). The map's occupancy is cached between calls and
+    patched from its edit journal; a `CostField` cost is read from its
+    multiplier array instead of being called per edge, and the octile and
+    manhattan heuristics are evaluated inline. `use_table` reads other
+    heuristics from the shared per-goal tables, as in `a_star`.
+    """
+    if not grid_map.is_free(start) or not grid_map.is_free(goal):
+        return None
+
+    buf = get_buffers(grid_map.height, grid_map.width)
+    buf.load_map(grid_map)
+    gen = buf.next_generation()
+
+    stride = buf.stride
+    occ = buf.occ.data
+    g = buf.g.data
+    parent = buf.parent.data
+    seen = buf.seen.data
+    closed = buf.closed.data
+    steps = buf.offsets(connectivity)
+    inf = float("inf")
+
+    # A CostField is read in place: cell (i, j) at padded id p is entry
+    # p - 2 * i - row_skip of the flattened multiplier (no per-call copy)
+    mult = None
+    if isinstance(cost_fn, CostField):
+        mult = memoryview(np.ascontiguousarray(cost_fn.multiplier, dtype=np.float32).ravel())
+        row_skip = stride + 1
+        step_4 = cost_fn.base_step_cost_4
+        step_diag = cost_fn.base_step_cost_diag
+
+    # octile and manhattan are computed inline (same operations, same values);
+    # others come from a per-goal table if there is one, else are called
+    gi, gj = goal
+    inline_h = 2 if heuristic is octile else 1 if heuristic is manhattan else 0
+    h_table = None
+    if not inline_h:
+        h_table = TABLES.for_search(heuristic, (grid_map.height, grid_map.width), goal, use_table)
+    if h_table is not None:
+        h_table = memoryview(h_table)
+    diag_term = math.sqrt(2) - 2.0
+
+    start_id = buf.flat(start)
+    goal_id = buf.flat(goal)
+    g[start_id] = 0.0
+    parent[start_id] = -1
+    seen[start_id] = gen
+
+    # Min-heap entries: (f, g, tie, flat id)
+    open_heap: List[Tuple[float, float, int, int]] = []
+    tie = itertools.count()
+    heapq.heappush(open_heap, (heuristic(start, goal), 0.0, next(tie), start_id))
+
+    expansions = 0
+
+    while open_heap:
+        _, g_curr, _, current = heapq.heappop(open_heap)
+
+        if closed[current] == gen:
+            continue
+        closed[current] = gen
+
+        if current == goal_id:
+            path: List[Cell] = []
+            while current != -1:
+                path.append(buf.cell(current))
+                current = parent[current]
+            path.reverse()
+            return path
+
+        expansions += 1
+        if max_expansions is not None and expansions > max_expansions:
+            return None
+
+        ci, cj = divmod(current, stride)
+        ci -= 1
+        cj -= 1
+        cell = (ci, cj)
+        if mult is not None:
+            m_curr = mult[current - 2 * ci - row_skip]
+
+        for off, di, dj, diag in steps:
+            nb = current + off
+            if occ[nb] or closed[nb] == gen:
+                continue
+            # block diagonal 'corner cutting' through two touching obstacles
+            if diag and occ[current + di * stride] and occ[current + dj]:
+                continue
+
+            ni = ci + di
+            nj = cj + dj
+            if mult is None:
+                tentative_g = g_curr + cost_fn(cell, (ni, nj))
+            else:
+                m_nbr = mult[nb - 2 * ni - row_skip]
+                step = step_diag if diag else step_4
+                tentative_g = g_curr + step * (m_curr if m_curr > m_nbr else m_nbr)
+            if tentative_g < (g[nb] if seen[nb] == gen else inf):
+                g[nb] = tentative_g
+                parent[nb] = current
+                seen[nb] = gen
+                if inline_h:
+                    hi = ni - gi if ni > gi else gi - ni
+                    hj = nj - gj if nj > gj else gj - nj
+                    if inline_h == 2:
+                        h = (hi + hj) + diag_term * (hi if hi < hj else hj)
+                    else:
+                        h = hi + hj
+                elif h_table is not None:
+                    h = h_table[ni, nj]
+                else:
+                    h = heuristic((ni, nj), goal)
+                heapq.heappush(open_heap, (tentative_g + h, tentative_g, next(tie), nb))
+
+    return None
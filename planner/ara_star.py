@@ -0,0 +1,192 @@
+# planner/ara_star.py
+"""
+Anytime Repairing A* (ARA*, Likhachev, Gordon & Thrun 2003).
+
+Runs weighted A* (key g + ε·h) with a large ε to get a first path fast, then
+lowers ε and keeps improving it. Each pass reuses the previous one's g-values:
+only states whose g dropped after they were expanded (the INCONS list) are
+re-queued, instead of searching from scratch. Every finished pass gives a path
+with cost <= bound * optimal; when the time budget or expansion cap runs out,
+the best path so far is returned with its bound.
+"""
+
+from __future__ import annotations
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .a_star import Cell, CostFn, Heuristic, reconstruct_path
+from .costs import CostField
+from .grid_map import GridMap
+from .heuristics import TABLES
+
+
+@dataclass
+class AnytimeResult:
+    """Best path found so far and what is known about it."""
+    path: Optional[List[Cell]]
+    cost: float          # path cost (inf if no path yet)
+    bound: float         # cost <= bound * optimal cost (inf if no path yet)
+    epsilon: float       # heuristic weight of the last completed pass
+    expansions: int      # total over all passes
+    complete: bool       # False if stopped by time_budget / max_expansions
+
+
+def ara_star(
+    grid_map: GridMap,
+    start: Cell,
+    goal: Cell,
+    heuristic: Heuristic,
+    cost_fn: CostFn,
+    connectivity: int = 4,
+    time_budget: Optional[float] = None,
+    epsilon: float = 3.0,
+    epsilon_step: float = 0.5,
+    max_expansions: Optional[int] = None,
+    on_improve: Optional[Callable[[AnytimeResult], None]] = None,
+    use_table: Optional[bool] = None,
+) -> AnytimeResult:
+    """
+    Anytime A* search on a GridMap.
+
+    Parameters
+    ----------
+    grid_map, start, goal, heuristic, cost_fn, connectivity
+        As for `a_star`. The heuristic must be admissible for the bounds to hold.
+    time_budget : float | None
+        Wall-clock seconds allowed; checked before every expansion.
+    epsilon : float
+        Initial heuristic weight (>= 1).
+    epsilon_step : float
+        Amount ε is lowered after each pass (from the smaller of ε and the
+        bound just proven), down to 1 (optimal).
+    max_expansions : int | None
+        Optional cap on expansions over all passes.
+    on_improve : callable(AnytimeResult) | None
+        Called after every completed pass, e.g. to publish the path early.
+    use_table : bool | None
+        As for `a_star`: read the heuristic from a per-goal table instead of
+        calling (and memoizing) it per cell.
+
+    Returns
+    -------
+    AnytimeResult
+        The last completed pass's path (None if the first pass did not
+        finish or the goal is unreachable) and its suboptimality bound.
+    """
+    if epsilon < 1.0:
+        raise ValueError("epsilon must be >= 1.0 for ARA*")
+    if epsilon_step <= 0.0:
+        raise ValueError("epsilon_step must be > 0")
+
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    inf = float("inf")
+    result = AnytimeResult(path=None, cost=inf, bound=inf, epsilon=epsilon,
+                           expansions=0, complete=True)
+    if not grid_map.is_free(start) or not grid_map.is_free(goal):
+        return result
+
+    mult = None
+    if isinstance(cost_fn, CostField):
+        mult = memoryview(np.ascontiguousarray(cost_fn.multiplier, dtype=np.float32))
+        step_4 = cost_fn.base_step_cost_4
+        step_diag = cost_fn.base_step_cost_diag
+
+    g_score: Dict[Cell, float] = {start: 0.0}
+    came_from: Dict[Cell, Cell] = {}
+    h_cache: Dict[Cell, float] = {}
+    tie = itertools.count()
+
+    h_table = TABLES.for_search(heuristic, (grid_map.height, grid_map.width), goal, use_table)
+    if h_table is not None:
+        h = memoryview(h_table).__getitem__
+    else:
+        def h(cell: Cell) -> float:
+            value = h_cache.get(cell)
+            if value is None:
+                value = h_cache[cell] = heuristic(cell, goal)
+            return value
+
+    open_set: Set[Cell] = {start}
+    incons: Set[Cell] = set()
+    eps = epsilon
+    expansions = 0
+
+    while True:
+        # (Re)build OPEN for this ε. Min-heap entries: (key, g, tie, cell)
+        open_set |= incons
+        incons = set()
+        closed: Set[Cell] = set()
+        open_heap: List[Tuple[float, float, int, Cell]] = [
+            (g_score[c] + eps * h(c), g_score[c], next(tie), c) for c in open_set
+        ]
+        heapq.heapify(open_heap)
+
+        # -------- ImprovePath --------
+        stopped = False
+        while open_heap:
+            key, g_entry, _, current = open_heap[0]
+            if current not in open_set or g_entry != g_score[current]:
+                heapq.heappop(open_heap)      # stale entry
+                continue
+            if g_score.get(goal, inf) <= key:
+                break
+            if (deadline is not None and time.perf_counter() >= deadline) or \
+               (max_expansions is not None and expansions >= max_expansions):
+                stopped = True
+                break
+
+            heapq.heappop(open_heap)
+            open_set.discard(current)
+            closed.add(current)
+            expansions += 1
+
+            g_curr = g_entry
+            if mult is not None:
+                m_curr = mult[current]
+            for nbr in grid_map.get_neighbors(current, connectivity):
+                if mult is None:
+                    tentative_g = g_curr + cost_fn(current, nbr)
+                else:
+                    m_nbr = mult[nbr]
+                    step = step_diag if nbr[0] != current[0] and nbr[1] != current[1] else step_4
+                    tentative_g = g_curr + step * (m_curr if m_curr > m_nbr else m_nbr)
+                if tentative_g < g_score.get(nbr, inf):
+                    g_score[nbr] = tentative_g
+                    came_from[nbr] = current
+                    if nbr in closed:
+                        incons.add(nbr)     # revisited only in the next pass
+                    else:
+                        open_set.add(nbr)
+                        heapq.heappush(open_heap, (tentative_g + eps * h(nbr), tentative_g, next(tie), nbr))
+
+        result.expansions = expansions
+        if stopped:
+            result.complete = False
+            return result
+
+        goal_g = g_score.get(goal, inf)
+        if goal_g == inf:
+            return result     # unreachable: OPEN ran dry without the goal
+
+        # Parents of cells improved after goal_g was set already point along the
+        # cheaper route, so the traced path can cost less than goal_g.
+        path = reconstruct_path(came_from, goal)
+        cost = sum(cost_fn(u, v) for u, v in zip(path, path[1:]))
+        # cost <= eps * optimal; the open/incons lower bound can be tighter
+        lower = min((g_score[c] + h(c) for c in open_set | incons), default=inf)
+        result.path = path
+        result.cost = cost
+        result.epsilon = eps
+        result.bound = max(1.0, min(eps, cost / lower if lower > 0 else eps))
+        if on_improve is not None:
+            on_improve(replace(result))
+
+        if result.bound <= 1.0:
+            return result
+        # weights above the proven bound cannot improve on it
+        eps = max(1.0, min(eps, result.bound) - epsilon_step)
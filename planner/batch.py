@@ -0,0 +1,197 @@
+# planner/batch.py
+"""
+Batch planning: many start/goal queries on one map, spread over a process pool.
+
+The map's arrays (GridMap.grid, its layers and a CostField multiplier) are
+copied once into shared memory; workers attach to them by name instead of
+receiving a pickled copy each. Results come back in input order.
+"""
+
+from __future__ import annotations
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .a_star import Cell, CostFn, Heuristic, a_star
+from .costs import CostField
+from .grid_map import GridMap
+
+Planner = Callable[..., Optional[List[Cell]]]
+# name -> (shared memory name, shape, dtype string)
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+@dataclass
+class PlanResult:
+    """One query's outcome: the path (or None) and wall time spent planning."""
+    path: Optional[List[Cell]]
+    seconds: float
+
+
+@dataclass
+class _MapSpec:
+    """Everything a worker needs to rebuild the map on shared buffers."""
+    width: int
+    height: int
+    resolution: float
+    origin: Tuple[float, float]
+    arrays: Dict[str, ArraySpec]
+    cost_field: Optional[Tuple[float, float]]   # step costs if cost_fn is a CostField
+
+
+class _SharedArrays:
+    """Owns the shared-memory copies of a set of arrays (parent side)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.blocks: List[SharedMemory] = []
+        self.specs: Dict[str, ArraySpec] = {}
+        try:
+            for name, arr in arrays.items():
+                arr = np.ascontiguousarray(arr)
+                shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+                self.blocks.append(shm)
+                np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+                self.specs[name] = (shm.name, arr.shape, arr.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+        self.blocks = []
+
+
+# -------- worker side --------
+_worker: dict = {}
+
+
+def _attach(spec: ArraySpec) -> Tuple[SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    # Pool workers share the parent's resource tracker, so attaching does not
+    # hand ownership over: the parent still unlinks the segment when done.
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _init_worker(
+    spec: _MapSpec,
+    heuristic: Heuristic,
+    cost_fn: Optional[CostFn],
+    connectivity: int,
+    max_expansions: Optional[int],
+    planner: Planner,
+) -> None:
+    handles = []
+    arrays: Dict[str, np.ndarray] = {}
+    for name, arr_spec in spec.arrays.items():
+        shm, arr = _attach(arr_spec)
+        handles.append(shm)
+        arrays[name] = arr
+
+    gm = GridMap(spec.width, spec.height, spec.resolution, spec.origin)
+    gm._adopt_grid(arrays.pop("grid"))      # shared, not copied
+    mult = arrays.pop("cost_multiplier", None)
+    gm.layers.update(arrays)
+    if spec.cost_field is not None:
+        cost_fn = CostField(mult, *spec.cost_field)
+
+    _worker.update(
+        handles=handles, grid_map=gm, heuristic=heuristic, cost_fn=cost_fn,
+        connectivity=connectivity, max_expansions=max_expansions, planner=planner,
+    )
+
+
+def _plan_one(pair: Tuple[Cell, Cell]) -> PlanResult:
+    w = _worker
+    t0 = time.perf_counter()
+    path = w["planner"](
+        w["grid_map"], pair[0], pair[1],
+        heuristic=w["heuristic"], cost_fn=w["cost_fn"],
+        connectivity=w["connectivity"], max_expansions=w["max_expansions"],
+    )
+    return PlanResult(path=path, seconds=time.perf_counter() - t0)
+
+
+# -------- public API --------
+def plan_many(
+    grid_map: GridMap,
+    pairs: Iterable[Tuple[Cell, Cell]],
+    heuristic: Heuristic,
+    cost_fn: CostFn,
+    connectivity: int = 4,
+    max_expansions: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    planner: Planner = a_star,
+) -> List[PlanResult]:
+    """
+    Plan every (start, goal) pair on one map, in parallel.
+
+    Parameters
+    ----------
+    grid_map : GridMap
+        Map to plan on. `grid` and `layers` are shared with the workers.
+    pairs : iterable of ((i, j), (i, j))
+        Start/goal queries.
+    heuristic, cost_fn, connectivity, max_expansions
+        As for `a_star`. With workers > 1 they must be picklable (module-level
+        functions); use `make_cost_field` rather than the `make_weighted_cost`
+        closure. A CostField's multiplier is shared, not pickled.
+    workers : int | None
+        Process count (default: os.cpu_count()). 1 plans in this process.
+    chunksize : int | None
+        Queries handed to a worker at a time (default: spread ~4 chunks/worker).
+    planner : callable
+        Search function with the `a_star` signature (e.g. `a_star_flat`).
+
+    Returns
+    -------
+    list[PlanResult]
+        One result per pair, in input order, with per-query planning time.
+    """
+    pairs = list(pairs)
+    workers = int(workers or os.cpu_count() or 1)
+
+    if workers <= 1 or len(pairs) <= 1:
+        results = []
+        for start, goal in pairs:
+            t0 = time.perf_counter()
+            path = planner(grid_map, start, goal, heuristic=heuristic, cost_fn=cost_fn,
+                           connectivity=connectivity, max_expansions=max_expansions)
+            results.append(PlanResult(path=path, seconds=time.perf_counter() - t0))
+        return results
+
+    arrays: Dict[str, np.ndarray] = dict(grid_map.layers)
+    arrays["grid"] = grid_map.grid
+    step_costs = None
+    shipped_cost: Optional[CostFn] = cost_fn
+    if isinstance(cost_fn, CostField):
+        arrays["cost_multiplier"] = cost_fn.multiplier
+        step_costs = (cost_fn.base_step_cost_4, cost_fn.base_step_cost_diag)
+        shipped_cost = None
+
+    if chunksize is None:
+        chunksize = max(1, len(pairs) // (4 * workers))
+
+    shared = _SharedArrays(arrays)
+    try:
+        spec = _MapSpec(
+            width=grid_map.width, height=grid_map.height,
+            resolution=grid_map.resolution, origin=grid_map.origin,
+            arrays=shared.specs, cost_field=step_costs,
+        )
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(spec, heuristic, shipped_cost, connectivity, max_expansions, planner),
+        ) as pool:
+            return list(pool.map(_plan_one, pairs, chunksize=chunksize))
+    finally:
+        shared.close()
@@ -0,0 +1,172 @@
+# planner/bidirectional.py
+"""
+Bidirectional A*: a forward search from start (f = g + h(n, goal)) and a
+backward search from goal (f = g + h(start, n)), growing the smaller frontier.
+
+Termination follows Pohl (1971): once the best meeting cost found is no larger
+than either frontier's smallest f, no cheaper path can remain. Two BS*-style
+savings (Kwa 1989) keep the frontiers small: nodes whose f already reaches the
+best cost are not queued, and a node closed by the other search is not
+expanded again. With a consistent heuristic the path is optimal, as with
+`a_star`.
+
+The win is largest when one endpoint sits in a pocket the heuristic points
+into (dead-end corridors, rooms opening away from the other endpoint): the
+opposite search leaves the pocket directly. On open maps where the heuristic
+is already tight, `a_star` alone may expand fewer nodes.
+"""
+
+from __future__ import annotations
+import heapq
+import itertools
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .a_star import Cell, CostFn, Heuristic
+from .costs import CostField
+from .grid_map import GridMap
+from .heuristics import TABLES
+
+_FORWARD, _BACKWARD = 0, 1
+
+
+def bidirectional_a_star(
+    grid_map: GridMap,
+    start: Cell,
+    goal: Cell,
+    heuristic: Heuristic,
+    cost_fn: CostFn,
+    connectivity: int = 4,
+    max_expansions: Optional[int] = None,
+    use_table: Optional[bool] = None,
+) -> Optional[List[Cell]]:
+    """
+    Bidirectional A* search on a GridMap.
+
+    Parameters
+    ----------
+    grid_map : GridMap
+        Provides `get_neighbors(cell, connectivity)` and collision checks.
+        Move legality is symmetric, so the backward search walks the same
+        neighbors and prices the edge nbr -> cell with cost_fn(nbr, cell).
+    start, goal : (i, j)
+        Grid indices for start and target.
+    heuristic : callable(u, v) -> float
+        Consistent estimate from u to v; the forward search uses
+        heuristic(n, goal), the backward search heuristic(start, n).
+    cost_fn : callable(u, v) -> float
+        Transition cost from u to v. A `CostField` is read directly.
+    connectivity : int
+        4 or 8 neighbor connectivity.
+    max_expansions : int | None
+        Optional cap on node expansions, both directions combined.
+    use_table : bool | None
+        As for `a_star`; the backward search reads the table towards start,
+        which gives heuristic(start, n) for the symmetric heuristics in
+        planner.heuristics.
+
+    Returns
+    -------
+    list[(i, j)] or None
+        Path from start to goal (inclusive), or None if unreachable.
+    """
+    if not grid_map.is_free(start) or not grid_map.is_free(goal):
+        return None
+    if start == goal:
+        return [start]
+
+    mult = None
+    if isinstance(cost_fn, CostField):
+        mult = memoryview(np.ascontiguousarray(cost_fn.multiplier, dtype=np.float32))
+        step_4 = cost_fn.base_step_cost_4
+        step_diag = cost_fn.base_step_cost_diag
+
+    # Per-direction heuristic arrays (one read per push), if wanted and available
+    shape = (grid_map.height, grid_map.width)
+    h_tables = [TABLES.for_search(heuristic, shape, goal, use_table),
+                TABLES.for_search(heuristic, shape, start, use_table)]
+    if h_tables[0] is None or h_tables[1] is None:
+        h_tables = None
+    else:
+        h_tables = [memoryview(t) for t in h_tables]
+
+    tie = itertools.count()
+    h0 = heuristic(start, goal)
+    # Per direction. Min-heap entries: (f, g, tie, cell)
+    heaps: Tuple[list, list] = ([(h0, 0.0, next(tie), start)], [(h0, 0.0, next(tie), goal)])
+    g_score: Tuple[Dict[Cell, float], Dict[Cell, float]] = ({start: 0.0}, {goal: 0.0})
+    came_from: Tuple[Dict[Cell, Cell], Dict[Cell, Cell]] = ({}, {})
+    closed: Tuple[Set[Cell], Set[Cell]] = (set(), set())
+
+    best = float("inf")       # cheapest start -> goal path seen so far ...
+    meeting: Optional[Cell] = None   # ... and the cell where its halves meet
+    expansions = 0
+
+    while True:
+        for d in (_FORWARD, _BACKWARD):
+            heap = heaps[d]
+            while heap and heap[0][3] in closed[d]:
+                heapq.heappop(heap)
+        if not heaps[_FORWARD] or not heaps[_BACKWARD]:
+            break
+        # every cheaper path still has a node on each frontier with f <= its cost
+        if best <= max(heaps[_FORWARD][0][0], heaps[_BACKWARD][0][0]):
+            break
+
+        # grow the smaller frontier
+        d = _FORWARD if len(heaps[_FORWARD]) <= len(heaps[_BACKWARD]) else _BACKWARD
+        _, g_curr, _, current = heapq.heappop(heaps[d])
+        closed[d].add(current)
+        if current in closed[1 - d]:
+            continue    # the other search has already expanded it
+
+        expansions += 1
+        if max_expansions is not None and expansions > max_expansions:
+            return None
+
+        g_d, g_other = g_score[d], g_score[1 - d]
+        came_d, closed_d, heap_d = came_from[d], closed[d], heaps[d]
+        forward = d == _FORWARD
+        h_table = None if h_tables is None else h_tables[d]
+        if mult is not None:
+            m_curr = mult[current]
+
+        for nbr in grid_map.get_neighbors(current, connectivity):
+            if nbr in closed_d:
+                continue
+
+            if mult is None:
+                step_cost = cost_fn(current, nbr) if forward else cost_fn(nbr, current)
+            else:
+                m_nbr = mult[nbr]
+                step = step_diag if nbr[0] != current[0] and nbr[1] != current[1] else step_4
+                step_cost = step * (m_curr if m_curr > m_nbr else m_nbr)
+            tentative_g = g_curr + step_cost
+            if tentative_g < g_d.get(nbr, float("inf")):
+                g_d[nbr] = tentative_g
+                came_d[nbr] = current
+
+                g_rest = g_other.get(nbr)
+                if g_rest is not None and tentative_g + g_rest < best:
+                    best = tentative_g + g_rest
+                    meeting = nbr
+
+                if h_table is not None:
+                    f = tentative_g + h_table[nbr]
+                else:
+                    f = tentative_g + (heuristic(nbr, goal) if forward else heuristic(start, nbr))
+                if f < best:
+                    heapq.heappush(heap_d, (f, tentative_g, next(tie), nbr))
+
+    if meeting is None:
+        return None
+
+    path = [meeting]
+    fwd_parents, bwd_parents = came_from
+    while path[-1] in fwd_parents:
+        path.append(fwd_parents[path[-1]])
+    path.reverse()
+    while path[-1] in bwd_parents:
+        path.append(bwd_parents[path[-1]])
+    return path
@@ -0,0 +1,204 @@
+# planner/cost_to_go.py
+"""
+Goal-rooted cost-to-go fields.
+
+A reverse Dijkstra from a goal gives, for every cell, the cost of the
+cheapest path to that goal. Any start can then follow the field downhill to
+the goal in O(path length), with no search. Fields are cached per
+(map, map version, goal, connectivity, cost) in `CostToGoCache`; an edit
+through `GridMap.set_obstacle` / `clear_cell` bumps the map version, so
+fields computed before it are never served again.
+"""
+
+from __future__ import annotations
+import heapq
+import weakref
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .a_star import Cell, CostFn
+from .a_star_flat import get_buffers
+from .costs import CostField
+from .grid_map import GridMap
+
+
+def cost_to_go(
+    grid_map: GridMap,
+    goal: Cell,
+    cost_fn: CostFn,
+    connectivity: int = 8,
+) -> np.ndarray:
+    """
+    Reverse Dijkstra from `goal` over the whole map.
+
+    Returns a float array shaped like the grid: field[i, j] is the cost of the
+    cheapest path (i, j) -> goal under `cost_fn`, inf if the cell is occupied
+    or cannot reach the goal. Moves follow `GridMap.get_neighbors`, whose
+    legality is symmetric, so predecessors are the neighbors themselves.
+    """
+    field = np.full((grid_map.height, grid_map.width), np.inf, dtype=np.float64)
+    if not grid_map.is_free(goal):
+        return field
+
+    buf = get_buffers(grid_map.height, grid_map.width)
+    buf.load_map(grid_map)
+    gen = buf.next_generation()
+    stride = buf.stride
+    occ = buf.occ.data
+    g = buf.g.data
+    seen = buf.seen.data
+    closed = buf.closed.data
+    steps = buf.offsets(connectivity)
+    inf = float("inf")
+
+    mult = None
+    if isinstance(cost_fn, CostField):
+        buf.load_multiplier(cost_fn.multiplier)
+        mult = buf.mult.data
+        step_4 = cost_fn.base_step_cost_4
+        step_diag = cost_fn.base_step_cost_diag
+
+    goal_id = buf.flat(goal)
+    g[goal_id] = 0.0
+    seen[goal_id] = gen
+    open_heap: List[Tuple[float, int]] = [(0.0, goal_id)]
+
+    while open_heap:
+        d_curr, current = heapq.heappop(open_heap)
+        if closed[current] == gen:
+            continue
+        closed[current] = gen
+
+        ci, cj = divmod(current, stride)
+        cell = (ci - 1, cj - 1)
+        if mult is not None:
+            m_curr = mult[current]
+
+        for off, di, dj, diag in steps:
+            nb = current + off
+            if occ[nb] or closed[nb] == gen:
+                continue
+            if diag and occ[current + di * stride] and occ[current + dj]:
+                continue
+            if mult is None:
+                # edge is traversed nbr -> current on the way to the goal
+                d = d_curr + cost_fn((cell[0] + di, cell[1] + dj), cell)
+            else:
+                m_nbr = mult[nb]
+                d = d_curr + (step_diag if diag else step_4) * (m_curr if m_curr > m_nbr else m_nbr)
+            if d < (g[nb] if seen[nb] == gen else inf):
+                g[nb] = d
+                seen[nb] = gen
+                heapq.heappush(open_heap, (d, nb))
+
+    H, W = grid_map.height, grid_map.width
+    reached = buf.closed.reshape(H + 2, stride)[1:-1, 1:-1] == gen
+    field[reached] = buf.g.reshape(H + 2, stride)[1:-1, 1:-1][reached]
+    return field
+
+
+def path_from_field(
+    grid_map: GridMap,
+    field: np.ndarray,
+    start: Cell,
+    cost_fn: CostFn,
+    connectivity: int = 8,
+) -> Optional[List[Cell]]:
+    """
+    Follow a cost-to-go field from `start` to its goal (the cell with cost 0).
+    Each step moves to the neighbor minimizing cost(cur, nbr) + field[nbr].
+    Returns None if start cannot reach the goal.
+    """
+    if not grid_map.is_free(start) or not np.isfinite(field[start]):
+        return None
+    path = [start]
+    current = start
+    while field[current] > 0.0:
+        best, best_cost = None, np.inf
+        for nbr in grid_map.get_neighbors(current, connectivity):
+            c = cost_fn(current, nbr) + field[nbr]
+            if c < best_cost:
+                best, best_cost = nbr, c
+        if best is None or field[best] >= field[current]:
+            return None   # field does not match this map/cost (stale)
+        path.append(best)
+        current = best
+    return path
+
+
+class CostToGoCache:
+    """
+    LRU cache of cost-to-go fields keyed by (map, map version, goal,
+    connectivity, cost key).
+
+    The cost key defaults to the cost_fn object itself; pass `cost_key` (e.g.
+    a tuple of make_cost_field parameters) when equal costs come from
+    different objects. Entries for older versions of a map are dropped the
+    next time that map is queried.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = int(maxsize)
+        self._entries: "OrderedDict[tuple, Tuple[weakref.ref, np.ndarray]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        grid_map: GridMap,
+        goal: Cell,
+        cost_fn: CostFn,
+        connectivity: int = 8,
+        cost_key: Optional[Hashable] = None,
+    ) -> np.ndarray:
+        """Return the cost-to-go field for `goal`, computing it on a miss."""
+        self._drop_stale(grid_map)
+        key = (id(grid_map), grid_map.version, tuple(goal), connectivity,
+               cost_fn if cost_key is None else cost_key)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is grid_map:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        field = cost_to_go(grid_map, goal, cost_fn, connectivity)
+        field.setflags(write=False)
+        self._entries[key] = (weakref.ref(grid_map), field)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return field
+
+    def plan(
+        self,
+        grid_map: GridMap,
+        start: Cell,
+        goal: Cell,
+        cost_fn: CostFn,
+        connectivity: int = 8,
+        cost_key: Optional[Hashable] = None,
+    ) -> Optional[List[Cell]]:
+        """Path start -> goal read off the (cached) field for goal."""
+        field = self.get(grid_map, goal, cost_fn, connectivity, cost_key)
+        return path_from_field(grid_map, field, start, cost_fn, connectivity)
+
+    def invalidate(self, grid_map: Optional[GridMap] = None) -> None:
+        """Drop every field, or only those computed on `grid_map`."""
+        if grid_map is None:
+            self._entries.clear()
+            return
+        for key in [k for k, (ref, _) in self._entries.items() if ref() is grid_map]:
+            del self._entries[key]
+
+    def _drop_stale(self, grid_map: GridMap) -> None:
+        stale = [
+            k for k, (ref, _) in self._entries.items()
+            if ref() is None or (ref() is grid_map and k[1] != grid_map.version)
+        ]
+        for k in stale:
+            del self._entries[k]
@@ -3,54 +3,194 @@
 """
 Cost utilities for A*.
 
-- compute_obstacle_distance: multi-source BFS distance-to-nearest-obstacle (in cells).
+- compute_obstacle_distance: vectorized distance-to-nearest-obstacle (in cells),
+  4/8-connected step count or exact Euclidean.
 - make_weighted_cost: step cost (4/8-connected) scaled by proximity penalty.
+- make_cost_field: the same cost compiled into a per-cell array (CostField)
+  that planners read directly.
 """
 
 from __future__ import annotations
 import math
-from collections import deque
+from dataclasses import dataclass
 from typing import Callable, Tuple
 import numpy as np
 
 from .grid_map import GridMap
 
 
-def compute_obstacle_distance(gm: GridMap, connectivity: int = 4) -> np.ndarray:
+def compute_obstacle_distance(
+    gm: GridMap,
+    connectivity: int = 4,
+    metric: str = "grid",
+    dtype: np.typing.DTypeLike = np.float64,
+) -> np.ndarray:
     """
     Distance transform (in grid cells) to nearest occupied cell.
-    Obstacles get 0; free cells grow by 1 per layer (Manhattan/BFS).
+    Obstacles get 0; free cells get the distance to the closest obstacle.
+    Returns all-inf if the map has no obstacles.
+
+    metric:
+      - "grid": number of 4/8-connected steps (what a multi-source BFS gives).
+        connectivity: 4 or 8 (4 is typical for inflation penalties).
+      - "euclidean": exact Euclidean distance between cell centers;
+        connectivity is ignored.
 
-    connectivity: 4 or 8 (4 is typical for inflation penalties).
+    dtype: result dtype. float32 halves the memory of the default float64.
+      Unsigned integer dtypes (e.g. uint16) are allowed for the "grid" metric,
+      whose distances are whole steps; there "no obstacle" is the dtype's
+      maximum instead of inf, and the map must be small enough for every
+      distance to fit.
     """
-    H, W = gm.height, gm.width
-    dist = np.full((H, W), np.inf, dtype=float)
-    q: deque[Tuple[int, int]] = deque()
+    dtype = np.dtype(dtype)
+    if dtype.kind == "u":
+        if metric != "grid":
+            raise ValueError("integer distance maps need metric='grid'")
+        if gm.height + gm.width >= np.iinfo(dtype).max:
+            raise ValueError(f"{dtype} cannot hold distances on a {gm.height}x{gm.width} map")
+    elif dtype.kind != "f":
+        raise ValueError(f"unsupported distance dtype: {dtype}")
 
-    # Seed queue with all occupied cells
-    for i in range(H):
-        for j in range(W):
-            if gm.is_occupied((i, j)):
-                dist[i, j] = 0.0
-                q.append((i, j))
+    occ = gm.grid != 0
+    if not occ.any():
+        return np.full(occ.shape, np.iinfo(dtype).max if dtype.kind == "u" else np.inf, dtype=dtype)
 
-    # Neighbor steps for BFS growth
-    steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if metric == "euclidean":
+        return np.sqrt(_squared_euclidean_distance(occ), dtype=dtype)
+    if metric != "grid":
+        raise ValueError(f"unknown distance metric: {metric!r}")
     if connectivity == 8:
-        steps += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        return _chessboard_distance(occ).astype(dtype)
+    return _cityblock_distance(occ).astype(dtype)
+
+
+def _nearest_along_rows(occ: np.ndarray) -> np.ndarray:
+    """
+    |dj| to the nearest obstacle in the same row; rows without obstacles
+    get a value larger than any in-map distance.
+    """
+    H, W = occ.shape
+    far = H + W + 1
+    jj = np.arange(W, dtype=np.int32)
+
+    left = np.where(occ, jj, np.int32(-far))
+    np.maximum.accumulate(left, axis=1, out=left)
+    np.subtract(jj, left, out=left)
+
+    right = np.where(occ, jj, np.int32(W + far))
+    rev = right[:, ::-1]
+    np.minimum.accumulate(rev, axis=1, out=rev)
+    np.subtract(right, jj, out=right)
+
+    return np.minimum(left, right, out=left)
+
+
+def _cityblock_distance(occ: np.ndarray) -> np.ndarray:
+    """
+    Exact 4-connected (L1) distance, separable:
+    d(i, j) = min_k f(k, j) + |i - k| with f the per-row distance.
+    Each direction of the column pass is a single running minimum.
+    """
+    H = occ.shape[0]
+    ii = np.arange(H, dtype=np.int32)[:, None]
+    f = _nearest_along_rows(occ)
+
+    down = f - ii                       # min over k <= i of f(k) - k, plus i
+    np.minimum.accumulate(down, axis=0, out=down)
+    down += ii
+
+    up = np.add(f, ii, out=f)           # min over k >= i of f(k) + k, minus i
+    rev = up[::-1]
+    np.minimum.accumulate(rev, axis=0, out=rev)
+    up -= ii
+
+    return np.minimum(down, up, out=down)
+
+
+def _chessboard_distance(occ: np.ndarray) -> np.ndarray:
+    """
+    Exact 8-connected (L-inf) distance via the two-pass chamfer transform.
+    Rows are swept top-down then bottom-up; within a row the three cells
+    above/below and the horizontal propagation are whole-row NumPy ops.
+    """
+    H, W = occ.shape
+    far = H + W + 1
+    d = np.where(occ, np.int32(0), np.int32(far))
+    jj = np.arange(W, dtype=np.int32)
+    nbr = np.empty(W, dtype=np.int32)
+
+    for rows in (range(H), range(H - 1, -1, -1)):
+        prev = None
+        for i in rows:
+            row = d[i]
+            if prev is not None:
+                # best of the three cells in the previous row, plus one step
+                nbr[:] = prev
+                np.minimum(nbr[1:], prev[:-1], out=nbr[1:])
+                np.minimum(nbr[:-1], prev[1:], out=nbr[:-1])
+                nbr += 1
+                np.minimum(row, nbr, out=row)
+            # propagate along the row in both directions
+            fwd = np.minimum.accumulate(row - jj) + jj
+            bwd = np.minimum.accumulate((row + jj)[::-1])[::-1] - jj
+            np.minimum(fwd, bwd, out=row)
+            prev = row
+    return d
+
+
+def _squared_euclidean_distance(occ: np.ndarray) -> np.ndarray:
+    """
+    Exact squared Euclidean distance (Felzenszwalb & Huttenlocher), separable.
+
+    Pass 1 takes the per-column distance to the nearest obstacle. Pass 2
+    computes min_k f(i, k) + (j - k)^2 along rows with the lower envelope of
+    parabolas, stepping over columns while all rows advance together.
+    Envelope state is stored slot-major, i.e. (slot, row), so each step reads
+    and writes adjacent memory.
+    """
+    H, W = occ.shape
+    g = _nearest_along_rows(occ.T).T.astype(np.float64)
+    f = g * g                                           # huge-but-finite if column is empty
+    jj = np.arange(W, dtype=np.float64)
+    fT = np.ascontiguousarray(f.T).ravel()              # f of row r, column q at q*H + r
+    pT = fT + np.repeat(jj * jj, H)                     # parabola q of row r: f + q^2
+    rows = np.arange(H, dtype=np.int64)
 
-    # Multi-source BFS
-    while q:
-        i, j = q.popleft()
-        for di, dj in steps:
-            ni, nj = i + di, j + dj
-            if 0 <= ni < H and 0 <= nj < W:
-                nd = dist[i, j] + 1.0
-                if nd < dist[ni, nj]:
-                    dist[ni, nj] = nd
-                    q.append((ni, nj))
+    v = np.zeros(W * H, dtype=np.int64)                 # envelope slot m of row r at m*H + r
+    z = np.empty(W * H, dtype=np.float64)               # left boundary of each slot
+    z[:H] = -np.inf
+    k = rows.copy()                                     # flat position of each row's top slot
 
-    return dist
+    for q in range(1, W):
+        pq = pT[q * H:(q + 1) * H]
+        vk = v.take(k)
+        s = (pq - pT.take(vk * H + rows)) / (2.0 * (q - vk))
+        pop = np.flatnonzero(s <= z.take(k))
+        while pop.size:
+            kk = k[pop] - H
+            k[pop] = kk
+            vk = v.take(kk)
+            sp = (pq[pop] - pT.take(vk * H + pop)) / (2.0 * (q - vk))
+            s[pop] = sp
+            pop = pop[sp <= z.take(kk)]
+        k += H
+        v[k] = q
+        z[k] = s
+
+    # Slot m covers columns q with z[m] < q <= z[m + 1]. Count, per (q, row),
+    # how many slots have started by column q: that count is the active slot.
+    slot = np.arange(W, dtype=np.int64)[:, None]
+    zT = z.reshape(W, H)
+    live = (slot >= 1) & (slot <= (k // H)[None, :])
+    first = np.floor(np.where(live, zT, 0.0)) + 1
+    live &= first < W
+    key = np.where(live, np.maximum(first, 0).astype(np.int64) * H + rows, W * H)
+    active = np.bincount(key.ravel(), minlength=W * H + 1)[:W * H].reshape(W, H)
+    np.cumsum(active, axis=0, out=active)
+
+    vq = v.take(active * H + rows)
+    d2 = (jj[:, None] - vq) ** 2 + fT.take(vq * H + rows)
+    return d2.T.copy()
 
 
 def make_weighted_cost(
@@ -101,4 +241,62 @@ def make_weighted_cost(
         prox_w = weight_from_dist(min(d_u, d_v))
         return step_cost(u, v) * (1.0 + penalty * prox_w)
 
-    return cost_fn
\ No newline at end of file
+    return cost_fn
+
+
+@dataclass(eq=False)
+class CostField:
+    """
+    Proximity cost compiled to a per-cell float32 multiplier.
+
+    Edge cost u -> v = step(u, v) * max(multiplier[u], multiplier[v]), which is
+    the same as make_weighted_cost's step * (1 + penalty * weight(min(d_u, d_v)))
+    since the weight only grows as distance shrinks.
+
+    Instances are callable as cost_fn(u, v), so they work with any planner;
+    `a_star` and `a_star_flat` recognize them and read `multiplier` directly
+    instead of calling back into Python per edge.
+    """
+    multiplier: np.ndarray
+    base_step_cost_4: float = 1.0
+    base_step_cost_diag: float = math.sqrt(2.0)
+
+    def __call__(self, u: Tuple[int, int], v: Tuple[int, int]) -> float:
+        m = max(self.multiplier[u[0], u[1]], self.multiplier[v[0], v[1]])
+        diag = u[0] != v[0] and u[1] != v[1]
+        return (self.base_step_cost_diag if diag else self.base_step_cost_4) * float(m)
+
+
+def make_cost_field(
+    gm: GridMap,
+    *,
+    base_step_cost_4: float = 1.0,
+    base_step_cost_diag: float = math.sqrt(2.0),
+    penalty: float = 5.0,
+    cutoff_cells: int = 3,
+    falloff: str = "linear",
+    distance_map: np.ndarray | None = None,
+) -> CostField:
+    """
+    Same parameters and costs as make_weighted_cost, compiled once into a
+    CostField. Recompile after editing the map or changing parameters.
+    """
+    if penalty < 0:
+        raise ValueError("penalty must be >= 0")
+    if distance_map is None:
+        distance_map = compute_obstacle_distance(gm, connectivity=4)
+
+    cutoff = float(cutoff_cells)
+    if cutoff <= 0:               # every cell is at or past the cutoff: no penalty
+        weight = np.zeros(np.shape(distance_map))
+    else:
+        x = np.clip((cutoff - distance_map) / cutoff, 0.0, None)
+        x[distance_map >= cutoff] = 0.0
+        weight = x if falloff == "linear" else x * x
+
+    multiplier = (1.0 + penalty * weight).astype(np.float32)
+    return CostField(
+        multiplier=multiplier,
+        base_step_cost_4=float(base_step_cost_4),
+        base_step_cost_diag=float(base_step_cost_diag),
+    )
@@ -0,0 +1,224 @@
+# planner/dstar_lite.py
+"""
+D* Lite (Koenig & Likhachev 2002): incremental replanning on a GridMap.
+
+The search runs backwards from the goal and keeps its state (g, rhs, open
+list) between calls. After cells are edited through `GridMap.set_obstacle` /
+`clear_cell`, `replan()` reads the edited cells from the map's journal and
+repairs only the part of the search those edits affect, instead of searching
+the whole map again. The robot may also move (`update_start`) between replans.
+"""
+
+from __future__ import annotations
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .a_star import Cell, CostFn, Heuristic
+from .grid_map import GridMap
+
+Key = Tuple[float, float]
+
+_INF = math.inf
+
+
+def _key_less(a: Key, b: Key) -> bool:
+    """
+    Lexicographic a < b, with first components within rounding treated as
+    equal. Along equal-cost paths g + h is the same number reached by
+    different sums; without the tolerance the search can stop one tie short
+    and leave stale g values behind a blocked cell.
+    """
+    if not math.isclose(a[0], b[0], rel_tol=1e-9, abs_tol=1e-9):
+        return a[0] < b[0]
+    return a[1] < b[1]
+
+
+class DStarLite:
+    """
+    Incremental planner for one goal on one GridMap.
+
+    Parameters
+    ----------
+    grid_map : GridMap
+        Map to plan on. Edits made through its set_obstacle/clear_cell are
+        picked up by `replan()`; replacing `grid` or inflating triggers a
+        full restart.
+    start, goal : (i, j)
+        Grid indices for start and target.
+    heuristic : callable(u, v) -> float
+        Consistent estimate for `cost_fn` (e.g. octile for 8-connected
+        unit/sqrt(2) steps).
+    cost_fn : callable(u, v) -> float
+        Transition cost from u to v. It may depend on the map only through
+        occupancy; for other cost changes, pass the cells to `replan(changed=)`.
+    connectivity : int
+        4 or 8 neighbor connectivity.
+    """
+
+    def __init__(
+        self,
+        grid_map: GridMap,
+        start: Cell,
+        goal: Cell,
+        heuristic: Heuristic,
+        cost_fn: CostFn,
+        connectivity: int = 8,
+    ):
+        self.grid_map = grid_map
+        self.start = tuple(start)
+        self.goal = tuple(goal)
+        self.heuristic = heuristic
+        self.cost_fn = cost_fn
+        self.connectivity = connectivity
+        self.expansions = 0     # vertices expanded by the last plan/replan
+        self._reset()
+
+    # -------- public API --------
+    def plan(self) -> Optional[List[Cell]]:
+        """Bring the search up to date and return the current start -> goal path."""
+        self._compute_shortest_path()
+        return self.path()
+
+    def replan(self, changed: Optional[Iterable[Cell]] = None) -> Optional[List[Cell]]:
+        """
+        Repair the search after map edits and return the new path.
+
+        Edited cells are taken from the map's journal; `changed` adds cells
+        whose costs changed in some other way. If the journal can no longer
+        say what changed, the search restarts from scratch.
+        """
+        cells = self.grid_map.changes_since(self._version)
+        if cells is None:
+            self._reset()
+        else:
+            self._version = self.grid_map.version
+            if changed is not None:
+                cells = list(cells) + [tuple(c) for c in changed]
+            self._cells_changed(cells)
+        return self.plan()
+
+    def update_start(self, start: Cell) -> None:
+        """Move the start (e.g. the robot advanced); keeps all search state."""
+        start = tuple(start)
+        self._km += self.heuristic(self._last, start)
+        self._last = start
+        self.start = start
+
+    def path(self) -> Optional[List[Cell]]:
+        """Greedy walk down g from start to goal; None if the goal is unreachable."""
+        if not self.grid_map.is_free(self.start) or self._g.get(self.start, _INF) == _INF:
+            return None
+        path = [self.start]
+        current = self.start
+        limit = self.grid_map.width * self.grid_map.height
+        while current != self.goal:
+            best, best_cost = None, _INF
+            for nbr in self.grid_map.get_neighbors(current, self.connectivity):
+                c = self.cost_fn(current, nbr) + self._g.get(nbr, _INF)
+                if c < best_cost:
+                    best, best_cost = nbr, c
+            if best is None or len(path) > limit:
+                return None
+            path.append(best)
+            current = best
+        return path
+
+    # -------- search state --------
+    def _reset(self) -> None:
+        self._version = self.grid_map.version
+        self._g: Dict[Cell, float] = {}
+        self._rhs: Dict[Cell, float] = {}
+        self._open: Dict[Cell, Key] = {}
+        self._heap: List[Tuple[float, float, Cell]] = []
+        self._km = 0.0
+        self._last = self.start
+        self._update_vertex(self.goal)
+
+    def _key(self, s: Cell) -> Key:
+        m = min(self._g.get(s, _INF), self._rhs.get(s, _INF))
+        return (m + self.heuristic(self.start, s) + self._km, m)
+
+    def _push(self, s: Cell, key: Key) -> None:
+        self._open[s] = key
+        heapq.heappush(self._heap, (key[0], key[1], s))
+
+    def _top(self) -> Tuple[Key, Optional[Cell]]:
+        """Smallest live open entry; stale heap entries are discarded lazily."""
+        heap = self._heap
+        while heap:
+            k1, k2, s = heap[0]
+            if self._open.get(s) == (k1, k2):
+                return (k1, k2), s
+            heapq.heappop(heap)
+        return (_INF, _INF), None
+
+    def _update_vertex(self, u: Cell) -> None:
+        gm = self.grid_map
+        if u != self.goal:
+            best = _INF
+            if gm.is_free(u):
+                g = self._g
+                for s in gm.get_neighbors(u, self.connectivity):
+                    gs = g.get(s, _INF)
+                    if gs != _INF:
+                        c = self.cost_fn(u, s) + gs
+                        if c < best:
+                            best = c
+            self._rhs[u] = best
+        elif not gm.is_free(u):
+            self._rhs[u] = _INF
+        else:
+            self._rhs[u] = 0.0
+
+        self._open.pop(u, None)
+        if self._g.get(u, _INF) != self._rhs.get(u, _INF):
+            self._push(u, self._key(u))
+
+    def _cells_changed(self, cells: Iterable[Cell]) -> None:
+        # An edited cell changes its own edges and, through the corner-cutting
+        # rule, diagonal edges between its neighbors: refresh all of them.
+        gm = self.grid_map
+        dirty: Dict[Cell, None] = {}
+        for i, j in cells:
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    c = (i + di, j + dj)
+                    if gm.in_bounds(c):
+                        dirty[c] = None
+        for c in dirty:
+            self._update_vertex(c)
+
+    def _compute_shortest_path(self) -> None:
+        gm = self.grid_map
+        g, rhs = self._g, self._rhs
+        self.expansions = 0
+        while True:
+            k_old, u = self._top()
+            start = self.start
+            g_start = g.get(start, _INF)
+            if u is None or (not _key_less(k_old, self._key(start)) and rhs.get(start, _INF) == g_start):
+                return
+            self.expansions += 1
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u, k_new)
+            elif g.get(u, _INF) > rhs.get(u, _INF):
+                # u became cheaper: its predecessors can only improve through it
+                g_u = g[u] = rhs[u]
+                del self._open[u]
+                for p in gm.get_neighbors(u, self.connectivity):
+                    if p == self.goal:
+                        continue
+                    c = self.cost_fn(p, u) + g_u
+                    if c < rhs.get(p, _INF):
+                        rhs[p] = c
+                        if g.get(p, _INF) != c:
+                            self._push(p, self._key(p))
+                        else:
+                            self._open.pop(p, None)
+            else:
+                g[u] = _INF
+                self._update_vertex(u)
+                for p in gm.get_neighbors(u, self.connectivity):
+                    self._update_vertex(p)
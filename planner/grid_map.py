@@ -1,16 +1,52 @@
 # planner/grid_map.py
 """
 GridMap: 2D occupancy grid with coordinate transforms, obstacle marking,
-neighbor lookup, and simple inflation. Values: 0=free, 1=occupied.
+neighbor lookup, and obstacle inflation. Values: 0=free, 1=occupied.
+
+Derived layers (e.g. inflated copies) can be kept next to the base grid in
+`layers`, keyed by name.
+
+`version` increases on every edit made through GridMap (set_obstacle,
+clear_cell, inflate, assigning `grid`), so derived data can be cached per
+version. Single-cell edits are also journaled, so incremental consumers can
+ask which cells changed since a version they saw (`changes_since`). Writing
+into `grid` directly bypasses both.
+
+Legal moves are cached per cell as uint8 bitmasks (`move_masks`), bit k set
+when the step STEPS_8[k] is allowed; get_neighbors reads them instead of
+testing cells one by one. Edits through GridMap update the masks around the
+edited cell; replacing or inflating the grid rebuilds them on next use.
+
+`pyramid()` max-pools the map into coarser levels for coarse-to-fine
+planning (planner.pyramid).
+
+PackedGridMap stores the same grid one bit per cell (np.packbits rows) for
+processes that hold many large maps; see its docstring for the trade-offs.
 """
 
-from typing import Iterable, Tuple, List
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
 import numpy as np
 
 Cell = Tuple[int, int]
 
+# Single-cell edits remembered by changes_since before old ones are dropped.
+JOURNAL_LIMIT = 4096
+
+# Moves in get_neighbors order: 4-connected first, so `mask & 0x0F` is the
+# 4-connected mask.
+STEPS_8: List[Cell] = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+# MOVE_TABLE[mask] -> the steps whose bits are set, in STEPS_8 order
+MOVE_TABLE: List[Tuple[Cell, ...]] = [
+    tuple(step for k, step in enumerate(STEPS_8) if mask >> k & 1) for mask in range(256)
+]
+
 
 class GridMap:
+    # Keep per-cell move masks (one uint8 per cell and diagonal rule). Compact
+    # storage backends turn this off so they never allocate a full-size array.
+    use_move_masks = True
+
     def __init__(
         self,
         width: int,
@@ -22,7 +58,73 @@ class GridMap:
         self.height = int(height)
         self.resolution = float(resolution)
         self.origin = (float(origin[0]), float(origin[1]))  # world coords (x0, y0)
-        self.grid = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.version = 0
+        self._journal: List[Tuple[int, Cell]] = []   # (version after edit, cell)
+        self._journal_floor = 0    # oldest version changes_since can answer for
+        self._init_cells()
+        self.layers: Dict[str, np.ndarray] = {}
+        # allow_diagonal_through_walls -> (masks, memoryview), valid at _masks_version
+        self._move_masks: Dict[bool, Tuple[np.ndarray, memoryview]] = {}
+        self._masks_version = -1
+        self._pyramids: Dict[Tuple[int, ...], "MapPyramid"] = {}
+
+    def _init_cells(self) -> None:
+        self._grid = np.zeros((self.height, self.width), dtype=np.uint8)
+
+    @property
+    def grid(self) -> np.ndarray:
+        """
+        Read-only view of the occupancy grid. Edit through set_obstacle,
+        clear_cell, set_obstacles/clear_cells or by assigning `grid`: a
+        direct write would bypass versioning and leave move masks stale.
+        """
+        view = self._grid.view()
+        view.flags.writeable = False
+        return view
+
+    @grid.setter
+    def grid(self, value: np.ndarray) -> None:
+        # copied: a caller's alias could otherwise bypass versioning
+        self._adopt_grid(np.array(value, dtype=np.uint8))
+
+    def _adopt_grid(self, grid: np.ndarray) -> None:
+        """Install `grid` without copying it (shared memory, memory-mapped
+        bundles). Only for arrays nobody else writes to; plain GridMap only."""
+        self._grid = grid
+        self.version += 1
+        # bulk replacement: no per-cell record, consumers must start over
+        self._journal.clear()
+        self._journal_floor = self.version
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the occupancy grid (layers not included)."""
+        return self._grid.nbytes
+
+    def changes_since(self, version: int) -> Optional[List[Cell]]:
+        """
+        Cells edited by set_obstacle/clear_cell after `version`, oldest first,
+        without duplicates. None if that history is no longer available (the
+        grid was replaced or inflated since, or the journal overflowed).
+        """
+        if version < self._journal_floor:
+            return None
+        cells: Dict[Cell, None] = {}
+        for v, cell in self._journal:
+            if v > version:
+                cells[cell] = None
+        return list(cells)
+
+    def _record(self, cell: Cell) -> None:
+        if self._move_masks and self._masks_version == self.version:
+            self._update_move_masks(cell)
+            self._masks_version = self.version + 1
+        self.version += 1
+        self._journal.append((self.version, cell))
+        if len(self._journal) > JOURNAL_LIMIT:
+            drop = len(self._journal) - JOURNAL_LIMIT // 2
+            self._journal_floor = self._journal[drop - 1][0]
+            del self._journal[:drop]
 
     # -------- basic queries / edits --------
     def in_bounds(self, cell: Cell) -> bool:
@@ -31,7 +133,7 @@ class GridMap:
 
     def is_occupied(self, cell: Cell) -> bool:
         i, j = cell
-        return bool(self.grid[i, j])
+        return bool(self._grid[i, j])
 
     def is_free(self, cell: Cell) -> bool:
         return self.in_bounds(cell) and not self.is_occupied(cell)
@@ -39,17 +141,56 @@ class GridMap:
     def set_obstacle(self, cell: Cell) -> None:
         if self.in_bounds(cell):
             i, j = cell
-            self.grid[i, j] = 1
+            if not self._grid[i, j]:
+                self._grid[i, j] = 1
+                self._record((i, j))
 
     def clear_cell(self, cell: Cell) -> None:
         if self.in_bounds(cell):
             i, j = cell
-            self.grid[i, j] = 0
+            if self._grid[i, j]:
+                self._grid[i, j] = 0
+                self._record((i, j))
 
     def set_obstacles(self, cells: Iterable[Cell]) -> None:
-        """Batch mark obstacles."""
-        for c in cells:
-            self.set_obstacle(c)
+        """Batch mark obstacles: one vectorized write, then each cell that
+        changed is versioned and journaled as by set_obstacle."""
+        self._set_many(cells, 1)
+
+    def clear_cells(self, cells: Iterable[Cell]) -> None:
+        """Batch counterpart of clear_cell."""
+        self._set_many(cells, 0)
+
+    def _set_many(self, cells: Iterable[Cell], value: int) -> None:
+        idx = np.asarray(cells if isinstance(cells, np.ndarray) else list(cells), dtype=np.int64)
+        idx = idx.reshape(-1, 2)
+        ii, jj = idx[:, 0], idx[:, 1]
+        keep = (ii >= 0) & (ii < self.height) & (jj >= 0) & (jj < self.width)
+        ii, jj = ii[keep], jj[keep]
+        # first occurrence of each cell, in input order
+        _, first = np.unique(ii * self.width + jj, return_index=True)
+        first.sort()
+        ii, jj = ii[first], jj[first]
+        changed = self._occupied_cells(ii, jj) != bool(value)
+        ii, jj = ii[changed], jj[changed]
+        if ii.size == 0:
+            return
+        self._write_cells(ii, jj, value)
+        if ii.size > 64 and self._move_masks:
+            self._move_masks.clear()        # cheaper to rebuild than patch cell by cell
+        for cell in zip(ii.tolist(), jj.tolist()):
+            self._record(cell)
+
+    def _occupied_cells(self, ii: np.ndarray, jj: np.ndarray) -> np.ndarray:
+        return self._grid[ii, jj] != 0
+
+    def occupied_region(self, r0: int, r1: int, c0: int, c1: int) -> np.ndarray:
+        """Occupancy of rows r0:r1, cols c0:c1 (inside the map) as a new bool
+        array, read without materializing the whole grid."""
+        return self._grid[r0:r1, c0:c1] != 0
+
+    def _write_cells(self, ii: np.ndarray, jj: np.ndarray, value: int) -> None:
+        self._grid[ii, jj] = value
 
     # -------- coordinates --------
     def world_to_grid(self, x: float, y: float) -> Cell:
@@ -66,6 +207,44 @@ class GridMap:
         return (x, y)
 
     # -------- neighbor lookup --------
+    def move_masks(self, allow_diagonal_through_walls: bool = False) -> np.ndarray:
+        """
+        Per-cell legal moves, shape (height, width) uint8: bit k is set when
+        the step STEPS_8[k] from that cell lands on a free in-bounds cell (and,
+        for diagonals, does not cut a corner unless allowed). Use
+        `mask & 0x0F` for 4-connectivity and MOVE_TABLE to list the steps.
+        The array is updated in place by later edits; do not modify it.
+        """
+        return self._masks(allow_diagonal_through_walls)[0]
+
+    def _masks(self, through_walls: bool) -> Tuple[np.ndarray, memoryview]:
+        if self._masks_version != self.version:
+            self._move_masks.clear()
+            self._masks_version = self.version
+        entry = self._move_masks.get(through_walls)
+        if entry is None:
+            masks = _compute_move_masks(self._blocked_window(0, self.height, 0, self.width), through_walls)
+            entry = self._move_masks[through_walls] = (masks, memoryview(masks))
+        return entry
+
+    def _blocked_window(self, r0: int, r1: int, c0: int, c1: int) -> np.ndarray:
+        """Blocked cells of rows r0:r1, cols c0:c1 plus a one-cell ring
+        (out of bounds counts as blocked)."""
+        pr0, pr1 = max(r0 - 1, 0), min(r1 + 1, self.height)
+        pc0, pc1 = max(c0 - 1, 0), min(c1 + 1, self.width)
+        blocked = np.ones((r1 - r0 + 2, c1 - c0 + 2), dtype=bool)
+        blocked[pr0 - r0 + 1:pr1 - r0 + 1, pc0 - c0 + 1:pc1 - c0 + 1] = self.occupied_region(pr0, pr1, pc0, pc1)
+        return blocked
+
+    def _update_move_masks(self, cell: Cell) -> None:
+        """Recompute the masks of the 3x3 block around an edited cell."""
+        i, j = cell
+        r0, r1 = max(i - 1, 0), min(i + 2, self.height)
+        c0, c1 = max(j - 1, 0), min(j + 2, self.width)
+        blocked = self._blocked_window(r0, r1, c0, c1)
+        for through_walls, (masks, _) in self._move_masks.items():
+            masks[r0:r1, c0:c1] = _compute_move_masks(blocked, through_walls)
+
     def get_neighbors(
         self,
         cell: Cell,
@@ -77,10 +256,13 @@ class GridMap:
         unless allow_diagonal_through_walls=True.
         """
         i, j = cell
-        steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        if connectivity == 8:
-            steps += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        if self.use_move_masks and 0 <= i < self.height and 0 <= j < self.width:
+            mask = self._masks(allow_diagonal_through_walls)[1][i, j]
+            if connectivity != 8:
+                mask &= 0x0F
+            return [(i + di, j + dj) for di, dj in MOVE_TABLE[mask]]
 
+        steps = STEPS_8 if connectivity == 8 else STEPS_8[:4]
         nbrs: List[Cell] = []
         for di, dj in steps:
             nb = (i + di, j + dj)
@@ -99,20 +281,195 @@ class GridMap:
             nbrs.append(nb)
         return nbrs
 
-    # -------- safety margin (simple inflation) --------
-    def inflate(self, radius_cells: int) -> None:
+    # -------- safety margin (inflation) --------
+    def inflate(
+        self,
+        radius_cells: int,
+        footprint: str = "square",
+        layer: Optional[str] = None,
+    ) -> np.ndarray:
         """
-        Inflate obstacles by Chebyshev radius in cell units (simple, no deps).
+        Inflate obstacles by a radius in cell units (vectorized dilation).
+
+        footprint:
+          - "square": Chebyshev radius (separable max filter).
+          - "disc":   Euclidean radius; a cell is blocked if its center is within
+                      radius_cells of an occupied cell's center.
+        layer:
+          - None: replace self.grid with the inflated grid.
+          - name: store the result in self.layers[name] and leave self.grid as is.
+
+        Returns the inflated grid.
         """
-        if radius_cells <= 0:
-            return
-        occ = np.argwhere(self.grid == 1)
-        if occ.size == 0:
-            return
-        inflated = self.grid.copy()
+        if footprint not in ("square", "disc"):
+            raise ValueError(f"unknown footprint: {footprint!r}")
         r = int(radius_cells)
-        for (i, j) in occ:
-            i0, i1 = max(0, i - r), min(self.height - 1, i + r)
-            j0, j1 = max(0, j - r), min(self.width - 1, j + r)
-            inflated[i0:i1 + 1, j0:j1 + 1] = 1
-        self.grid = inflated
\ No newline at end of file
+        occ = self.grid != 0
+        if r <= 0 or not occ.any():
+            if layer is None:
+                return self.grid     # nothing to inflate, grid left as is
+            inflated = self.grid.copy()
+        elif footprint == "square":
+            inflated = _dilate_axis(_dilate_axis(occ, r, axis=1), r, axis=0)
+        else:
+            inflated = _dilate_disc(occ, r)
+        if inflated.dtype == bool:
+            inflated = np.ascontiguousarray(inflated).view(np.uint8)
+
+        if layer is not None:
+            self.layers[layer] = inflated
+        else:
+            self.grid = inflated
+        return inflated
+
+    # -------- multi-resolution --------
+    def pyramid(self, factors: Iterable[int] = (2, 4)) -> "MapPyramid":
+        """
+        Conservative coarse copies of this map, one per factor (a coarse cell
+        is occupied if any cell it covers is); see planner.pyramid. Kept per
+        factor set and brought up to date with edits on every call.
+        """
+        from .pyramid import MapPyramid
+        key = tuple(int(f) for f in factors)
+        pyr = self._pyramids.get(key)
+        if pyr is None:
+            pyr = self._pyramids[key] = MapPyramid(self, key)
+        else:
+            pyr.refresh()
+        return pyr
+
+
+class PackedGridMap(GridMap):
+    """
+    GridMap that stores occupancy one bit per cell: each row is np.packbits'ed
+    (big-endian bit order), so a W-wide row takes ceil(W / 8) bytes instead of W.
+
+    Cell queries and edits (is_occupied, set_obstacle, clear_cell and so
+    get_neighbors) test and flip single bits, with the same versioning and
+    journaling as GridMap. `grid` unpacks a read-only uint8 copy on every
+    access, so whole-array consumers (costs, inflation, CostField) still work
+    but pay for a temporary full-size array; writes must go through the edit
+    methods or by assigning `grid`, which repacks. Layers are kept unpacked.
+    Move masks are off: get_neighbors tests the bits directly.
+    """
+
+    use_move_masks = False
+
+    def _init_cells(self) -> None:
+        self._set_bits(np.zeros((self.height, (self.width + 7) // 8), dtype=np.uint8))
+
+    def _set_bits(self, bits: np.ndarray) -> None:
+        self._bits = bits
+        self._rows = memoryview(bits)    # byte access without numpy scalar overhead
+
+    @property
+    def grid(self) -> np.ndarray:
+        grid = np.unpackbits(self._bits, axis=1, count=self.width)
+        grid.flags.writeable = False
+        return grid
+
+    @grid.setter
+    def grid(self, value: np.ndarray) -> None:
+        self._set_bits(np.packbits(np.asarray(value) != 0, axis=1))
+        self.version += 1
+        self._journal.clear()
+        self._journal_floor = self.version
+
+    @property
+    def nbytes(self) -> int:
+        return self._bits.nbytes
+
+    @property
+    def bits(self) -> np.ndarray:
+        """The packed rows, shape (height, ceil(width / 8)); do not modify."""
+        return self._bits
+
+    def is_occupied(self, cell: Cell) -> bool:
+        i, j = cell
+        return bool(self._rows[i, j >> 3] & (0x80 >> (j & 7)))
+
+    def _occupied_cells(self, ii: np.ndarray, jj: np.ndarray) -> np.ndarray:
+        return (self._bits[ii, jj >> 3] & (0x80 >> (jj & 7))) != 0
+
+    def occupied_region(self, r0: int, r1: int, c0: int, c1: int) -> np.ndarray:
+        b0 = c0 >> 3
+        bits = np.unpackbits(self._bits[r0:r1, b0:(c1 + 7) >> 3], axis=1)
+        return bits[:, c0 - 8 * b0:c1 - 8 * b0] != 0
+
+    def _write_cells(self, ii: np.ndarray, jj: np.ndarray, value: int) -> None:
+        masks = (0x80 >> (jj & 7)).astype(np.uint8)
+        if value:
+            np.bitwise_or.at(self._bits, (ii, jj >> 3), masks)
+        else:
+            np.bitwise_and.at(self._bits, (ii, jj >> 3), ~masks)
+
+    def set_obstacle(self, cell: Cell) -> None:
+        if self.in_bounds(cell):
+            i, j = cell
+            mask = 0x80 >> (j & 7)
+            byte = self._rows[i, j >> 3]
+            if not byte & mask:
+                self._rows[i, j >> 3] = byte | mask
+                self._record((i, j))
+
+    def clear_cell(self, cell: Cell) -> None:
+        if self.in_bounds(cell):
+            i, j = cell
+            mask = 0x80 >> (j & 7)
+            byte = self._rows[i, j >> 3]
+            if byte & mask:
+                self._rows[i, j >> 3] = byte ^ mask
+                self._record((i, j))
+
+
+def _compute_move_masks(blocked: np.ndarray, through_walls: bool) -> np.ndarray:
+    """
+    Move masks for the interior of `blocked` (a grid with a one-cell ring
+    around the cells of interest), one vectorized pass per step.
+    """
+    H, W = blocked.shape[0] - 2, blocked.shape[1] - 2
+    masks = np.zeros((H, W), dtype=np.uint8)
+    for k, (di, dj) in enumerate(STEPS_8):
+        legal = ~blocked[1 + di:H + 1 + di, 1 + dj:W + 1 + dj]
+        if di and dj and not through_walls:
+            legal &= ~(blocked[1 + di:H + 1 + di, 1:W + 1] & blocked[1:H + 1, 1 + dj:W + 1 + dj])
+        masks |= legal.view(np.uint8) << np.uint8(k)
+    return masks
+
+
+def _dilate_axis(occ: np.ndarray, r: int, axis: int) -> np.ndarray:
+    """1D binary dilation by radius r along one axis, via a running count."""
+    a = np.moveaxis(occ, axis, -1)
+    n = a.shape[-1]
+    counts = np.cumsum(a, axis=-1, dtype=np.int32)
+    # padded[t] = obstacles in [0, t - r - 1], clamped to the ends of the axis
+    padded = np.concatenate(
+        [np.zeros(a.shape[:-1] + (r + 1,), dtype=np.int32),
+         counts,
+         np.repeat(counts[..., -1:], r, axis=-1)],
+        axis=-1,
+    )
+    out = padded[..., 2 * r + 1:] > padded[..., :n]
+    return np.moveaxis(out, -1, axis)
+
+
+def _dilate_disc(occ: np.ndarray, r: int) -> np.ndarray:
+    """
+    Binary dilation by a Euclidean disc of radius r: the union over row offsets
+    di of the row-dilation by floor(sqrt(r^2 - di^2)), shifted by di.
+    """
+    H = occ.shape[0]
+    out = np.zeros_like(occ)
+    rows_by_width: Dict[int, np.ndarray] = {}
+    for di in range(-r, r + 1):
+        if abs(di) >= H:
+            continue
+        w = math.isqrt(r * r - di * di)
+        src = rows_by_width.get(w)
+        if src is None:
+            src = rows_by_width[w] = _dilate_axis(occ, w, axis=1) if w > 0 else occ
+        if di >= 0:
+            out[:H - di] |= src[di:]
+        else:
+            out[-di:] |= src[:H + di]
+    return out
@@ -7,29 +7,87 @@ Pick the one that matches connectivity and move costs:
 - 4-connected with unit-cost moves  -> manhattan
 - 8-connected with (diag=√2) costs  -> octile
 - Euclidean is admissible for either but can expand more nodes than octile on 8-connected grids.
+
+Each heuristic here also has a `table(shape, goal)` attribute giving its value
+for every cell towards one goal as a float64 array, computed with the same
+floating-point operations as the scalar function, so entries match it
+exactly. `HeuristicTable` caches those arrays per goal; `a_star` can read
+them instead of calling the heuristic per node (see its `use_table`).
+
+`LandmarkHeuristic` (ALT) bounds the true cost with exact distances to a few
+landmarks, so it sees walls the geometric metrics ignore; its tables are
+built once per map and cost function and can be saved next to the map.
 """
 
 from __future__ import annotations
+import hashlib
 import math
-from typing import Tuple, Callable
+import threading
+import warnings
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .grid_map import GridMap
 
 Cell = Tuple[int, int]
 Heuristic = Callable[[Cell, Cell], float]
+TableFn = Callable[[Tuple[int, int], Cell], np.ndarray]
+
+
+def _offsets(shape: Tuple[int, int], goal: Cell) -> Tuple[np.ndarray, np.ndarray]:
+    """|di| as a column and |dj| as a row (broadcast to the grid)."""
+    di = np.abs(np.arange(shape[0], dtype=np.float64) - goal[0])[:, None]
+    dj = np.abs(np.arange(shape[1], dtype=np.float64) - goal[1])[None, :]
+    return di, dj
+
+
+def _vectorized(table: TableFn) -> Callable[[Heuristic], Heuristic]:
+    def attach(h: Heuristic) -> Heuristic:
+        h.table = table
+        return h
+    return attach
+
+
+def _manhattan_table(shape, goal):
+    di, dj = _offsets(shape, goal)
+    return di + dj
+
+def _euclidean_table(shape, goal):
+    di, dj = _offsets(shape, goal)
+    return np.sqrt(di * di + dj * dj)
+
+def _chebyshev_table(shape, goal):
+    di, dj = _offsets(shape, goal)
+    return np.maximum(di, dj)
+
+def _octile_table(shape, goal):
+    di, dj = _offsets(shape, goal)
+    return (di + dj) + (math.sqrt(2) - 2.0) * np.minimum(di, dj)
 
+
+@_vectorized(_manhattan_table)
 def manhattan(a: Cell, b: Cell) -> float:
     """L1 distance: |di| + |dj|. Best for 4-connected, unit-cost moves."""
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
+@_vectorized(_euclidean_table)
 def euclidean(a: Cell, b: Cell) -> float:
     """L2 distance: sqrt(di^2 + dj^2). Best for 4- or 8-connected."""
     di = a[0] - b[0]
     dj = a[1] - b[1]
-    return math.hypot(di, dj)
+    return math.sqrt(di * di + dj * dj)   # exact for integer cells, like the table
 
+@_vectorized(_chebyshev_table)
 def chebyshev(a: Cell, b: Cell) -> float:
     """L∞ distance: max(|di|, |dj|). Best for 8-connected when diag cost==1."""
     return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
 
+@_vectorized(_octile_table)
 def octile(a: Cell, b: Cell) -> float:
     """
     Octile metric for 8-connected grids where diagonal step cost = sqrt(2) and
@@ -37,7 +95,7 @@ def octile(a: Cell, b: Cell) -> float:
     """
     di = abs(a[0] - b[0])
     dj = abs(a[1] - b[1])
-    return (di + dj) - (math.sqrt(2) - 1.0) * min(di, dj)
+    return (di + dj) + (math.sqrt(2) - 2.0) * min(di, dj)
 
 # Optional: Weighted A*
 def weighted(h: Heuristic, epsilon: float) -> Heuristic:
@@ -49,6 +107,11 @@ def weighted(h: Heuristic, epsilon: float) -> Heuristic:
         raise ValueError("epsilon must be >= 1.0 for Weighted A*")
     def h_w(a: Cell, b: Cell) -> float:
         return epsilon * h(a, b)
+    base = getattr(h, "table", None)
+    if base is not None:
+        h_w.table = lambda shape, goal: epsilon * base(shape, goal)
+        # equal for every weighted(h, epsilon), so tables are shared
+        h_w.table_key = ("weighted", _weak(getattr(h, "table_key", h)), epsilon)
     return h_w
 
 # Registry to select by name
@@ -57,4 +120,290 @@ REGISTRY = {
     "euclidean": euclidean,
     "chebyshev": chebyshev,
     "octile": octile,
-}
\ No newline at end of file
+}
+
+
+# -------- per-goal tables --------
+class HeuristicTable:
+    """
+    LRU of full-grid heuristic arrays keyed by (heuristic, shape, goal).
+
+    A table costs a full pass over the grid (and 8 bytes per cell), which
+    only pays off for searches expanding a sizeable part of the map, so
+    `get` builds one only when asked (`build=True`); otherwise it returns a
+    cached table or None. It also returns None when the heuristic has no
+    `table` attribute or one table would exceed `max_bytes`; callers then
+    fall back to calling the heuristic. Cached tables are evicted (least
+    recently used first) to stay within `maxsize` entries and `max_bytes`
+    in total. Tables are read-only.
+
+    Safe to share between threads. Keys refer to heuristics weakly, so a
+    cached table does not keep a heuristic (e.g. a LandmarkHeuristic and its
+    distance arrays) alive; entries of collected heuristics are dropped on
+    the next build.
+    """
+
+    def __init__(self, maxsize: int = 8, max_bytes: int = 256 << 20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._tables: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        heuristic: Heuristic,
+        shape: Tuple[int, int],
+        goal: Cell,
+        build: bool = True,
+    ) -> Optional[np.ndarray]:
+        table_fn = getattr(heuristic, "table", None)
+        if table_fn is None or shape[0] * shape[1] * 8 > self.max_bytes:
+            return None
+        key = (_weak(getattr(heuristic, "table_key", heuristic)), tuple(shape), tuple(goal))
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self.hits += 1
+                self._tables.move_to_end(key)
+                return table
+            self.misses += 1
+        if not build:
+            return None
+        table = np.ascontiguousarray(table_fn(tuple(shape), tuple(goal)), dtype=np.float64)
+        table.flags.writeable = False
+        with self._lock:
+            for stale in [k for k in self._tables if _collected(k[0])]:
+                self._bytes -= self._tables.pop(stale).nbytes
+            if key not in self._tables:
+                self._tables[key] = table
+                self._bytes += table.nbytes
+            table = self._tables[key]
+            self._tables.move_to_end(key)
+            while len(self._tables) > self.maxsize or self._bytes > self.max_bytes:
+                self._bytes -= self._tables.popitem(last=False)[1].nbytes
+        return table
+
+    def for_search(
+        self,
+        heuristic: Heuristic,
+        shape: Tuple[int, int],
+        goal: Cell,
+        use_table: Optional[bool],
+    ) -> Optional[np.ndarray]:
+        """
+        The table a planner's `use_table` option asks for: None uses only a
+        cached table, True builds one, False never uses one. With True, a
+        table that cannot be had (no `table` attribute, or over `max_bytes`)
+        warns (RuntimeWarning) before returning None.
+        """
+        if use_table is False:
+            return None
+        table = self.get(heuristic, shape, goal, build=bool(use_table))
+        if table is None and use_table:
+            reason = ("has no table" if getattr(heuristic, "table", None) is None
+                      else f"table for shape {tuple(shape)} exceeds max_bytes={self.max_bytes}")
+            warnings.warn(f"use_table=True ignored: heuristic {reason}", RuntimeWarning, stacklevel=3)
+        return table
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self._bytes = 0
+
+
+def _weak(obj: Hashable) -> Hashable:
+    """A weak reference to obj when it supports one (equal for the same live obj)."""
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return obj
+
+
+def _collected(key: Hashable) -> bool:
+    if isinstance(key, weakref.ref):
+        return key() is None
+    return isinstance(key, tuple) and any(_collected(k) for k in key)
+
+
+# Shared by the planners
+TABLES = HeuristicTable()
+
+
+# -------- ALT landmarks --------
+def landmark_key(
+    grid_map: "GridMap",
+    cost_fn: Callable,
+    connectivity: int,
+    cost_key: Optional[str] = None,
+) -> str:
+    """
+    Hash identifying what landmark distances depend on: the grid, the
+    connectivity and, for a CostField, its multipliers and step costs. Other
+    cost functions cannot be hashed: name them with `cost_key` (change it
+    whenever the function changes), else ValueError.
+    """
+    from .costs import CostField
+
+    if cost_key is None and not isinstance(cost_fn, CostField):
+        raise ValueError("cost_fn is not a CostField: pass a cost_key identifying it")
+    digest = hashlib.sha256()
+    grid = np.ascontiguousarray(grid_map.grid, dtype=np.uint8)
+    digest.update(repr((grid.shape, int(connectivity), cost_key)).encode())
+    digest.update(grid.tobytes())
+    if isinstance(cost_fn, CostField):
+        digest.update(repr((cost_fn.base_step_cost_4, cost_fn.base_step_cost_diag)).encode())
+        digest.update(np.ascontiguousarray(cost_fn.multiplier, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class LandmarkHeuristic:
+    """
+    ALT heuristic (Goldberg & Harrelson 2005): with d(L, n) the exact cost
+    between landmark L and cell n, the triangle inequality gives
+        h(a, b) = max_L |d(L, a) - d(L, b)| <= d(a, b).
+    It is admissible and consistent when costs are symmetric (cost_fn(u, v)
+    == cost_fn(v, u), true of CostField and make_weighted_cost). Cells the
+    landmarks cannot reach contribute nothing, and a cell reachable from a
+    landmark that the other cell is not gets inf (no path between them).
+
+    Build with `LandmarkHeuristic.build`, or `load_or_build` to reuse a saved
+    table. Works as a plain heuristic(a, b) and has a `table`, so
+    `a_star(..., use_table=True)` reads per-goal arrays from the shared
+    TABLES cache.
+    """
+
+    def __init__(self, landmarks: Sequence[Cell], distances: np.ndarray, key: str = ""):
+        distances = np.ascontiguousarray(distances, dtype=np.float64)
+        if distances.ndim != 3 or distances.shape[0] != len(landmarks):
+            raise ValueError("distances must be shaped (len(landmarks), height, width)")
+        self.landmarks: List[Cell] = [tuple(int(x) for x in c) for c in landmarks]
+        self.distances = distances
+        self.key = key
+        self._views = [memoryview(d) for d in distances]
+
+    @classmethod
+    def build(
+        cls,
+        grid_map: "GridMap",
+        cost_fn: Callable,
+        num_landmarks: int = 8,
+        connectivity: int = 8,
+        seed_cell: Optional[Cell] = None,
+        cost_key: Optional[str] = None,
+    ) -> "LandmarkHeuristic":
+        """
+        Pick landmarks by farthest-point selection and compute their exact
+        distance arrays (one reverse Dijkstra each, see cost_to_go).
+
+        The first landmark is the cell farthest from `seed_cell` (default:
+        the first free cell in row-major order); each next one maximizes the
+        distance to its nearest landmark chosen so far. Only the seed's
+        connected region gets landmarks. The result's `key` is
+        `landmark_key(...)`, or "" for a cost function without `cost_key`
+        (such tables cannot be matched to their cost when reloaded).
+        """
+        from .cost_to_go import cost_to_go
+        from .costs import CostField
+
+        if num_landmarks < 1:
+            raise ValueError("num_landmarks must be >= 1")
+        if seed_cell is None:
+            free = np.flatnonzero(np.asarray(grid_map.grid).ravel() == 0)
+            if free.size == 0:
+                raise ValueError("map has no free cell")
+            seed_cell = divmod(int(free[0]), grid_map.width)
+        elif not grid_map.is_free(seed_cell):
+            raise ValueError(f"seed cell {seed_cell} is not free")
+
+        def farthest(dist: np.ndarray) -> Optional[Cell]:
+            finite = np.where(np.isfinite(dist), dist, -1.0)
+            idx = int(np.argmax(finite))
+            return divmod(idx, grid_map.width) if finite.flat[idx] > 0 else None
+
+        landmarks: List[Cell] = []
+        distances: List[np.ndarray] = []
+        nearest = cost_to_go(grid_map, seed_cell, cost_fn, connectivity)
+        for _ in range(num_landmarks):
+            cell = farthest(nearest)
+            if cell is None:      # every reachable cell already is a landmark
+                break
+            dist = cost_to_go(grid_map, cell, cost_fn, connectivity)
+            landmarks.append(cell)
+            distances.append(dist)
+            nearest = dist if len(landmarks) == 1 else np.minimum(nearest, dist)
+        if not landmarks:         # a single free cell
+            landmarks.append(seed_cell)
+            distances.append(cost_to_go(grid_map, seed_cell, cost_fn, connectivity))
+        key = ""
+        if cost_key is not None or isinstance(cost_fn, CostField):
+            key = landmark_key(grid_map, cost_fn, connectivity, cost_key)
+        return cls(landmarks, np.stack(distances), key)
+
+    # -------- heuristic --------
+    def __call__(self, a: Cell, b: Cell) -> float:
+        best = 0.0
+        for d in self._views:
+            diff = abs(d[a] - d[b])
+            if diff > best:          # nan (both unreachable) never wins
+                best = diff
+        return best
+
+    def table(self, shape: Tuple[int, int], goal: Cell) -> np.ndarray:
+        if tuple(shape) != self.distances.shape[1:]:
+            raise ValueError(f"landmark tables are for shape {self.distances.shape[1:]}")
+        # one landmark at a time: no (L, H, W) temporary
+        best = np.zeros(self.distances.shape[1:])
+        diff = np.empty_like(best)
+        with np.errstate(invalid="ignore"):
+            for d in self.distances:
+                np.subtract(d, d[goal[0], goal[1]], out=diff)
+                np.abs(diff, out=diff)
+                np.fmax(best, diff, out=best)    # nan (both unreachable) never wins
+        return best
+
+    # -------- persistence --------
+    def save(self, path: str | Path) -> None:
+        """Write landmarks, distances and the map key to an .npz file."""
+        with open(path, "wb") as f:
+            np.savez(f, landmarks=np.asarray(self.landmarks, dtype=np.int64).reshape(-1, 2),
+                     distances=self.distances, key=np.array(self.key))
+
+    @classmethod
+    def load(cls, path: str | Path, expected_key: Optional[str] = None) -> "LandmarkHeuristic":
+        """Read a saved table; ValueError if `expected_key` is given and differs."""
+        with np.load(path) as data:
+            key = str(data["key"])
+            if expected_key is not None and key != expected_key:
+                raise ValueError(f"landmark table {path} was built for a different map or cost")
+            return cls([tuple(c) for c in data["landmarks"]], data["distances"], key)
+
+    @classmethod
+    def load_or_build(
+        cls,
+        path: str | Path,
+        grid_map: "GridMap",
+        cost_fn: Callable,
+        num_landmarks: int = 8,
+        connectivity: int = 8,
+        seed_cell: Optional[Cell] = None,
+        cost_key: Optional[str] = None,
+    ) -> "LandmarkHeuristic":
+        """
+        Load `path` if it was built for this map and cost, else build and save
+        it. A cost function that is not a CostField needs a `cost_key` naming
+        it (see landmark_key), else ValueError: its table could not be told
+        apart from one built for another cost.
+        """
+        key = landmark_key(grid_map, cost_fn, connectivity, cost_key)
+        path = Path(path)
+        if path.exists():
+            try:
+                return cls.load(path, expected_key=key)
+            except (ValueError, OSError, KeyError):
+                pass
+        alt = cls.build(grid_map, cost_fn, num_landmarks, connectivity, seed_cell, cost_key)
+        alt.save(path)
+        return alt
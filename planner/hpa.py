@@ -0,0 +1,424 @@
+# planner/hpa.py
+"""
+Hierarchical path-finding A* (HPA*, Botea, Müller & Schaeffer 2004).
+
+The map is cut into square clusters. Where two neighboring clusters share a
+run of free cells along their border, the run becomes an entrance with one
+transition (two for wide runs); the cells on either side of a transition are
+the nodes of an abstract graph. Nodes inside one cluster are linked by their
+cluster-restricted shortest distance. A query inserts start and goal into
+the abstract graph, searches it, and refines each abstract edge inside a
+cluster with a short A* between its two ends.
+
+Cluster graphs are built on first use and cached; `build()` precomputes all
+of them. Edits made through `GridMap.set_obstacle` / `clear_cell` are read
+from the map's journal on the next query and only the touched clusters (and
+their direct neighbors, whose shared entrances may have moved) are rebuilt.
+
+Paths are valid moves of `GridMap.get_neighbors` but not always optimal:
+crossings are restricted to the chosen transitions. `path_cost_ratio` measures
+the penalty against flat `a_star`.
+"""
+
+from __future__ import annotations
+import heapq
+import itertools
+import math
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .a_star import Cell, CostFn, Heuristic, a_star
+from .costs import CostField
+from .grid_map import GridMap
+
+Cluster = Tuple[int, int]
+Edges = List[Tuple[Cell, float]]
+
+# Cluster move graphs kept around for start/goal insertion and refinement.
+_LOCAL_CACHE_SIZE = 64
+
+
+class HierarchicalMap:
+    """
+    HPA* abstraction of a GridMap.
+
+    Parameters
+    ----------
+    grid_map : GridMap
+        Map to plan on.
+    heuristic : callable(u, v) -> float
+        Admissible estimate for `cost_fn`; used on the abstract graph.
+    cost_fn : callable(u, v) -> float
+        Transition cost from u to v.
+    connectivity : int
+        4 or 8 neighbor connectivity.
+    cluster_size : int
+        Side of a square cluster, in cells.
+    max_entrance_width : int
+        Runs of free border cells shorter than this get one transition at
+        their middle; longer runs get one at each end.
+    """
+
+    def __init__(
+        self,
+        grid_map: GridMap,
+        heuristic: Heuristic,
+        cost_fn: CostFn,
+        connectivity: int = 8,
+        cluster_size: int = 16,
+        max_entrance_width: int = 6,
+    ):
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2")
+        self.grid_map = grid_map
+        self.heuristic = heuristic
+        self.cost_fn = cost_fn
+        self.connectivity = connectivity
+        self.cluster_size = int(cluster_size)
+        self.max_entrance_width = int(max_entrance_width)
+        self.rows = -(-grid_map.height // self.cluster_size)
+        self.cols = -(-grid_map.width // self.cluster_size)
+        self.expansions = 0       # abstract nodes expanded by the last query
+        self._reset()
+
+    # -------- public API --------
+    def build(self) -> None:
+        """Precompute every cluster graph (otherwise built on first use)."""
+        self.refresh()
+        for ci in range(self.rows):
+            for cj in range(self.cols):
+                self._graph((ci, cj))
+
+    def refresh(self) -> None:
+        """Apply map edits made since the last query; rebuild what they touch."""
+        changed = self.grid_map.changes_since(self._version)
+        if changed is None:
+            self._reset()
+            return
+        self._version = self.grid_map.version
+        if not changed:
+            return
+
+        touched: Set[Cluster] = set()
+        for i, j in changed:
+            # the 3x3 around an edit covers every edge it can affect
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    cell = (i + di, j + dj)
+                    if self.grid_map.in_bounds(cell):
+                        touched.add(self.cluster_of(cell))
+        stale = set(touched)
+        for c in touched:
+            for other in self._adjacent(c):
+                self._transitions.pop(_boundary_key(c, other), None)
+                stale.add(other)
+        for c in stale:
+            self._graphs.pop(c, None)
+
+    def plan(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """
+        Path start -> goal (inclusive) through the abstract graph, refined to
+        cells; None if unreachable.
+        """
+        self.refresh()
+        gm = self.grid_map
+        start, goal = tuple(start), tuple(goal)
+        if not gm.is_free(start) or not gm.is_free(goal):
+            return None
+        if start == goal:
+            return [start]
+
+        c_start, c_goal = self.cluster_of(start), self.cluster_of(goal)
+        start_edges = self._edges_to_nodes(start, c_start, extra=goal if c_start == c_goal else None)
+        into_goal = self._local(c_goal).search(goal, self._graph(c_goal), reverse=True)
+
+        abstract = self._abstract_search(start, goal, start_edges, into_goal)
+        if abstract is None:
+            return None
+        return self._refine(abstract)
+
+    def cluster_of(self, cell: Cell) -> Cluster:
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def node_count(self) -> int:
+        """Abstract nodes in the clusters built so far."""
+        return sum(len(g) for g in self._graphs.values())
+
+    # -------- abstraction --------
+    def _reset(self) -> None:
+        self._version = self.grid_map.version
+        # boundary (cluster_a, cluster_b), a < b -> [(cell in a, cell in b)]
+        self._transitions: Dict[Tuple[Cluster, Cluster], List[Tuple[Cell, Cell]]] = {}
+        # cluster -> node -> outgoing edges (intra-cluster and inter-cluster)
+        self._graphs: Dict[Cluster, Dict[Cell, Edges]] = {}
+        self._locals: "OrderedDict[Tuple[Cluster, int], _LocalGraph]" = OrderedDict()
+
+    def _bounds(self, cluster: Cluster) -> Tuple[int, int, int, int]:
+        S = self.cluster_size
+        r0, c0 = cluster[0] * S, cluster[1] * S
+        return r0, min(r0 + S, self.grid_map.height), c0, min(c0 + S, self.grid_map.width)
+
+    def _adjacent(self, cluster: Cluster) -> Iterable[Cluster]:
+        ci, cj = cluster
+        for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            if 0 <= ci + di < self.rows and 0 <= cj + dj < self.cols:
+                yield (ci + di, cj + dj)
+
+    def _boundary(self, a: Cluster, b: Cluster) -> List[Tuple[Cell, Cell]]:
+        """Transitions across the border of adjacent clusters a < b (cached)."""
+        key = (a, b)
+        found = self._transitions.get(key)
+        if found is not None:
+            return found
+
+        grid = self.grid_map.grid
+        r0, r1, c0, c1 = self._bounds(a)
+        if b[0] == a[0]:      # b to the right: border between columns c1-1 and c1
+            free = (grid[r0:r1, c1 - 1] == 0) & (grid[r0:r1, c1] == 0)
+            pair = lambda t: ((r0 + t, c1 - 1), (r0 + t, c1))
+        else:                 # b below: border between rows r1-1 and r1
+            free = (grid[r1 - 1, c0:c1] == 0) & (grid[r1, c0:c1] == 0)
+            pair = lambda t: ((r1 - 1, c0 + t), (r1, c0 + t))
+
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], free.view(np.int8), [0]))))
+        found = []
+        for s, e in zip(edges[::2], edges[1::2]):
+            if e - s < self.max_entrance_width:
+                found.append(pair((s + e - 1) // 2))
+            else:
+                found.append(pair(s))
+                found.append(pair(e - 1))
+        self._transitions[key] = found
+        return found
+
+    def _graph(self, cluster: Cluster) -> Dict[Cell, Edges]:
+        """Abstract nodes of a cluster with their outgoing edges (cached)."""
+        graph = self._graphs.get(cluster)
+        if graph is not None:
+            return graph
+
+        graph = {}
+        for other in self._adjacent(cluster):
+            if cluster < other:
+                pairs = self._boundary(cluster, other)
+            else:
+                pairs = [(b, a) for a, b in self._boundary(other, cluster)]
+            for mine, theirs in pairs:
+                graph.setdefault(mine, []).append((theirs, self.cost_fn(mine, theirs)))
+
+        if len(graph) > 1:
+            local = self._local(cluster)
+            nodes = list(graph)
+            for node in nodes:
+                dist = local.search(node, nodes)
+                graph[node].extend((n, d) for n, d in dist.items() if n != node)
+        self._graphs[cluster] = graph
+        return graph
+
+    def _local(self, cluster: Cluster) -> "_LocalGraph":
+        """Move graph of a cluster; the last few are kept for query-time searches."""
+        key = (cluster, self.grid_map.version)
+        local = self._locals.get(key)
+        if local is None:
+            local = self._locals[key] = _LocalGraph(self, cluster)
+            while len(self._locals) > _LOCAL_CACHE_SIZE:
+                self._locals.popitem(last=False)
+        else:
+            self._locals.move_to_end(key)
+        return local
+
+    def _edges_to_nodes(self, cell: Cell, cluster: Cluster, extra: Optional[Cell]) -> Edges:
+        targets = list(self._graph(cluster))
+        if extra is not None:
+            targets.append(extra)
+        dist = self._local(cluster).search(cell, targets)
+        return [(n, d) for n, d in dist.items() if n != cell]
+
+    def _abstract_search(
+        self, start: Cell, goal: Cell, start_edges: Edges, into_goal: Dict[Cell, float],
+    ) -> Optional[List[Cell]]:
+        h = self.heuristic
+        g: Dict[Cell, float] = {start: 0.0}
+        came_from: Dict[Cell, Cell] = {}
+        closed: Set[Cell] = set()
+        tie = itertools.count()
+        heap = [(h(start, goal), next(tie), start)]
+        self.expansions = 0
+
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == goal:
+                path = [u]
+                while u in came_from:
+                    u = came_from[u]
+                    path.append(u)
+                path.reverse()
+                return path
+            closed.add(u)
+            self.expansions += 1
+
+            edges = list(start_edges) if u == start else []
+            graph = self._graph(self.cluster_of(u))
+            edges.extend(graph.get(u, ()))
+            if u in into_goal:
+                edges.append((goal, into_goal[u]))
+
+            g_u = g[u]
+            for v, c in edges:
+                if v in closed:
+                    continue
+                nd = g_u + c
+                if nd < g.get(v, math.inf):
+                    g[v] = nd
+                    came_from[v] = u
+                    heapq.heappush(heap, (nd + h(v, goal), next(tie), v))
+        return None
+
+    def _refine(self, abstract: List[Cell]) -> List[Cell]:
+        path = [abstract[0]]
+        for u, v in zip(abstract, abstract[1:]):
+            cluster = self.cluster_of(u)
+            if self.cluster_of(v) != cluster:
+                path.append(v)          # inter-cluster edge: adjacent cells
+                continue
+            # A* between nearby cells; never costlier than the abstract edge,
+            # which is a path inside the cluster
+            segment = a_star(self.grid_map, u, v, heuristic=self.heuristic,
+                             cost_fn=self.cost_fn, connectivity=self.connectivity,
+                             use_table=False)
+            path.extend(segment[1:])
+        return path
+
+
+class _LocalGraph:
+    """
+    Moves that stay inside one cluster, as adjacency lists over local ids
+    (i - r0) * w + (j - c0). Legality (including the corner rule, which may
+    look at cells just outside the cluster) is evaluated with array ops over
+    the cluster window; a CostField is priced the same way, other costs are
+    called once per edge.
+    """
+
+    def __init__(self, hmap: HierarchicalMap, cluster: Cluster):
+        r0, r1, c0, c1 = hmap._bounds(cluster)
+        h, w = r1 - r0, c1 - c0
+        gm = hmap.grid_map
+        self.r0, self.c0, self.w = r0, c0, w
+
+        # occupancy of the window grown by one cell; off-map counts as blocked
+        blocked = np.ones((h + 2, w + 2), dtype=bool)
+        gr0, gr1 = max(r0 - 1, 0), min(r1 + 1, gm.height)
+        gc0, gc1 = max(c0 - 1, 0), min(c1 + 1, gm.width)
+        blocked[gr0 - r0 + 1:gr1 - r0 + 1, gc0 - c0 + 1:gc1 - c0 + 1] = gm.grid[gr0:gr1, gc0:gc1] != 0
+        # destinations must be free and inside the cluster
+        inside = np.zeros((h + 2, w + 2), dtype=bool)
+        inside[1:-1, 1:-1] = ~blocked[1:-1, 1:-1]
+        free = inside[1:-1, 1:-1]
+
+        cost_fn = hmap.cost_fn
+        if isinstance(cost_fn, CostField):
+            mult = np.asarray(cost_fn.multiplier[r0:r1, c0:c1], dtype=np.float64).ravel()
+
+        steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        if hmap.connectivity == 8:
+            steps += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        src_parts, dst_parts, cost_parts = [], [], []
+        for di, dj in steps:
+            ok = free & inside[1 + di:h + 1 + di, 1 + dj:w + 1 + dj]
+            if di and dj:
+                ok &= ~(blocked[1 + di:h + 1 + di, 1:w + 1] & blocked[1:h + 1, 1 + dj:w + 1 + dj])
+            src = np.flatnonzero(ok)
+            dst = src + (di * w + dj)
+            if isinstance(cost_fn, CostField):
+                step = cost_fn.base_step_cost_diag if di and dj else cost_fn.base_step_cost_4
+                costs = step * np.maximum(mult[src], mult[dst])
+            else:
+                costs = np.array([cost_fn(self._cell(u), self._cell(v))
+                                  for u, v in zip(src.tolist(), dst.tolist())], dtype=np.float64)
+            src_parts.append(src)
+            dst_parts.append(dst)
+            cost_parts.append(costs)
+
+        self.n = h * w
+        self._edges = (np.concatenate(src_parts), np.concatenate(dst_parts), np.concatenate(cost_parts))
+        self.fwd = self._adjacency(*self._edges)
+        self._rev: Optional[List[list]] = None
+
+    def _adjacency(self, src: np.ndarray, dst: np.ndarray, costs: np.ndarray) -> List[list]:
+        order = np.argsort(src, kind="stable")
+        pairs = list(zip(dst[order].tolist(), costs[order].tolist()))
+        bounds = np.searchsorted(src[order], np.arange(self.n + 1)).tolist()
+        return [pairs[a:b] for a, b in zip(bounds, bounds[1:])]
+
+    @property
+    def rev(self) -> List[list]:
+        """Incoming edges per cell: rev[v] holds (u, cost(u, v))."""
+        if self._rev is None:
+            src, dst, costs = self._edges
+            self._rev = self._adjacency(dst, src, costs)
+        return self._rev
+
+    def _id(self, cell: Cell) -> int:
+        return (cell[0] - self.r0) * self.w + (cell[1] - self.c0)
+
+    def _cell(self, idx: int) -> Cell:
+        return (self.r0 + idx // self.w, self.c0 + idx % self.w)
+
+    def search(
+        self, source: Cell, targets: Iterable[Cell], reverse: bool = False,
+    ) -> Dict[Cell, float]:
+        """
+        Cluster-restricted Dijkstra: cost source -> each reachable target
+        (target -> source with reverse=True), stopping once all are settled.
+        """
+        adj = self.rev if reverse else self.fwd
+        targets = {self._id(t) for t in targets}
+        dist = [math.inf] * self.n
+        done = [False] * self.n
+        s = self._id(source)
+        dist[s] = 0.0
+        found: Dict[Cell, float] = {}
+        heap = [(0.0, s)]
+        while heap and len(found) < len(targets):
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            if u in targets:
+                found[self._cell(u)] = d
+            for v, c in adj[u]:
+                nd = d + c
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return found
+
+
+def path_cost_ratio(
+    hmap: HierarchicalMap,
+    pairs: Iterable[Tuple[Cell, Cell]],
+) -> Tuple[float, float]:
+    """
+    (mean, max) of HPA* path cost over optimal `a_star` cost, over the pairs
+    both planners solve (pairs with start == goal are skipped).
+    """
+    ratios = []
+    for start, goal in pairs:
+        flat = a_star(hmap.grid_map, start, goal, heuristic=hmap.heuristic,
+                      cost_fn=hmap.cost_fn, connectivity=hmap.connectivity)
+        hier = hmap.plan(start, goal)
+        if flat is None or hier is None or len(flat) < 2:
+            continue
+        cost = lambda p: sum(hmap.cost_fn(a, b) for a, b in zip(p, p[1:]))
+        ratios.append(cost(hier) / cost(flat))
+    if not ratios:
+        return (1.0, 1.0)
+    return (float(np.mean(ratios)), float(np.max(ratios)))
+
+
+def _boundary_key(a: Cluster, b: Cluster) -> Tuple[Cluster, Cluster]:
+    return (a, b) if a < b else (b, a)
@@ -0,0 +1,87 @@
+# planner/instrumentation.py
+"""
+Search statistics and export hooks.
+
+Pass a `SearchStats` to a planner (e.g. `a_star(..., stats=SearchStats())`)
+to record why and how a search ended: the outcome, expansions, heap traffic,
+peak open-set size, and time spent generating neighbors, pricing edges and
+evaluating the heuristic. With `stats=None` (the default) planners skip those
+hooks and pay only a flag check; `SearchStats(timing=False)` keeps the cheap
+counters and skips the timers.
+
+When a search finishes, the stats are handed to every sink in `stats.sinks`.
+A sink is any object with `emit(stats)`; adapt it to your metrics pipeline.
+"""
+
+from __future__ import annotations
+import logging
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Protocol, Union
+
+# -------- outcomes --------
+FOUND = "found"
+START_BLOCKED = "start_blocked"     # start occupied or out of bounds
+GOAL_BLOCKED = "goal_blocked"       # goal occupied or out of bounds
+MAX_EXPANSIONS = "max_expansions"   # gave up at the expansion cap
+UNREACHABLE = "unreachable"         # open set exhausted without reaching goal
+
+
+class StatsSink(Protocol):
+    """Receives the stats of every finished search."""
+
+    def emit(self, stats: "SearchStats") -> None:
+        ...
+
+
+@dataclass
+class SearchStats:
+    """Counters and timers for one search (seconds for times)."""
+    planner: str = ""
+    outcome: str = ""
+    expansions: int = 0
+    pushes: int = 0
+    stale_pops: int = 0          # popped entries for already-closed cells
+    peak_open: int = 0           # largest heap size seen
+    path_length: int = 0         # cells in the returned path, 0 if none
+    time_total: float = 0.0
+    time_neighbors: float = 0.0
+    time_cost: float = 0.0
+    time_heuristic: float = 0.0
+    timing: bool = field(default=True, compare=False)   # False: counters only, no clock reads
+    sinks: List[StatsSink] = field(default_factory=list, repr=False, compare=False)
+
+    def as_dict(self) -> Dict[str, Union[str, int, float]]:
+        """Flat record of every counter (options and sinks excluded, nothing deep-copied)."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name not in ("timing", "sinks")}
+
+    def finish(self, outcome: str) -> None:
+        """Set the outcome and hand the stats to every sink."""
+        self.outcome = outcome
+        for sink in self.sinks:
+            sink.emit(self)
+
+
+class ListSink:
+    """Keeps every emitted record (as_dict snapshots), e.g. for benchmarks."""
+
+    def __init__(self):
+        self.records: List[Dict[str, Union[str, int, float]]] = []
+
+    def emit(self, stats: SearchStats) -> None:
+        self.records.append(stats.as_dict())
+
+
+class LoggingSink:
+    """Logs one line per search."""
+
+    def __init__(self, logger: Union[logging.Logger, str] = "planner.search", level: int = logging.INFO):
+        self.logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+        self.level = level
+
+    def emit(self, stats: SearchStats) -> None:
+        self.logger.log(
+            self.level,
+            "%s %s: %d expansions, %d pushes, %d stale pops, peak open %d, %.3f ms",
+            stats.planner, stats.outcome, stats.expansions, stats.pushes,
+            stats.stale_pops, stats.peak_open, stats.time_total * 1e3,
+        )
@@ -0,0 +1,229 @@
+# planner/io/bundle.py
+"""
+Compiled map bundles: one memory-mappable file per ROS map holding the
+thresholded grid, inflated layers and the obstacle distance field, so a
+process can start planning without decoding the image or recomputing them.
+
+    <stem>.mapbundle  (next to <stem>.yaml)
+
+    magic "PLANBNDL" | format version (u4) | header length (u4) | JSON header
+    | arrays, each starting on a 64-byte boundary
+
+The header records the map metadata, each array's offset/shape/dtype, and a
+key: a SHA-256 over the YAML, the image bytes and the compile parameters.
+`load_map_bundle` maps the bundle when its key matches and recompiles it
+when it is missing, stale or unreadable. Arrays are mapped copy-on-write
+(mode "c"), so edits to the GridMap never reach the file.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+
+from planner.costs import compute_obstacle_distance
+from planner.grid_map import GridMap
+from planner.io.map_loader import _load_yaml, load_ros_yaml_map
+
+MAGIC = b"PLANBNDL"
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREAMBLE = struct.Struct("<8sII")   # magic, format version, header length
+
+
+@dataclass
+class MapBundle:
+    """A map loaded from (or just compiled into) a bundle."""
+    grid_map: GridMap                 # grid and `layers` are copy-on-write memmaps
+    distance: Optional[np.ndarray]    # obstacle distance in cells, if compiled
+    key: str
+    path: Path
+    rebuilt: bool                     # True if the bundle was (re)compiled for this load
+
+
+def _params(
+    layers: Optional[Mapping[str, int]],
+    footprint: str,
+    distance: bool,
+    connectivity: int,
+    metric: str,
+    distance_dtype: str,
+) -> Dict:
+    return {
+        "layers": {str(k): int(v) for k, v in sorted((layers or {}).items())},
+        "footprint": footprint,
+        "distance": bool(distance),
+        "connectivity": int(connectivity),
+        "metric": metric,
+        "distance_dtype": np.dtype(distance_dtype).str,
+    }
+
+
+def bundle_key(yaml_path: str | Path, params: Mapping) -> str:
+    """Hash of the YAML, its image and the compile parameters."""
+    yaml_path = Path(yaml_path)
+    meta = _load_yaml(yaml_path)
+    digest = hashlib.sha256()
+    digest.update(FORMAT_VERSION.to_bytes(4, "little"))
+    digest.update(yaml_path.read_bytes())
+    with open(yaml_path.parent / meta.image, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def default_bundle_path(yaml_path: str | Path) -> Path:
+    return Path(yaml_path).with_suffix(".mapbundle")
+
+
+def compile_map(
+    yaml_path: str | Path,
+    bundle_path: Optional[str | Path] = None,
+    layers: Optional[Mapping[str, int]] = None,
+    footprint: str = "square",
+    distance: bool = True,
+    connectivity: int = 4,
+    metric: str = "grid",
+    distance_dtype: str = "float32",
+) -> Path:
+    """
+    Load the ROS map, compute its derived arrays and write them as a bundle.
+
+    Parameters
+    ----------
+    yaml_path : path
+        ROS map_server YAML.
+    bundle_path : path | None
+        Output file; defaults to `<stem>.mapbundle` beside the YAML.
+    layers : {name: radius_cells} | None
+        Inflated layers to store, made with `GridMap.inflate(radius, footprint)`.
+    distance, connectivity, metric, distance_dtype
+        Whether to store `compute_obstacle_distance(gm, connectivity, metric,
+        dtype=distance_dtype)`.
+
+    Returns
+    -------
+    Path
+        The bundle written. It replaces any previous bundle atomically.
+    """
+    params = _params(layers, footprint, distance, connectivity, metric, distance_dtype)
+    bundle_path = Path(bundle_path) if bundle_path is not None else default_bundle_path(yaml_path)
+    key = bundle_key(yaml_path, params)
+
+    gm = load_ros_yaml_map(yaml_path)
+    arrays: Dict[str, np.ndarray] = {"grid": np.ascontiguousarray(gm.grid)}
+    for name, radius in params["layers"].items():
+        arrays["layer:" + name] = np.ascontiguousarray(gm.inflate(radius, footprint=footprint, layer=name))
+    if distance:
+        arrays["distance"] = compute_obstacle_distance(
+            gm, connectivity=connectivity, metric=metric, dtype=params["distance_dtype"]
+        )
+
+    header = {
+        "key": key,
+        "params": params,
+        "width": gm.width,
+        "height": gm.height,
+        "resolution": gm.resolution,
+        "origin": list(gm.origin),
+        "arrays": {},
+    }
+    # array offsets depend on the header length and vice versa: grow the space
+    # reserved for the header until it fits
+    names = list(arrays)
+    start = 0
+    while True:
+        offset = start
+        for name in names:
+            arr = arrays[name]
+            header["arrays"][name] = {"offset": offset, "shape": list(arr.shape), "dtype": arr.dtype.str}
+            offset = _aligned(offset + arr.nbytes)
+        blob = json.dumps(header).encode()
+        needed = _aligned(_PREAMBLE.size + len(blob))
+        if needed <= start:
+            break
+        start = needed
+
+    tmp = bundle_path.with_name(bundle_path.name + f".tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(blob)))
+        f.write(blob)
+        for name in names:
+            f.seek(header["arrays"][name]["offset"])
+            f.write(arrays[name].tobytes())
+    os.replace(tmp, bundle_path)
+    return bundle_path
+
+
+def read_bundle_header(bundle_path: str | Path) -> Optional[Dict]:
+    """The bundle's JSON header, or None if the file is missing or not a bundle."""
+    try:
+        with open(bundle_path, "rb") as f:
+            magic, version, length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            return json.loads(f.read(length))
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+def open_bundle(bundle_path: str | Path, header: Optional[Dict] = None) -> MapBundle:
+    """Map a bundle without checking whether it is up to date."""
+    bundle_path = Path(bundle_path)
+    header = header or read_bundle_header(bundle_path)
+    if header is None:
+        raise ValueError(f"not a map bundle: {bundle_path}")
+
+    def mapped(name: str) -> np.ndarray:
+        spec = header["arrays"][name]
+        return np.memmap(bundle_path, dtype=np.dtype(spec["dtype"]), mode="c",
+                         offset=spec["offset"], shape=tuple(spec["shape"]))
+
+    gm = GridMap(width=header["width"], height=header["height"],
+                 resolution=header["resolution"], origin=tuple(header["origin"]))
+    gm._adopt_grid(mapped("grid"))       # stays memory-mapped
+    for name in header["arrays"]:
+        if name.startswith("layer:"):
+            gm.layers[name[len("layer:"):]] = mapped(name)
+    distance = mapped("distance") if "distance" in header["arrays"] else None
+    return MapBundle(grid_map=gm, distance=distance, key=header["key"], path=bundle_path, rebuilt=False)
+
+
+def load_map_bundle(
+    yaml_path: str | Path,
+    bundle_path: Optional[str | Path] = None,
+    layers: Optional[Mapping[str, int]] = None,
+    footprint: str = "square",
+    distance: bool = True,
+    connectivity: int = 4,
+    metric: str = "grid",
+    distance_dtype: str = "float32",
+) -> MapBundle:
+    """
+    Map the bundle compiled from `yaml_path` with these parameters (see
+    `compile_map`), recompiling it first if it is missing or stale.
+    """
+    params = _params(layers, footprint, distance, connectivity, metric, distance_dtype)
+    bundle_path = Path(bundle_path) if bundle_path is not None else default_bundle_path(yaml_path)
+    key = bundle_key(yaml_path, params)
+
+    header = read_bundle_header(bundle_path)
+    if header is not None and header.get("key") == key:
+        return open_bundle(bundle_path, header)
+
+    compile_map(yaml_path, bundle_path, layers=layers, footprint=footprint, distance=distance,
+                connectivity=connectivity, metric=metric, distance_dtype=distance_dtype)
+    bundle = open_bundle(bundle_path)
+    bundle.rebuilt = True
+    return bundle
@@ -4,6 +4,8 @@ Map loading utilities for GridMap.
 Supports:
 - ROS map_server YAML + image (PGM/PNG)
 - NumPy binary format (.npy)
+
+With packed=True the loaders return a bit-packed PackedGridMap.
 """
 
 from __future__ import annotations
@@ -15,7 +17,7 @@ import numpy as np
 from PIL import Image
 import yaml
 
-from planner.grid_map import GridMap
+from planner.grid_map import GridMap, PackedGridMap
 
 @dataclass
 class RosMapMeta:
@@ -42,9 +44,9 @@ def _read_gray_image(img_path: Path) -> np.ndarray:
     im = Image.open(img_path).convert("L")
     return np.array(im, dtype=np.uint8)
 
-def load_ros_yaml_map(yaml_path: str | Path) -> GridMap:
+def load_ros_yaml_map(yaml_path: str | Path, packed: bool = False) -> GridMap:
     """
-    Load ROS map_server YAML + image into GridMap.
+    Load ROS map_server YAML + image into GridMap (PackedGridMap if packed).
     Applies thresholds & optional inversion (negate).
     Flips vertically so (0,0) = bottom-left in GridMap.
     """
@@ -67,17 +69,20 @@ def load_ros_yaml_map(yaml_path: str | Path) -> GridMap:
 
     grid = np.flipud(grid)  # flip so bottom-left is (0,0)
     origin_xy = (float(meta.origin[0]), float(meta.origin[1]))
-    gm = GridMap(width=grid.shape[1], height=grid.shape[0],
-                 resolution=meta.resolution, origin=origin_xy)
+    cls = PackedGridMap if packed else GridMap
+    gm = cls(width=grid.shape[1], height=grid.shape[0],
+             resolution=meta.resolution, origin=origin_xy)
     gm.grid = grid
     return gm
 
-def load_npy_map(npy_path: str | Path, resolution: float, origin: Tuple[float, float]) -> GridMap:
+def load_npy_map(npy_path: str | Path, resolution: float, origin: Tuple[float, float],
+                 packed: bool = False) -> GridMap:
     """
     Load .npy binary (H,W) where 1=obstacle, 0=free.
     """
     arr = np.load(npy_path).astype(np.uint8)
-    gm = GridMap(width=arr.shape[1], height=arr.shape[0],
-                 resolution=resolution, origin=origin)
+    cls = PackedGridMap if packed else GridMap
+    gm = cls(width=arr.shape[1], height=arr.shape[0],
+             resolution=resolution, origin=origin)
     gm.grid = arr
     return gm
\ No newline at end of file
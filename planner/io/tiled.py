@@ -0,0 +1,252 @@
+# planner/io/tiled.py
+"""
+Tiled on-disk maps for grids larger than RAM.
+
+A tiled map is a YAML header next to one .npy file holding the occupancy as
+square tiles, shape (tiles_y, tiles_x, tile_size, tile_size), uint8 0/1:
+
+    tiles: campus.tiles.npy
+    tile_size: 256
+    width: 40000
+    height: 30000
+    resolution: 0.05
+    origin: [0.0, 0.0, 0.0]
+
+`write_tiled_map` produces it one band of tile rows at a time, so the source
+grid may itself be a memmap (`np.load(path, mmap_mode="r")`).
+`load_tiled_map` memory-maps the tile file and returns a TiledGridMap, which
+reads a tile only when a cell in it is first queried and keeps at most
+`max_tiles` of them resident (LRU). Edited tiles stay resident and are never
+written back to the file.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from planner.grid_map import Cell, GridMap
+
+TileKey = Tuple[int, int]
+
+
+def _to_tiles(grid: np.ndarray, tile_size: int) -> np.ndarray:
+    """(H, W) grid -> (ny, nx, T, T) uint8 tiles; padding cells are occupied."""
+    H, W = grid.shape
+    ny, nx = -(-H // tile_size), -(-W // tile_size)
+    padded = np.ones((ny * tile_size, nx * tile_size), dtype=np.uint8)
+    padded[:H, :W] = np.asarray(grid) != 0
+    return np.ascontiguousarray(
+        padded.reshape(ny, tile_size, nx, tile_size).transpose(0, 2, 1, 3)
+    )
+
+
+class TiledGridMap(GridMap):
+    """
+    GridMap whose occupancy lives in tiles paged in on demand.
+
+    `tiles` is an array of shape (ny, nx, tile_size, tile_size), typically a
+    read-only memmap from `load_tiled_map`; None starts an all-free map in
+    memory. Cell queries (is_occupied, get_neighbors, so a_star) touch only
+    the tiles they land in; `tiles_loaded` counts tile reads. Edits through
+    set_obstacle/clear_cell are versioned and journaled as in GridMap and pin
+    their tile in memory.
+
+    `grid` assembles a read-only copy of the whole map, reading every tile:
+    whole-array consumers (compute_obstacle_distance, CostField, inflate)
+    work unchanged but lose the laziness. Assigning `grid` replaces the
+    tiles with an in-memory copy. Move masks are off, since they would be a
+    full-size array.
+    """
+
+    use_move_masks = False
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        resolution: float = 1.0,
+        origin: Tuple[float, float] = (0.0, 0.0),
+        tile_size: int = 256,
+        tiles: Optional[np.ndarray] = None,
+        max_tiles: int = 64,
+    ):
+        if tile_size <= 0 or max_tiles <= 0:
+            raise ValueError("tile_size and max_tiles must be positive")
+        self.tile_size = int(tile_size)
+        self.max_tiles = int(max_tiles)
+        self._source = tiles
+        super().__init__(width, height, resolution, origin)
+        expected = (-(-self.height // self.tile_size), -(-self.width // self.tile_size),
+                    self.tile_size, self.tile_size)
+        if self._source.shape != expected:
+            raise ValueError(f"tiles have shape {self._source.shape}, expected {expected}")
+
+    def _init_cells(self) -> None:
+        if self._source is None:
+            self._source = _to_tiles(np.zeros((self.height, self.width), dtype=np.uint8),
+                                     self.tile_size)
+        self._reset_tiles()
+
+    def _reset_tiles(self) -> None:
+        self._cache: "OrderedDict[TileKey, memoryview]" = OrderedDict()
+        self._dirty: Dict[TileKey, memoryview] = {}    # edited tiles, never evicted
+        self._last_key: Optional[TileKey] = None
+        self._last_tile: Optional[memoryview] = None
+        self.tiles_loaded = 0
+
+    # -------- tile cache --------
+    def _tile(self, key: TileKey) -> memoryview:
+        tile = self._dirty.get(key)
+        if tile is not None:
+            return tile
+        tile = self._cache.get(key)
+        if tile is None:
+            tile = memoryview(np.array(self._source[key], dtype=np.uint8))
+            self.tiles_loaded += 1
+            self._cache[key] = tile
+            if len(self._cache) > self.max_tiles:
+                evicted, _ = self._cache.popitem(last=False)
+                if evicted == self._last_key:
+                    self._last_key = self._last_tile = None
+        else:
+            self._cache.move_to_end(key)
+        return tile
+
+    def _writable_tile(self, key: TileKey) -> memoryview:
+        tile = self._dirty.get(key)
+        if tile is None:
+            tile = self._tile(key)
+            self._cache.pop(key, None)
+            self._dirty[key] = tile
+            if key == self._last_key:
+                self._last_tile = tile    # may be a fresh load of an evicted tile
+        return tile
+
+    @property
+    def resident_tiles(self) -> int:
+        return len(self._cache) + len(self._dirty)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of tiles currently held in memory."""
+        return self.resident_tiles * self.tile_size * self.tile_size
+
+    # -------- GridMap storage --------
+    @property
+    def grid(self) -> np.ndarray:
+        tiles = np.array(self._source, dtype=np.uint8)
+        for key, tile in self._dirty.items():
+            tiles[key] = tile
+        ny, nx, T, _ = tiles.shape
+        grid = tiles.transpose(0, 2, 1, 3).reshape(ny * T, nx * T)[:self.height, :self.width].copy()
+        grid.flags.writeable = False
+        return grid
+
+    @grid.setter
+    def grid(self, value: np.ndarray) -> None:
+        self._source = _to_tiles(value, self.tile_size)
+        self._reset_tiles()
+        self.version += 1
+        self._journal.clear()
+        self._journal_floor = self.version
+
+    def is_occupied(self, cell: Cell) -> bool:
+        i, j = cell
+        T = self.tile_size
+        key = (i // T, j // T)
+        if key != self._last_key:
+            self._last_tile = self._tile(key)
+            self._last_key = key
+        return bool(self._last_tile[i % T, j % T])
+
+    def _set(self, cell: Cell, value: int) -> None:
+        if self.in_bounds(cell):
+            i, j = cell
+            T = self.tile_size
+            tile = self._writable_tile((i // T, j // T))
+            if tile[i % T, j % T] != value:
+                tile[i % T, j % T] = value
+                self._record((i, j))
+
+    def _occupied_cells(self, ii: np.ndarray, jj: np.ndarray) -> np.ndarray:
+        return np.array([self.is_occupied(c) for c in zip(ii.tolist(), jj.tolist())], dtype=bool)
+
+    def occupied_region(self, r0: int, r1: int, c0: int, c1: int) -> np.ndarray:
+        T = self.tile_size
+        out = np.empty((r1 - r0, c1 - c0), dtype=bool)
+        for ti in range(r0 // T, (r1 - 1) // T + 1):
+            for tj in range(c0 // T, (c1 - 1) // T + 1):
+                i0, i1 = max(r0, ti * T), min(r1, (ti + 1) * T)
+                j0, j1 = max(c0, tj * T), min(c1, (tj + 1) * T)
+                tile = np.asarray(self._tile((ti, tj)))
+                out[i0 - r0:i1 - r0, j0 - c0:j1 - c0] = tile[i0 - ti * T:i1 - ti * T, j0 - tj * T:j1 - tj * T] != 0
+        return out
+
+    def _write_cells(self, ii: np.ndarray, jj: np.ndarray, value: int) -> None:
+        T = self.tile_size
+        for i, j in zip(ii.tolist(), jj.tolist()):
+            self._writable_tile((i // T, j // T))[i % T, j % T] = value
+
+    def set_obstacle(self, cell: Cell) -> None:
+        self._set(cell, 1)
+
+    def clear_cell(self, cell: Cell) -> None:
+        self._set(cell, 0)
+
+
+# -------- files --------
+def write_tiled_map(
+    yaml_path: str | Path,
+    grid: np.ndarray,
+    resolution: float = 1.0,
+    origin: Tuple[float, float] = (0.0, 0.0),
+    tile_size: int = 256,
+) -> Path:
+    """
+    Write `grid` ((H, W), nonzero = occupied) as a tiled map: `yaml_path` plus
+    `<stem>.tiles.npy` beside it. Returns the tile file path.
+    """
+    yaml_path = Path(yaml_path)
+    tiles_path = yaml_path.with_name(yaml_path.stem + ".tiles.npy")
+    H, W = grid.shape
+    T = int(tile_size)
+    ny, nx = -(-H // T), -(-W // T)
+
+    out = np.lib.format.open_memmap(tiles_path, mode="w+", dtype=np.uint8, shape=(ny, nx, T, T))
+    for ty in range(ny):
+        band = grid[ty * T:(ty + 1) * T]       # one band of tile rows at a time
+        out[ty] = _to_tiles(band, T)[0, :nx]
+    out.flush()
+    del out
+
+    yaml_path.write_text(yaml.safe_dump({
+        "tiles": tiles_path.name,
+        "tile_size": T,
+        "width": int(W),
+        "height": int(H),
+        "resolution": float(resolution),
+        "origin": [float(origin[0]), float(origin[1]), 0.0],
+    }, sort_keys=False))
+    return tiles_path
+
+
+def load_tiled_map(yaml_path: str | Path, max_tiles: int = 64) -> TiledGridMap:
+    """Open a tiled map lazily; no tile is read until it is queried."""
+    yaml_path = Path(yaml_path)
+    with open(yaml_path, "r") as f:
+        cfg = yaml.safe_load(f)
+    tiles = np.load(yaml_path.parent / cfg["tiles"], mmap_mode="r")
+    origin = cfg.get("origin", [0.0, 0.0, 0.0])
+    return TiledGridMap(
+        width=int(cfg["width"]),
+        height=int(cfg["height"]),
+        resolution=float(cfg["resolution"]),
+        origin=(float(origin[0]), float(origin[1])),
+        tile_size=int(cfg["tile_size"]),
+        tiles=tiles,
+        max_tiles=max_tiles,
+    )
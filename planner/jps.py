@@ -0,0 +1,269 @@
+# planner/jps.py
+"""
+Jump Point Search for uniform-cost, 8-connected grids.
+
+Moves cost 1 (orthogonal) or sqrt(2) (diagonal) and follow the corner-cutting
+rule of `GridMap.get_neighbors`: a diagonal step is blocked only when both
+orthogonal cells it passes are blocked. Returned paths have the same cost as
+`a_star(..., heuristic=octile, connectivity=8)` with those step costs, and are
+expanded back to full cell lists.
+
+Pruning rules are not hand-written. For every incoming direction and every
+occupancy pattern of the 8 surrounding cells, the successor set is derived
+from the canonical definition (Harabor & Grastien 2011): neighbor n of x,
+reached from parent p, is pruned if some path p -> n avoiding x is no longer
+than p -> x -> n (strictly shorter when the move into x was diagonal).
+"""
+
+from __future__ import annotations
+import heapq
+import itertools
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .a_star import Cell
+from .a_star_flat import STEPS_8, FlatSearchBuffers, get_buffers
+from .grid_map import GridMap
+from .heuristics import TABLES, octile
+
+SQRT2 = math.sqrt(2.0)
+_EPS = 1e-9
+
+
+def _local_blocked(pattern: int) -> set:
+    return {STEPS_8[b] for b in range(8) if pattern >> b & 1}
+
+
+def _legal_local(blocked: set, a: Cell, b: Cell) -> bool:
+    """Move a -> b inside the 3x3 neighborhood (center is always free)."""
+    if b in blocked:
+        return False
+    di, dj = b[0] - a[0], b[1] - a[1]
+    if di != 0 and dj != 0:
+        return not ((a[0] + di, a[1]) in blocked and (a[0], a[1] + dj) in blocked)
+    return True
+
+
+def _step_cost(a: Cell, b: Cell) -> float:
+    return SQRT2 if a[0] != b[0] and a[1] != b[1] else 1.0
+
+
+def _build_tables() -> Tuple[List[int], List[List[int]], List[List[bool]]]:
+    """
+    legal[pattern]        -> bitmask of legal moves out of the center
+    succ[d][pattern]      -> bitmask of unpruned successors when entered along d
+    forced[d][pattern]    -> succ has something beyond the natural neighbors of d
+    """
+    ring = list(STEPS_8)
+    legal: List[int] = []
+    succ = [[0] * 256 for _ in range(8)]
+    forced = [[False] * 256 for _ in range(8)]
+
+    for pattern in range(256):
+        blocked = _local_blocked(pattern)
+        legal.append(sum(1 << b for b, e in enumerate(ring) if _legal_local(blocked, (0, 0), e)))
+
+        # All-pairs shortest paths among the 8 ring cells, never entering the center.
+        free = [c for c in ring if c not in blocked]
+        dist = {(a, b): (0.0 if a == b else math.inf) for a in free for b in free}
+        for a in free:
+            for b in free:
+                if a != b and max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 and _legal_local(blocked, a, b):
+                    dist[a, b] = _step_cost(a, b)
+        for k in free:
+            for a in free:
+                for b in free:
+                    if dist[a, k] + dist[k, b] < dist[a, b]:
+                        dist[a, b] = dist[a, k] + dist[k, b]
+
+        for d, (di, dj) in enumerate(ring):
+            p = (-di, -dj)
+            if p in blocked:
+                continue
+            diagonal = di != 0 and dj != 0
+            natural = {(di, dj)} | ({(di, 0), (0, dj)} if diagonal else set())
+            via_p = _step_cost(p, (0, 0))
+            mask = 0
+            for b, n in enumerate(ring):
+                if n == p or not (legal[pattern] >> b & 1):
+                    continue
+                via = via_p + _step_cost((0, 0), n)
+                alt = dist[p, n]
+                pruned = alt < via - _EPS if diagonal else alt <= via + _EPS
+                if not pruned:
+                    mask |= 1 << b
+                    if n not in natural:
+                        forced[d][pattern] = True
+            succ[d][pattern] = mask
+    return legal, succ, forced
+
+
+_TABLES = None
+
+
+def _tables():
+    global _TABLES
+    if _TABLES is None:
+        _TABLES = _build_tables()
+    return _TABLES
+
+
+def _direction_index(di: int, dj: int) -> int:
+    return STEPS_8.index(((di > 0) - (di < 0), (dj > 0) - (dj < 0)))
+
+
+def neighbor_patterns(buf: FlatSearchBuffers) -> np.ndarray:
+    """
+    Per padded cell, bit b set if neighbor STEPS_8[b] is blocked (occupied or
+    off-map). Computed from the occupancy already loaded into `buf`.
+    """
+    H, W = buf.height, buf.width
+    occ2d = buf.occ.reshape(H + 2, W + 2)
+    pattern = np.full((H + 2, W + 2), 0xFF, dtype=np.uint8)
+    inner = pattern[1:-1, 1:-1]
+    inner[:] = 0
+    for b, (di, dj) in enumerate(STEPS_8):
+        inner |= occ2d[1 + di:H + 1 + di, 1 + dj:W + 1 + dj] << np.uint8(b)
+    return pattern.ravel()
+
+
+def _expand(jump_points: Sequence[Cell]) -> List[Cell]:
+    """Fill in the straight/diagonal runs between consecutive jump points."""
+    path = [jump_points[0]]
+    for (i0, j0), (i1, j1) in zip(jump_points, jump_points[1:]):
+        si = (i1 > i0) - (i1 < i0)
+        sj = (j1 > j0) - (j1 < j0)
+        i, j = i0, j0
+        while (i, j) != (i1, j1):
+            i += si
+            j += sj
+            path.append((i, j))
+    return path
+
+
+def jps(
+    grid_map: GridMap,
+    start: Cell,
+    goal: Cell,
+    max_expansions: Optional[int] = None,
+    use_table: Optional[bool] = None,
+) -> Optional[List[Cell]]:
+    """
+    Jump Point Search on a GridMap (8-connected, orthogonal cost 1, diagonal
+    cost sqrt(2), octile heuristic).
+
+    Parameters
+    ----------
+    grid_map : GridMap
+        Occupancy grid. Copied (with its neighbor patterns) into per-thread
+        buffers on first use; later calls on the same map only patch the
+        cells edited since (`changes_since`).
+    start, goal : (i, j)
+        Grid indices for start and target.
+    max_expansions : int | None
+        Optional cap on jump-point expansions.
+    use_table : bool | None
+        As for `a_star`: read the octile heuristic from a per-goal table.
+
+    Returns
+    -------
+    list[(i, j)] or None
+        Full cell path from start to goal (inclusive), or None if unreachable.
+    """
+    if not grid_map.is_free(start) or not grid_map.is_free(goal):
+        return None
+
+    legal, succ, forced = _tables()
+    h_table = TABLES.for_search(octile, (grid_map.height, grid_map.width), goal, use_table)
+    if h_table is not None:
+        h_table = memoryview(h_table)
+
+    buf = get_buffers(grid_map.height, grid_map.width)
+    buf.load_map(grid_map)
+    if buf.patterns is None:
+        buf.patterns = neighbor_patterns(buf)
+    gen = buf.next_generation()
+    stride = buf.stride
+    pat = buf.patterns.data
+    g = buf.g.data
+    parent = buf.parent.data
+    seen = buf.seen.data
+    closed = buf.closed.data
+
+    offsets = [di * stride + dj for di, dj in STEPS_8]
+    straight_parts = [
+        (STEPS_8.index((di, 0)), STEPS_8.index((0, dj))) if di and dj else None
+        for di, dj in STEPS_8
+    ]
+
+    start_id = buf.flat(start)
+    goal_id = buf.flat(goal)
+
+    def jump(x: int, d: int) -> int:
+        """Walk from x along d until a jump point; -1 if the walk is blocked."""
+        off = offsets[d]
+        parts = straight_parts[d]
+        forced_d = forced[d]
+        while True:
+            if not legal[pat[x]] >> d & 1:
+                return -1
+            x += off
+            if x == goal_id or forced_d[pat[x]]:
+                return x
+            if parts is not None and (jump(x, parts[0]) != -1 or jump(x, parts[1]) != -1):
+                return x
+
+    g[start_id] = 0.0
+    parent[start_id] = -1
+    seen[start_id] = gen
+
+    # Min-heap entries: (f, g, tie, flat id)
+    open_heap: List[Tuple[float, float, int, int]] = []
+    tie = itertools.count()
+    heapq.heappush(open_heap, (octile(start, goal), 0.0, next(tie), start_id))
+    expansions = 0
+
+    while open_heap:
+        _, g_curr, _, current = heapq.heappop(open_heap)
+        if closed[current] == gen:
+            continue
+        closed[current] = gen
+
+        if current == goal_id:
+            points: List[Cell] = []
+            while current != -1:
+                points.append(buf.cell(current))
+                current = parent[current]
+            points.reverse()
+            return _expand(points)
+
+        expansions += 1
+        if max_expansions is not None and expansions > max_expansions:
+            return None
+
+        cell = buf.cell(current)
+        p = parent[current]
+        if p == -1:
+            moves = legal[pat[current]]
+        else:
+            pc = buf.cell(p)
+            moves = succ[_direction_index(cell[0] - pc[0], cell[1] - pc[1])][pat[current]]
+
+        for d in range(8):
+            if not moves >> d & 1:
+                continue
+            nb = jump(current, d)
+            if nb == -1 or closed[nb] == gen:
+                continue
+            nbr = buf.cell(nb)
+            tentative_g = g_curr + octile(cell, nbr)
+            if tentative_g < (g[nb] if seen[nb] == gen else math.inf):
+                g[nb] = tentative_g
+                parent[nb] = current
+                seen[nb] = gen
+                h = octile(nbr, goal) if h_table is None else h_table[nbr]
+                heapq.heappush(open_heap, (tentative_g + h, tentative_g, next(tie), nb))
+
+    return None
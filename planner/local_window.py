@@ -0,0 +1,212 @@
+# planner/local_window.py
+"""
+Rolling local window onto a global GridMap.
+
+`RollingWindow` is a fixed-size GridMap centered on the robot. Its cells
+live in a circular buffer: global cell (gi, gj) is stored at
+(gi % height, gj % width), so when the window moves only the rows and
+columns that come into view are read from the global map. The buffer is
+never reallocated or shifted. Edits made to the global map through its
+edit methods are picked up from its journal on `refresh`/`recenter`.
+
+Window cells are local indices (0 <= i < height, 0 <= j < width); `origin`
+follows the window, so `world_to_grid`/`grid_to_world` work in world
+coordinates as on any GridMap, and `a_star` runs on the window directly.
+Cells beyond the edge of the global map read as occupied. Edits made on the
+window (set_obstacle(s), clear_cell(s), assigning `grid`, `inflate`) are
+written through to the global map. Cost functions see local cells; wrap a
+global one with `global_cost`.
+"""
+
+from __future__ import annotations
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from .grid_map import Cell, GridMap
+
+
+class RollingWindow(GridMap):
+    """
+    Fixed-size view of `global_map` centered on a global cell.
+
+    Parameters
+    ----------
+    global_map : GridMap
+        The map to view; resolution is shared.
+    width, height : int
+        Window size in cells.
+    center : (i, j)
+        Global cell the window is first centered on.
+    """
+
+    use_move_masks = False    # would be recomputed after every move
+
+    def __init__(self, global_map: GridMap, width: int, height: int, center: Cell):
+        self.global_map = global_map
+        super().__init__(width, height, global_map.resolution, global_map.origin)
+        self.row0 = 0             # global index of local row 0
+        self.col0 = 0             # global index of local column 0
+        self.cells_refreshed = 0  # buffer cells read from the global map
+        self._synced_version: Optional[int] = None
+        self.recenter(center)
+
+    def _init_cells(self) -> None:
+        self._buf = np.ones((self.height, self.width), dtype=np.uint8)
+        self._cells = memoryview(self._buf)
+
+    # -------- coordinates --------
+    def to_global(self, cell: Cell) -> Cell:
+        return (cell[0] + self.row0, cell[1] + self.col0)
+
+    def to_local(self, cell: Cell) -> Cell:
+        return (cell[0] - self.row0, cell[1] - self.col0)
+
+    def global_cost(self, cost_fn: Callable[[Cell, Cell], float]) -> Callable[[Cell, Cell], float]:
+        """Cost function on local cells from one on global cells."""
+        def local_cost(u: Cell, v: Cell) -> float:
+            return cost_fn((u[0] + self.row0, u[1] + self.col0), (v[0] + self.row0, v[1] + self.col0))
+        return local_cost
+
+    # -------- moving --------
+    def recenter(self, center: Cell) -> None:
+        """
+        Center the window on global cell `center`, reading only the rows and
+        columns that come into view (everything if it moved by a full window
+        or more). Local indices shift, so the window's version is bumped as
+        for a replaced grid.
+        """
+        H, W = self.height, self.width
+        r0, c0 = center[0] - H // 2, center[1] - W // 2
+        old_r0, old_c0 = self.row0, self.col0
+        first = self._synced_version is None
+        self.refresh()
+
+        dr, dc = r0 - old_r0, c0 - old_c0
+        if first or abs(dr) >= H or abs(dc) >= W:
+            self._load(r0, r0 + H, c0, c0 + W)
+        else:
+            rows = (r0, r0 + H)     # rows the column strip needs (not in the row strip)
+            if dr > 0:
+                self._load(old_r0 + H, r0 + H, c0, c0 + W)
+                rows = (r0, old_r0 + H)
+            elif dr < 0:
+                self._load(r0, old_r0, c0, c0 + W)
+                rows = (old_r0, r0 + H)
+            if dc > 0:
+                self._load(*rows, old_c0 + W, c0 + W)
+            elif dc < 0:
+                self._load(*rows, c0, old_c0)
+
+        self.row0, self.col0 = r0, c0
+        ox, oy = self.global_map.origin
+        self.origin = (ox + c0 * self.resolution, oy + r0 * self.resolution)
+        if dr or dc or first:
+            self.version += 1
+            self._journal.clear()
+            self._journal_floor = self.version
+
+    def recenter_world(self, x: float, y: float) -> None:
+        """recenter on the global cell containing world point (x, y)."""
+        self.recenter(self.global_map.world_to_grid(x, y))
+
+    def refresh(self) -> None:
+        """Apply edits made to the global map since the last refresh."""
+        gm = self.global_map
+        if self._synced_version is not None and self._synced_version != gm.version:
+            changed = gm.changes_since(self._synced_version)
+            if changed is None:       # grid replaced or journal overflowed
+                self._load(self.row0, self.row0 + self.height, self.col0, self.col0 + self.width)
+            else:
+                for gi, gj in changed:
+                    i, j = gi - self.row0, gj - self.col0
+                    if 0 <= i < self.height and 0 <= j < self.width:
+                        self._buf[gi % self.height, gj % self.width] = gm.is_occupied((gi, gj))
+                        self._record((i, j))
+        self._synced_version = gm.version
+
+    def _load(self, gr0: int, gr1: int, gc0: int, gc1: int) -> None:
+        """Copy global rows gr0:gr1, cols gc0:gc1 into their buffer slots."""
+        if gr0 >= gr1 or gc0 >= gc1:
+            return
+        gm = self.global_map
+        region = np.ones((gr1 - gr0, gc1 - gc0), dtype=np.uint8)
+        r_lo, r_hi = max(gr0, 0), min(gr1, gm.height)
+        c_lo, c_hi = max(gc0, 0), min(gc1, gm.width)
+        if r_lo < r_hi and c_lo < c_hi:
+            region[r_lo - gr0:r_hi - gr0, c_lo - gc0:c_hi - gc0] = gm.occupied_region(r_lo, r_hi, c_lo, c_hi)
+        rows = np.arange(gr0, gr1) % self.height
+        cols = np.arange(gc0, gc1) % self.width
+        self._buf[np.ix_(rows, cols)] = region
+        self.cells_refreshed += region.size
+
+    # -------- GridMap interface --------
+    @property
+    def buffer(self) -> np.ndarray:
+        """
+        Read-only view of the circular buffer (no copy): global cell
+        (gi, gj) is at (gi % height, gj % width), and local cell (i, j) at
+        ((i + row0) % height, (j + col0) % width).
+        """
+        view = self._buf.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def grid(self) -> np.ndarray:
+        """Read-only copy of the window in local order. Unrolls the whole
+        buffer on every access; per-move consumers should read `buffer`."""
+        grid = np.roll(self._buf, (-(self.row0 % self.height), -(self.col0 % self.width)), axis=(0, 1))
+        grid.flags.writeable = False
+        return grid
+
+    @grid.setter
+    def grid(self, value: np.ndarray) -> None:
+        # written through: the cells that differ are set/cleared on the global map
+        value = np.asarray(value)
+        if value.shape != (self.height, self.width):
+            raise ValueError(f"grid must be shaped {(self.height, self.width)}, got {value.shape}")
+        old, new = self.grid != 0, value != 0
+        self.set_obstacles(np.argwhere(new & ~old))
+        self.clear_cells(np.argwhere(old & ~new))
+
+    @property
+    def nbytes(self) -> int:
+        return self._buf.nbytes
+
+    def is_occupied(self, cell: Cell) -> bool:
+        i, j = cell
+        return bool(self._cells[(i + self.row0) % self.height, (j + self.col0) % self.width])
+
+    def set_obstacle(self, cell: Cell) -> None:
+        """Edit the global map at this local cell (and the window with it)."""
+        if self.in_bounds(cell):
+            self.global_map.set_obstacle(self.to_global(cell))
+            self.refresh()
+
+    def clear_cell(self, cell: Cell) -> None:
+        if self.in_bounds(cell):
+            self.global_map.clear_cell(self.to_global(cell))
+            self.refresh()
+
+    def _occupied_cells(self, ii: np.ndarray, jj: np.ndarray) -> np.ndarray:
+        return self._buf[(ii + self.row0) % self.height, (jj + self.col0) % self.width] != 0
+
+    def occupied_region(self, r0: int, r1: int, c0: int, c1: int) -> np.ndarray:
+        return self._occupied_cells(np.arange(r0, r1)[:, None], np.arange(c0, c1)[None, :])
+
+    def _set_many(self, cells: Iterable[Cell], value: int) -> None:
+        # batch edits go to the global map (in global cells), then come back
+        # through its journal like any other global edit
+        idx = np.asarray(cells if isinstance(cells, np.ndarray) else list(cells), dtype=np.int64)
+        idx = idx.reshape(-1, 2)
+        keep = (idx[:, 0] >= 0) & (idx[:, 0] < self.height) & (idx[:, 1] >= 0) & (idx[:, 1] < self.width)
+        glob = idx[keep] + np.array([self.row0, self.col0], dtype=np.int64)
+        if value:
+            self.global_map.set_obstacles(glob)
+        else:
+            self.global_map.clear_cells(glob)
+        self.refresh()
+
+    def _write_cells(self, ii: np.ndarray, jj: np.ndarray, value: int) -> None:
+        raise TypeError("RollingWindow is a view; edit the global map instead")
@@ -0,0 +1,170 @@
+# planner/occupancy.py
+"""
+Probabilistic occupancy mapping from range scans.
+
+`OccupancyLayer` keeps a log-odds grid next to a GridMap. `integrate` takes a
+whole batch of scans (any number of poses, e.g. several robots) and updates
+it in one vectorized pass: cells a beam passes through get `l_free`, the cell
+a beam ends in gets `l_occ` (unless the beam reached max range), and values
+are clamped to [l_min, l_max]. Beams are traced with the raycaster's DDA, so
+every cell a beam crosses is updated once (none skipped at corners), and
+updates are summed with np.bincount, so many beams through one cell all
+count.
+
+`publish` thresholds the log-odds into the GridMap at most every
+`publish_interval` seconds: cells above `occupied_threshold` become obstacles,
+cells below `free_threshold` are cleared, and cells in between (including
+never-observed ones) keep what the map already had, e.g. a loaded static map.
+Small changes go through `set_obstacles`/`clear_cells`, so the map's edit
+journal stays usable for incremental planners (D* Lite, HPA* refresh);
+large ones replace the grid in bulk.
+"""
+
+from __future__ import annotations
+import math
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from .grid_map import JOURNAL_LIMIT, GridMap
+from .raycast import _traverse
+
+
+class OccupancyLayer:
+    """
+    Log-odds occupancy over a GridMap's cells.
+
+    Parameters
+    ----------
+    grid_map : GridMap
+        Map whose resolution/origin define the cells and which `publish`
+        writes into.
+    l_occ, l_free : float
+        Log-odds added for a beam endpoint and for each cell a beam crosses.
+    l_min, l_max : float
+        Clamping bounds, so cells can change their mind quickly.
+    occupied_threshold, free_threshold : float
+        Log-odds above/below which `publish` marks a cell occupied/free.
+    publish_interval : float
+        Minimum seconds between publishes (0 publishes every call).
+    clock : callable() -> float
+        Time source for the throttle (default time.monotonic).
+    """
+
+    def __init__(
+        self,
+        grid_map: GridMap,
+        l_occ: float = 0.85,
+        l_free: float = -0.4,
+        l_min: float = -2.0,
+        l_max: float = 3.5,
+        occupied_threshold: float = 0.7,
+        free_threshold: float = -0.7,
+        publish_interval: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not l_min < 0.0 < l_max:
+            raise ValueError("need l_min < 0 < l_max")
+        if free_threshold > occupied_threshold:
+            raise ValueError("free_threshold must not exceed occupied_threshold")
+        self.grid_map = grid_map
+        self.l_occ = float(l_occ)
+        self.l_free = float(l_free)
+        self.l_min = float(l_min)
+        self.l_max = float(l_max)
+        self.occupied_threshold = float(occupied_threshold)
+        self.free_threshold = float(free_threshold)
+        self.publish_interval = float(publish_interval)
+        self.clock = clock
+        self.log_odds = np.zeros((grid_map.height, grid_map.width), dtype=np.float32)
+        self._last_publish: Optional[float] = None
+        self.scans_integrated = 0
+
+    def probability(self) -> np.ndarray:
+        """Occupancy probability per cell (0.5 = unknown)."""
+        return 1.0 / (1.0 + np.exp(-self.log_odds))
+
+    def integrate(
+        self,
+        poses: np.ndarray,
+        angles: np.ndarray,
+        ranges: np.ndarray,
+        max_range: float,
+        max_cells: int = 1 << 22,
+    ) -> None:
+        """
+        Fuse scans into the log-odds.
+
+        poses : (N, 3) world x, y, theta; angles : (B,) beam angles relative
+        to the heading; ranges : (N, B) meters, as from `raycast.cast_rays`.
+        Ranges >= max_range (or non-finite) are misses: the beam clears free
+        space up to max_range but marks no hit. Beams are traced in chunks of
+        about `max_cells` crossed cells in total, to bound temporary memory.
+        """
+        poses = np.asarray(poses, dtype=np.float64).reshape(-1, 3)
+        angles = np.asarray(angles, dtype=np.float64).ravel()
+        ranges = np.asarray(ranges, dtype=np.float64).reshape(poses.shape[0], angles.size)
+
+        theta = (poses[:, 2:3] + angles[None, :]).ravel()
+        ox = np.repeat(poses[:, 0], angles.size)
+        oy = np.repeat(poses[:, 1], angles.size)
+        r = ranges.ravel()
+        hit = np.isfinite(r) & (r < max_range)
+        r = np.where(hit, r, max_range)
+
+        # a DDA ray crosses at most |di| + |dj| <= sqrt(2) cells per cell length
+        cost = np.cumsum(np.ceil(r / self.grid_map.resolution * math.sqrt(2.0)) + 2)
+        flat = self.log_odds.reshape(-1)
+        lo = 0
+        while lo < r.size:
+            done = cost[lo - 1] if lo else 0.0
+            hi = max(int(np.searchsorted(cost, done + max_cells, side="right")), lo + 1)
+            sl = slice(lo, hi)
+            free_cells, hit_cells = self._beam_cells(ox[sl], oy[sl], theta[sl], r[sl], hit[sl])
+            weights = np.repeat([self.l_free, self.l_occ], [free_cells.size, hit_cells.size])
+            flat += np.bincount(np.concatenate([free_cells, hit_cells]), weights, minlength=flat.size)
+            lo = hi
+        np.clip(self.log_odds, self.l_min, self.l_max, out=self.log_odds)
+        self.scans_integrated += poses.shape[0]
+
+    def _beam_cells(self, ox, oy, theta, r, hit):
+        """Flat indices of the cells each beam crosses (each once per beam,
+        excluding the end cell of a hit) and of the end cells of hits."""
+        gm = self.grid_map
+        res = gm.resolution
+        oi = (oy - gm.origin[1]) / res
+        oj = (ox - gm.origin[0]) / res
+        # a range ending exactly on a cell face (as cast_rays returns) belongs
+        # to the cell behind it
+        t_end = r / res + 1e-6
+        crossed, end = _traverse(gm.height, gm.width, oi, oj, np.sin(theta), np.cos(theta), t_end)
+        on_map = end >= 0
+        free = np.concatenate([crossed, end[on_map & ~hit]])    # a miss clears its last cell too
+        return free, end[on_map & hit]
+
+    # -------- publishing --------
+    def publish(self, force: bool = False) -> bool:
+        """
+        Threshold the log-odds into the GridMap if `publish_interval` has
+        passed since the last publish (or `force`). Returns True if it ran.
+        """
+        now = self.clock()
+        if not force and self._last_publish is not None and \
+                now - self._last_publish < self.publish_interval:
+            return False
+        self._last_publish = now
+
+        gm = self.grid_map
+        current = np.asarray(gm.grid) != 0
+        to_set = np.argwhere((self.log_odds > self.occupied_threshold) & ~current)
+        to_clear = np.argwhere((self.log_odds < self.free_threshold) & current)
+        if len(to_set) + len(to_clear) > JOURNAL_LIMIT // 2:
+            grid = current.astype(np.uint8)
+            grid[tuple(to_set.T)] = 1
+            grid[tuple(to_clear.T)] = 0
+            gm.grid = grid
+        else:
+            gm.set_obstacles(to_set)
+            gm.clear_cells(to_clear)
+        return True
@@ -0,0 +1,203 @@
+# planner/pyramid.py
+"""
+Multi-resolution occupancy pyramid and coarse-to-fine planning.
+
+`MapPyramid` keeps, for each factor f, a GridMap whose cell (i, j) covers
+the f x f block of base cells (i*f .. i*f+f-1, j*f .. j*f+f-1) and is
+occupied if any of them is (max-pooling; blocks hanging over the map edge
+pool only their in-map cells). Levels share the base origin with resolution
+f * base resolution, so `world_to_grid` on a level gives the base cell
+divided by f. Base edits are read from the map's journal on `refresh` and
+only the covering coarse cells are recomputed; those updates go through the
+level's own set_obstacles/clear_cells, so levels are journaled too.
+
+Because pooling is conservative, a free coarse cell has only free cells
+under it, and a path over free coarse cells always refines to a base path
+through their blocks. `CoarseToFinePlanner` uses that: it searches the
+coarsest level first, then each finer level only inside a corridor around
+the previous path. Narrow passages vanish at coarse levels, so a level that
+finds nothing (or whose start/goal block is occupied) is skipped, and a
+blocked corridor falls back to an unrestricted search at that level.
+Paths are valid base moves but not always optimal.
+"""
+
+from __future__ import annotations
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .a_star import Cell, CostFn, Heuristic, a_star
+from .grid_map import GridMap
+from .instrumentation import SearchStats
+
+
+def max_pool(grid: np.ndarray, factor: int) -> np.ndarray:
+    """(H, W) occupancy -> (ceil(H/f), ceil(W/f)) uint8, 1 where any cell is set."""
+    H, W = grid.shape
+    f = int(factor)
+    h, w = -(-H // f), -(-W // f)
+    padded = np.zeros((h * f, w * f), dtype=bool)
+    padded[:H, :W] = np.asarray(grid) != 0
+    return padded.reshape(h, f, w, f).any(axis=(1, 3)).view(np.uint8)
+
+
+class MapPyramid:
+    """
+    Coarse levels of `grid_map`, one per factor.
+
+    Parameters
+    ----------
+    grid_map : GridMap
+        Base map (any storage backend).
+    factors : sequence of int
+        Increasing factors > 1, each dividing the next, e.g. (2, 4).
+    """
+
+    def __init__(self, grid_map: GridMap, factors: Sequence[int] = (2, 4)):
+        factors = tuple(int(f) for f in factors)
+        if not factors or factors[0] < 2 or any(b <= a or b % a for a, b in zip(factors, factors[1:])):
+            raise ValueError("factors must be increasing, > 1 and each divide the next")
+        self.grid_map = grid_map
+        self.factors = factors
+        self.levels: Dict[int, GridMap] = {
+            f: GridMap(-(-grid_map.width // f), -(-grid_map.height // f),
+                       grid_map.resolution * f, grid_map.origin)
+            for f in factors
+        }
+        self._version: Optional[int] = None
+        self.refresh()
+
+    def level(self, factor: int) -> GridMap:
+        """The level for `factor` (1 is the base map)."""
+        return self.grid_map if factor == 1 else self.levels[factor]
+
+    def refresh(self) -> None:
+        """Bring the levels up to date with edits made to the base map."""
+        gm = self.grid_map
+        changed = None if self._version is None else gm.changes_since(self._version)
+        if changed is None:
+            grid, prev = gm.grid, 1
+            for f in self.factors:                     # each level pools the previous one
+                grid = max_pool(grid, f // prev)
+                self.levels[f].grid = grid
+                prev = f
+        elif changed:
+            cells = np.array(changed, dtype=np.int64)
+            for f in self.factors:
+                self._update(f, np.unique(cells // f, axis=0))
+        self._version = gm.version
+
+    def _update(self, f: int, coarse: np.ndarray) -> None:
+        """Recompute the coarse cells `coarse` (n, 2) of level f from the base."""
+        gm = self.grid_map
+        offs = np.arange(f)
+        ii = (coarse[:, 0:1, None] * f + offs[None, :, None]).repeat(f, axis=2)
+        jj = (coarse[:, 1:2, None] * f + offs[None, None, :]).repeat(f, axis=1)
+        inside = (ii < gm.height) & (jj < gm.width)
+        occ = np.zeros(ii.shape, dtype=bool)
+        occ[inside] = gm._occupied_cells(ii[inside], jj[inside])
+        blocked = occ.any(axis=(1, 2))
+        level = self.levels[f]
+        level.set_obstacles(coarse[blocked])
+        level.clear_cells(coarse[~blocked])
+
+
+def _step_cost(u: Cell, v: Cell) -> float:
+    return math.sqrt(2.0) if u[0] != v[0] and u[1] != v[1] else 1.0
+
+
+class CoarseToFinePlanner:
+    """
+    Plan on the pyramid coarsest level first, then refine inside corridors.
+
+    Parameters
+    ----------
+    grid_map : GridMap
+        Base map; its pyramid (`grid_map.pyramid(factors)`) is built on first
+        use and follows later edits.
+    heuristic : callable(u, v) -> float
+        Admissible estimate; used at every level.
+    cost_fn : callable(u, v) -> float
+        Transition cost on base cells. Coarse levels only shape the corridor
+        and use unit/sqrt(2) steps.
+    connectivity : int
+        4 or 8 neighbor connectivity.
+    factors : sequence of int
+        Pyramid factors, as in MapPyramid.
+    corridor : int
+        Corridor half-width around a path, in cells of that path's level.
+    """
+
+    def __init__(
+        self,
+        grid_map: GridMap,
+        heuristic: Heuristic,
+        cost_fn: CostFn,
+        connectivity: int = 8,
+        factors: Sequence[int] = (2, 4),
+        corridor: int = 1,
+    ):
+        if corridor < 0:
+            raise ValueError("corridor must be non-negative")
+        self.grid_map = grid_map
+        self.heuristic = heuristic
+        self.cost_fn = cost_fn
+        self.connectivity = connectivity
+        self.factors = tuple(int(f) for f in factors)
+        self.corridor = int(corridor)
+        self.levels_used: List[int] = []   # factors searched by the last query, coarse first
+        self.fallbacks = 0                 # corridor searches that failed in the last query
+        self.expansions = 0                # nodes expanded by the last query, all levels
+
+    def plan(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """Base path start -> goal (inclusive), or None if unreachable."""
+        gm = self.grid_map
+        start, goal = tuple(start), tuple(goal)
+        self.levels_used = []
+        self.fallbacks = 0
+        self.expansions = 0
+        if not gm.is_free(start) or not gm.is_free(goal):
+            return None
+        pyr = gm.pyramid(self.factors)
+
+        guide: Optional[Tuple[int, List[Cell]]] = None     # (factor, path) to refine
+        for f in sorted(self.factors, reverse=True) + [1]:
+            level = pyr.level(f)
+            s, g = (start[0] // f, start[1] // f), (goal[0] // f, goal[1] // f)
+            if not level.is_free(s) or not level.is_free(g):
+                continue                                   # start/goal block not clear
+            cost = self.cost_fn if f == 1 else _step_cost
+            path = None
+            if guide is not None:
+                path = self._search(level, s, g, cost, self._corridor(pyr, guide, level, f))
+                if path is None:
+                    self.fallbacks += 1
+            if path is None:
+                path = self._search(level, s, g, cost)
+            self.levels_used.append(f)
+            if path is not None:
+                guide = (f, path)
+            elif f == 1:
+                return None
+        return guide[1]
+
+    def _search(
+        self, level: GridMap, s: Cell, g: Cell, cost: CostFn, allowed: Optional[np.ndarray] = None,
+    ) -> Optional[List[Cell]]:
+        stats = SearchStats(timing=False)
+        path = a_star(level, s, g, heuristic=self.heuristic, cost_fn=cost,
+                      connectivity=self.connectivity, stats=stats, allowed=allowed)
+        self.expansions += stats.expansions
+        return path
+
+    def _corridor(self, pyr: MapPyramid, guide: Tuple[int, List[Cell]], level: GridMap, f: int) -> np.ndarray:
+        """Cells of `level` (factor f) within the guide's corridor, as a mask a_star reads."""
+        F, path = guide
+        coarse = pyr.level(F)
+        r = self.corridor
+        near = np.zeros((coarse.height, coarse.width), dtype=np.uint8)
+        for i, j in path:
+            near[max(i - r, 0):i + r + 1, max(j - r, 0):j + r + 1] = 1
+        ratio = F // f
+        return near.repeat(ratio, axis=0).repeat(ratio, axis=1)[:level.height, :level.width]
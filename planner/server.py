@@ -0,0 +1,463 @@
+# planner/server.py
+"""
+Planning service: keeps maps resident and answers queries over a socket.
+
+Clients speak JSON lines over a Unix socket or localhost TCP. Every request
+is one object with an "op" (and optionally an "id", echoed back); every
+response is one line {"id", "ok": true, ...} or {"id", "ok": false, "error"}:
+
+    {"op": "load_map", "name": "lab", "yaml": "maps/lab.yaml", "inflate": 3}
+    {"op": "plan", "map": "lab", "start": [1.0, 2.5], "goal": [8.0, 4.0], "deadline": 0.5}
+      -> {"ok": true, "path": [[x, y], ...] | null, "cost": 12.3, "seconds": 0.004, "merged": false}
+    {"op": "unload_map", "name": "lab"}    {"op": "maps"}    {"op": "ping"}
+
+A loaded map keeps its grid, the inflated planning grid and a CostField in
+memory, so a query costs only its search. `start`/`goal` are world (x, y)
+unless "frame": "grid", in which case they and the returned path are (i, j)
+cells. Requests on one connection run concurrently; match responses by id.
+
+Searches run on a worker pool, never on the event loop: processes by
+default, with the planning arrays copied once into shared memory (see
+planner.batch) and attached by each worker on first use; or threads
+(`executor="thread"`). Identical queries in flight at the same time share
+one search. With threads, searches share the resident planning grid, its
+move masks and CostField read-only, and the heuristic table cache
+(planner.heuristics.TABLES) is locked; editing a map after add_map does not
+reach the server (re-add it). Backpressure: at most `max_pending` searches
+are queued on the pool, and a connection stops being read while it has
+`max_per_connection` requests outstanding, so a fast client is slowed by its
+own socket. A request's deadline (seconds) covers queueing and search; past
+it the client gets an error, and a search nobody waits for any more is
+dropped if no worker has picked it up yet (a running search cannot be
+interrupted; it keeps its pool slot until it ends).
+
+    python -m planner.server --unix /tmp/planner.sock --map lab=maps/lab.yaml --inflate 3
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .a_star import Cell, a_star
+from .batch import _MapSpec, _SharedArrays, _attach
+from .costs import CostField, compute_obstacle_distance, make_cost_field
+from .grid_map import GridMap
+from .heuristics import manhattan, octile
+from .io.map_loader import load_ros_yaml_map
+
+Request = Dict[str, Any]
+Response = Dict[str, Any]
+
+
+@dataclass
+class ResidentMap:
+    """A loaded map and what is derived from it for planning."""
+    name: str
+    generation: int                 # distinguishes reloads under the same name
+    grid_map: GridMap               # as loaded
+    plan_map: GridMap               # (inflated) copy planned on, never edited
+    cost: CostField
+    shared: Optional[_SharedArrays] = None
+    spec: Optional[_MapSpec] = None
+
+    def info(self) -> Dict[str, Any]:
+        gm = self.grid_map
+        return {"name": self.name, "width": gm.width, "height": gm.height,
+                "resolution": gm.resolution, "origin": list(gm.origin)}
+
+
+@dataclass
+class _Search:
+    """One search in flight and the requests waiting on it."""
+    task: "Optional[asyncio.Task[Dict[str, Any]]]" = None
+    waiters: int = 0
+
+
+# -------- searches (run on the pool) --------
+def _plan_on(
+    gm: GridMap, cost: CostField, start: Cell, goal: Cell,
+    connectivity: int, max_expansions: Optional[int],
+) -> Dict[str, Any]:
+    heuristic = octile if connectivity == 8 else manhattan
+    t0 = time.perf_counter()
+    path = a_star(gm, start, goal, heuristic=heuristic, cost_fn=cost,
+                  connectivity=connectivity, max_expansions=max_expansions)
+    seconds = time.perf_counter() - t0
+    total = None if path is None else sum(cost(u, v) for u, v in zip(path, path[1:]))
+    return {"path": path, "cost": total, "seconds": seconds}
+
+
+# worker process side: map name -> (generation, shm handles, GridMap, CostField)
+_attached: Dict[str, Tuple[int, list, GridMap, CostField]] = {}
+
+
+def _plan_in_worker(
+    name: str, generation: int, spec: _MapSpec, start: Cell, goal: Cell,
+    connectivity: int, max_expansions: Optional[int], live: frozenset,
+) -> Dict[str, Any]:
+    # let go of maps unloaded or reloaded since this worker last ran
+    # (`live`: generations resident on the server, this one included)
+    for other, (gen, handles, _, _) in list(_attached.items()):
+        if gen not in live:
+            for shm in handles:
+                shm.close()
+            del _attached[other]
+    entry = _attached.get(name)
+    if entry is None or entry[0] != generation:
+        grid_shm, grid = _attach(spec.arrays["grid"])
+        mult_shm, mult = _attach(spec.arrays["cost_multiplier"])
+        gm = GridMap(spec.width, spec.height, spec.resolution, spec.origin)
+        gm._adopt_grid(grid)             # shared, not copied
+        entry = _attached[name] = (generation, [grid_shm, mult_shm], gm, CostField(mult, *spec.cost_field))
+    return _plan_on(entry[2], entry[3], start, goal, connectivity, max_expansions)
+
+
+# -------- server --------
+class PlanningServer:
+    """
+    Resident maps plus the request handling; `serve_unix`/`serve_tcp` put it
+    on a socket, `handle` answers one decoded request (useful in-process).
+
+    Parameters
+    ----------
+    workers : int | None
+        Pool size (default: os.cpu_count()).
+    executor : "process" | "thread"
+        Where searches run.
+    max_pending : int
+        Searches queued or running on the pool at once.
+    max_per_connection : int
+        Outstanding requests per connection before it stops being read.
+    default_deadline : float | None
+        Seconds allowed for a plan request that gives no "deadline".
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        executor: str = "process",
+        max_pending: int = 64,
+        max_per_connection: int = 32,
+        default_deadline: Optional[float] = None,
+    ):
+        if executor not in ("process", "thread"):
+            raise ValueError(f"unknown executor: {executor!r}")
+        if max_pending < 1 or max_per_connection < 1:
+            raise ValueError("max_pending and max_per_connection must be at least 1")
+        self.workers = int(workers or os.cpu_count() or 1)
+        self.executor_kind = executor
+        self.max_pending = int(max_pending)
+        self.max_per_connection = int(max_per_connection)
+        self.default_deadline = default_deadline
+        self.maps: Dict[str, ResidentMap] = {}
+        self.searches = 0          # searches submitted to the pool
+        self.merged = 0            # plan requests answered by another request's search
+        self._generation = 0
+        self._inflight: Dict[Tuple, _Search] = {}
+        self._pool: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    # -------- maps --------
+    def add_map(
+        self,
+        name: str,
+        grid_map: GridMap,
+        inflate: int = 0,
+        footprint: str = "disc",
+        penalty: float = 5.0,
+        cutoff_cells: int = 3,
+    ) -> ResidentMap:
+        """Make `grid_map` resident under `name`, replacing any map of that name."""
+        return self._register(self._build(name, grid_map, inflate, footprint, penalty, cutoff_cells))
+
+    def _build(
+        self, name: str, grid_map: GridMap, inflate: int = 0, footprint: str = "disc",
+        penalty: float = 5.0, cutoff_cells: int = 3,
+    ) -> ResidentMap:
+        """Derive the planning grid, cost field and shared copies (no server state touched)."""
+        # a private copy: searches only ever read it, so pool threads can share it
+        # (inflated in place, so the caller's map is left untouched)
+        plan_map = GridMap(grid_map.width, grid_map.height, grid_map.resolution, grid_map.origin)
+        plan_map.grid = grid_map.grid       # read-only view: copied
+        if inflate > 0:
+            plan_map.inflate(inflate, footprint=footprint)
+        distance = compute_obstacle_distance(plan_map, connectivity=4)
+        cost = make_cost_field(plan_map, penalty=penalty, cutoff_cells=cutoff_cells, distance_map=distance)
+        if self.executor_kind == "thread":
+            plan_map.move_masks()           # build before threads share the map
+        entry = ResidentMap(name, 0, grid_map, plan_map, cost)
+        if self.executor_kind == "process":
+            entry.shared = _SharedArrays({"grid": plan_map.grid, "cost_multiplier": cost.multiplier})
+            entry.spec = _MapSpec(
+                width=plan_map.width, height=plan_map.height,
+                resolution=plan_map.resolution, origin=plan_map.origin,
+                arrays=entry.shared.specs,
+                cost_field=(cost.base_step_cost_4, cost.base_step_cost_diag),
+            )
+        return entry
+
+    def _register(self, entry: ResidentMap) -> ResidentMap:
+        self._generation += 1
+        entry.generation = self._generation
+        self.unload_map(entry.name)
+        self.maps[entry.name] = entry
+        return entry
+
+    async def load_map(self, name: str, yaml_path: str, **options: Any) -> ResidentMap:
+        """Load a ROS YAML map and its derived layers off the event loop."""
+        loop = asyncio.get_running_loop()
+        gm = await loop.run_in_executor(None, load_ros_yaml_map, yaml_path)
+        entry = await loop.run_in_executor(None, lambda: self._build(name, gm, **options))
+        return self._register(entry)
+
+    def unload_map(self, name: str) -> bool:
+        entry = self.maps.pop(name, None)
+        if entry is None:
+            return False
+        if entry.shared is not None:
+            entry.shared.close()
+        return True
+
+    # -------- planning --------
+    async def plan(
+        self,
+        map_name: str,
+        start: Cell,
+        goal: Cell,
+        connectivity: int = 8,
+        max_expansions: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Search on a resident map; returns (result, merged) where result has
+        path (cells or None), cost and search seconds. Raises KeyError for an
+        unknown map and asyncio.TimeoutError past the deadline.
+        """
+        entry = self.maps[map_name]
+        if connectivity not in (4, 8):
+            raise ValueError("connectivity must be 4 or 8")
+        key = (map_name, entry.generation, start, goal, connectivity, max_expansions)
+        search = self._inflight.get(key)
+        merged = search is not None
+        if search is None:
+            search = _Search()
+            search.task = asyncio.ensure_future(
+                self._run(search, entry, start, goal, connectivity, max_expansions))
+            self._inflight[key] = search
+            search.task.add_done_callback(lambda _: self._forget(key, search))
+        else:
+            self.merged += 1
+
+        search.waiters += 1
+        timeout = self.default_deadline if deadline is None else deadline
+        try:
+            result = await asyncio.wait_for(asyncio.shield(search.task), timeout)
+        except asyncio.TimeoutError:
+            if search.waiters == 1:
+                search.task.cancel()        # dropped unless a worker already runs it
+                self._forget(key, search)   # later identical queries start afresh
+            raise
+        finally:
+            search.waiters -= 1
+        return result, merged
+
+    def _forget(self, key: Tuple, search: _Search) -> None:
+        if self._inflight.get(key) is search:
+            del self._inflight[key]
+
+    async def _run(
+        self, search: _Search, entry: ResidentMap, start: Cell, goal: Cell,
+        connectivity: int, max_expansions: Optional[int],
+    ) -> Dict[str, Any]:
+        async with self._semaphore():
+            self.searches += 1
+            if entry.spec is None:
+                call = (_plan_on, entry.plan_map, entry.cost, start, goal, connectivity, max_expansions)
+            else:
+                live = frozenset(m.generation for m in self.maps.values())
+                call = (_plan_in_worker, entry.name, entry.generation, entry.spec,
+                        start, goal, connectivity, max_expansions, live)
+            future = self._executor().submit(*call)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # cancel() fails once a worker has picked the search up: hold
+                # the slot until it ends, so max_pending still bounds the pool
+                if not future.cancel():
+                    await asyncio.wait([asyncio.wrap_future(future)])
+                raise
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            if self.executor_kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    # -------- protocol --------
+    async def handle(self, request: Request) -> Response:
+        """Answer one decoded request (see the module docstring)."""
+        response: Response = {"id": request.get("id")}
+        try:
+            response.update(await self._dispatch(request))
+            response["ok"] = True
+        except asyncio.TimeoutError:
+            response.update(ok=False, error="deadline exceeded")
+        except KeyError as e:
+            response.update(ok=False, error=f"unknown or missing: {e.args[0]}")
+        except (ValueError, TypeError, OSError) as e:
+            response.update(ok=False, error=str(e))
+        return response
+
+    async def _dispatch(self, request: Request) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "ping":
+            return {}
+        if op == "maps":
+            return {"maps": [m.info() for m in self.maps.values()]}
+        if op == "load_map":
+            options = {k: request[k] for k in ("inflate", "footprint", "penalty", "cutoff_cells") if k in request}
+            entry = await self.load_map(request["name"], request["yaml"], **options)
+            return {"map": entry.info()}
+        if op == "unload_map":
+            return {"unloaded": self.unload_map(request["name"])}
+        if op == "plan":
+            return await self._plan_request(request)
+        raise ValueError(f"unknown op: {op!r}")
+
+    async def _plan_request(self, request: Request) -> Dict[str, Any]:
+        entry = self.maps[request["map"]]
+        gm = entry.plan_map
+        frame = request.get("frame", "world")
+        if frame == "world":
+            start = gm.world_to_grid(*map(float, request["start"]))
+            goal = gm.world_to_grid(*map(float, request["goal"]))
+        elif frame == "grid":
+            start = tuple(int(v) for v in request["start"])
+            goal = tuple(int(v) for v in request["goal"])
+        else:
+            raise ValueError(f"unknown frame: {frame!r}")
+        result, merged = await self.plan(
+            request["map"], start, goal,
+            connectivity=int(request.get("connectivity", 8)),
+            max_expansions=request.get("max_expansions"),
+            deadline=request.get("deadline"),
+        )
+        path = result["path"]
+        if path is not None:
+            path = [list(gm.grid_to_world(c)) if frame == "world" else list(c) for c in path]
+        return {"path": path, "cost": result["cost"], "seconds": result["seconds"], "merged": merged}
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        outstanding = asyncio.Semaphore(self.max_per_connection)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line: bytes) -> None:
+            try:
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    response: Response = {"id": None, "ok": False, "error": f"bad request: {e}"}
+                else:
+                    response = await self.handle(request)
+                async with write_lock:
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                outstanding.release()
+
+        try:
+            while True:
+                await outstanding.acquire()        # stop reading while this client is saturated
+                line = await reader.readline()
+                if not line:
+                    outstanding.release()
+                    break
+                if not line.strip():
+                    outstanding.release()
+                    continue
+                task = asyncio.ensure_future(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self._connection, path=path)
+
+    async def serve_tcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._connection, host=host, port=port)
+
+    def close(self) -> None:
+        """Shut the pool down and release every map's shared memory."""
+        for name in list(self.maps):
+            self.unload_map(name)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+# -------- command line --------
+async def _serve(args: argparse.Namespace) -> None:
+    server = PlanningServer(workers=args.workers, executor=args.executor,
+                            max_pending=args.max_pending, default_deadline=args.deadline)
+    try:
+        for spec in args.map:
+            name, _, yaml_path = spec.partition("=")
+            if not yaml_path:
+                raise SystemExit(f"--map expects name=path.yaml, got {spec!r}")
+            await server.load_map(name, yaml_path, inflate=args.inflate)
+        if args.unix:
+            listener = await server.serve_unix(args.unix)
+        else:
+            listener = await server.serve_tcp(args.host, args.port)
+        names = ", ".join(str(s.getsockname()) for s in listener.sockets)
+        print(f"planning server on {names}", flush=True)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    where = ap.add_mutually_exclusive_group()
+    where.add_argument("--unix", help="Unix socket path")
+    where.add_argument("--port", type=int, default=8765, help="localhost TCP port")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--map", action="append", default=[], help="name=path.yaml to load at startup")
+    ap.add_argument("--inflate", type=int, default=0, help="inflation radius (cells) for startup maps")
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--executor", choices=["process", "thread"], default="process")
+    ap.add_argument("--max-pending", type=int, default=64)
+    ap.add_argument("--deadline", type=float, help="default per-request deadline (seconds)")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
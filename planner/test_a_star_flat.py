@@ -0,0 +1,76 @@
+"""
+test_a_star_flat.py
+
+Checks that the array-backed engine returns exactly what a_star returns.
+"""
+
+import math
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .a_star_flat import a_star_flat
+from .heuristics import manhattan, octile
+
+
+def _cost4(u, v):
+    return 1.0
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def test_matches_a_star_on_random_maps():
+    rng = np.random.default_rng(7)
+    for _ in range(60):
+        H, W = (int(x) for x in rng.integers(3, 25, size=2))
+        gm = GridMap(W, H)
+        gm.grid = (rng.random((H, W)) < 0.3).astype(np.uint8)
+        start = (int(rng.integers(H)), int(rng.integers(W)))
+        goal = (int(rng.integers(H)), int(rng.integers(W)))
+        for conn, h, c in ((4, manhattan, _cost4), (8, octile, _cost8)):
+            expected = a_star(gm, start, goal, heuristic=h, cost_fn=c, connectivity=conn)
+            got = a_star_flat(gm, start, goal, heuristic=h, cost_fn=c, connectivity=conn)
+            assert got == expected
+
+
+def test_buffers_reused_after_map_edit():
+    gm = GridMap(10, 10)
+    start, goal = (0, 0), (9, 9)
+    p1 = a_star_flat(gm, start, goal, heuristic=octile, cost_fn=_cost8, connectivity=8)
+    assert p1 is not None and p1[0] == start and p1[-1] == goal
+
+    for i in range(10):
+        gm.set_obstacle((i, 5))
+    assert a_star_flat(gm, start, goal, heuristic=octile, cost_fn=_cost8, connectivity=8) is None
+
+    gm.clear_cell((4, 5))
+    p2 = a_star_flat(gm, start, goal, heuristic=octile, cost_fn=_cost8, connectivity=8)
+    assert p2 is not None and (4, 5) in p2
+
+
+def test_blocked_endpoint_and_expansion_cap():
+    gm = GridMap(6, 6)
+    gm.set_obstacle((1, 1))
+    assert a_star_flat(gm, (1, 1), (4, 4), heuristic=manhattan, cost_fn=_cost4) is None
+    assert a_star_flat(gm, (0, 0), (5, 5), heuristic=manhattan, cost_fn=_cost4,
+                       max_expansions=2) is None
+
+
+def test_cached_grid_and_cost_field_follow_edits():
+    from .costs import make_cost_field
+    rng = np.random.default_rng(8)
+    gm = GridMap(30, 24)
+    gm.grid = (rng.random((24, 30)) < 0.2).astype(np.uint8)
+    for _ in range(25):
+        for _ in range(int(rng.integers(0, 5))):
+            cell = (int(rng.integers(24)), int(rng.integers(30)))
+            (gm.set_obstacle if rng.random() < 0.5 else gm.clear_cell)(cell)
+        cost = make_cost_field(gm)
+        start = (int(rng.integers(24)), int(rng.integers(30)))
+        goal = (int(rng.integers(24)), int(rng.integers(30)))
+        for conn, h in ((4, manhattan), (8, octile)):
+            expected = a_star(gm, start, goal, heuristic=h, cost_fn=cost, connectivity=conn)
+            got = a_star_flat(gm, start, goal, heuristic=h, cost_fn=cost, connectivity=conn)
+            assert got == expected
@@ -0,0 +1,82 @@
+"""
+test_ara_star.py
+
+ARA* passes must respect their suboptimality bounds, only ever improve, and
+end optimal when given time; a deadline returns the best path so far.
+"""
+
+import math
+import numpy as np
+import pytest
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .ara_star import ara_star
+from .costs import make_cost_field
+from .heuristics import manhattan, octile
+
+
+def _cost4(u, v):
+    return 1.0
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def _path_cost(path, cost_fn):
+    return sum(cost_fn(a, b) for a, b in zip(path, path[1:]))
+
+
+def test_passes_are_bounded_and_end_optimal():
+    rng = np.random.default_rng(8)
+    for trial in range(60):
+        H, W = (int(x) for x in rng.integers(2, 30, size=2))
+        gm = GridMap(W, H)
+        gm.grid = (rng.random((H, W)) < 0.3).astype(np.uint8)
+        conn, h, c = ((8, octile, _cost8), (4, manhattan, _cost4))[trial % 2]
+        if trial % 3 == 0:
+            c = make_cost_field(gm)
+        start = (int(rng.integers(H)), int(rng.integers(W)))
+        goal = (int(rng.integers(H)), int(rng.integers(W)))
+
+        expected = a_star(gm, start, goal, heuristic=h, cost_fn=c, connectivity=conn)
+        passes = []
+        result = ara_star(gm, start, goal, heuristic=h, cost_fn=c, connectivity=conn,
+                          epsilon=4.0, on_improve=passes.append)
+        assert result.complete
+        if expected is None:
+            assert result.path is None and not passes
+            continue
+        optimal = _path_cost(expected, c)
+        for p in passes:
+            assert math.isclose(_path_cost(p.path, c), p.cost)
+            assert p.cost <= p.bound * optimal + 1e-9
+        assert all(a.cost >= b.cost - 1e-9 for a, b in zip(passes, passes[1:]))
+        assert math.isclose(result.cost, optimal) and result.bound == 1.0
+
+
+def test_deadline_returns_best_path_so_far():
+    rng = np.random.default_rng(1)
+    gm = GridMap(300, 300)
+    gm.grid = (rng.random((300, 300)) < 0.3).astype(np.uint8)
+    gm.clear_cell((0, 0))
+    gm.clear_cell((299, 299))
+
+    first = ara_star(gm, (0, 0), (299, 299), heuristic=octile, cost_fn=_cost8,
+                     connectivity=8, epsilon=3.0, max_expansions=2000)
+    assert not first.complete
+    assert first.path is not None and first.path[-1] == (299, 299)
+    assert 1.0 < first.bound <= 3.0
+
+    none_yet = ara_star(gm, (0, 0), (299, 299), heuristic=octile, cost_fn=_cost8,
+                        connectivity=8, time_budget=0.0)
+    assert not none_yet.complete and none_yet.path is None
+
+
+def test_rejects_bad_epsilon():
+    gm = GridMap(4, 4)
+    with pytest.raises(ValueError):
+        ara_star(gm, (0, 0), (3, 3), heuristic=octile, cost_fn=_cost8, epsilon=0.5)
+    with pytest.raises(ValueError):
+        ara_star(gm, (0, 0), (3, 3), heuristic=octile, cost_fn=_cost8, epsilon_step=0.0)
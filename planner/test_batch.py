@@ -0,0 +1,52 @@
+"""
+test_batch.py
+
+plan_many must return the same paths as planning one pair at a time,
+in input order, whether it runs inline or on a process pool.
+"""
+
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .a_star_flat import a_star_flat
+from .batch import plan_many
+from .costs import make_cost_field
+from .heuristics import octile
+
+
+def _map_and_pairs(seed=2, n=12):
+    rng = np.random.default_rng(seed)
+    gm = GridMap(40, 30)
+    gm.grid = (rng.random((30, 40)) < 0.2).astype(np.uint8)
+    free = np.argwhere(gm.grid == 0)
+    pick = lambda: tuple(int(x) for x in free[rng.integers(len(free))])
+    return gm, [(pick(), pick()) for _ in range(n)]
+
+
+def test_pool_results_match_serial_in_order():
+    gm, pairs = _map_and_pairs()
+    field = make_cost_field(gm, penalty=4.0)
+    expected = [a_star(gm, s, g, heuristic=octile, cost_fn=field, connectivity=8) for s, g in pairs]
+
+    for workers in (1, 2):
+        results = plan_many(gm, pairs, heuristic=octile, cost_fn=field, connectivity=8,
+                            workers=workers, chunksize=2, planner=a_star_flat)
+        assert [r.path for r in results] == expected
+        assert all(r.seconds >= 0.0 for r in results)
+
+
+def _plan_on_robot_layer(grid_map, start, goal, **kwargs):
+    inflated = GridMap(grid_map.width, grid_map.height)
+    inflated.grid = grid_map.layers["robot"]
+    return a_star(inflated, start, goal, **kwargs)
+
+
+def test_layers_are_shared_with_workers():
+    gm, pairs = _map_and_pairs(seed=3, n=6)
+    gm.inflate(1, layer="robot")
+    results = plan_many(gm, pairs, heuristic=octile, cost_fn=make_cost_field(gm),
+                        connectivity=8, workers=2, planner=_plan_on_robot_layer)
+    serial = plan_many(gm, pairs, heuristic=octile, cost_fn=make_cost_field(gm),
+                       connectivity=8, workers=1, planner=_plan_on_robot_layer)
+    assert [r.path for r in results] == [r.path for r in serial]
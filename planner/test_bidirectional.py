@@ -0,0 +1,88 @@
+"""
+test_bidirectional.py
+
+Bidirectional A* must return paths exactly as cheap as a_star's, and expand
+far fewer nodes when the goal sits in a pocket facing away from the start.
+"""
+
+import math
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .bidirectional import bidirectional_a_star
+from .costs import make_cost_field, make_weighted_cost
+from .heuristics import manhattan, octile
+
+
+def _cost4(u, v):
+    return 1.0
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def _path_cost(path, cost_fn):
+    return sum(cost_fn(a, b) for a, b in zip(path, path[1:]))
+
+
+class _CountingCost:
+    """Counts edge evaluations, a proxy for node expansions."""
+
+    def __init__(self, cost_fn):
+        self.cost_fn = cost_fn
+        self.calls = 0
+
+    def __call__(self, u, v):
+        self.calls += 1
+        return self.cost_fn(u, v)
+
+
+def test_optimal_on_random_maps():
+    rng = np.random.default_rng(4)
+    for trial in range(90):
+        H, W = (int(x) for x in rng.integers(2, 25, size=2))
+        gm = GridMap(W, H)
+        gm.grid = (rng.random((H, W)) < 0.3).astype(np.uint8)
+        conn, h, c = ((8, octile, _cost8), (4, manhattan, _cost4))[trial % 2]
+        if trial % 3 == 1:
+            c = make_weighted_cost(gm)
+        elif trial % 3 == 2:
+            c = make_cost_field(gm)
+        start = (int(rng.integers(H)), int(rng.integers(W)))
+        goal = (int(rng.integers(H)), int(rng.integers(W)))
+        expected = a_star(gm, start, goal, heuristic=h, cost_fn=c, connectivity=conn)
+        got = bidirectional_a_star(gm, start, goal, heuristic=h, cost_fn=c, connectivity=conn)
+        assert (got is None) == (expected is None)
+        if got is not None:
+            assert got[0] == start and got[-1] == goal
+            assert all(b in gm.get_neighbors(a, conn) for a, b in zip(got, got[1:]))
+            assert math.isclose(_path_cost(got, c), _path_cost(expected, c), abs_tol=1e-9)
+
+
+def test_fewer_expansions_when_goal_is_in_a_pocket():
+    gm = GridMap(200, 100)
+    for i in range(20, 80):
+        gm.set_obstacle((i, 150))
+    for j in range(150, 190):
+        gm.set_obstacle((20, j))
+        gm.set_obstacle((80, j))
+    start, goal = (50, 5), (50, 170)   # the pocket around goal opens to the right
+
+    uni = _CountingCost(_cost8)
+    expected = a_star(gm, start, goal, heuristic=octile, cost_fn=uni, connectivity=8)
+    bi = _CountingCost(_cost8)
+    got = bidirectional_a_star(gm, start, goal, heuristic=octile, cost_fn=bi, connectivity=8)
+
+    assert math.isclose(_path_cost(got, _cost8), _path_cost(expected, _cost8))
+    assert bi.calls < uni.calls / 3
+
+
+def test_trivial_and_capped_queries():
+    gm = GridMap(8, 8)
+    assert bidirectional_a_star(gm, (3, 3), (3, 3), heuristic=octile, cost_fn=_cost8) == [(3, 3)]
+    gm.set_obstacle((7, 7))
+    assert bidirectional_a_star(gm, (0, 0), (7, 7), heuristic=octile, cost_fn=_cost8) is None
+    assert bidirectional_a_star(gm, (0, 0), (6, 6), heuristic=octile, cost_fn=_cost8,
+                                connectivity=8, max_expansions=2) is None
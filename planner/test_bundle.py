@@ -0,0 +1,67 @@
+# planner/test_bundle.py
+"""
+Map bundles: compiled arrays match a fresh load, an up-to-date bundle is
+mapped without recompiling, and image or parameter changes trigger a rebuild.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .costs import compute_obstacle_distance
+from .io.bundle import compile_map, load_map_bundle, read_bundle_header
+from .io.map_loader import load_ros_yaml_map
+
+
+def _write_map(tmp: Path, img: np.ndarray) -> Path:
+    Image.fromarray(img, mode="L").save(tmp / "map.png")
+    yaml_path = tmp / "map.yaml"
+    yaml_path.write_text("image: map.png\nresolution: 0.5\norigin: [1.0, 2.0, 0.0]\n")
+    return yaml_path
+
+
+def _image(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.where(rng.random((30, 40)) < 0.1, 0, 255).astype(np.uint8)
+
+
+def test_bundle_matches_fresh_load(tmp_path):
+    yaml_path = _write_map(tmp_path, _image(0))
+    bundle = load_map_bundle(yaml_path, layers={"robot": 2})
+    assert bundle.rebuilt and bundle.path == tmp_path / "map.mapbundle"
+
+    ref = load_ros_yaml_map(yaml_path)
+    gm = bundle.grid_map
+    assert (gm.width, gm.height, gm.resolution, gm.origin) == (40, 30, 0.5, (1.0, 2.0))
+    assert np.array_equal(gm.grid, ref.grid)
+    assert np.array_equal(gm.layers["robot"], ref.inflate(2, layer="robot"))
+    assert bundle.distance.dtype == np.float32
+    assert np.array_equal(bundle.distance, compute_obstacle_distance(ref))
+
+    header = read_bundle_header(bundle.path)
+    assert all(spec["offset"] % 64 == 0 for spec in header["arrays"].values())
+
+    # edits stay in memory (copy-on-write)
+    gm.set_obstacle((0, 0))
+    assert not load_map_bundle(yaml_path, layers={"robot": 2}).grid_map.is_occupied((0, 0))
+
+
+def test_bundle_reused_until_stale(tmp_path):
+    yaml_path = _write_map(tmp_path, _image(0))
+    compile_map(yaml_path)
+    again = load_map_bundle(yaml_path)
+    assert not again.rebuilt
+
+    assert load_map_bundle(yaml_path, connectivity=8).rebuilt      # new parameters
+    _write_map(tmp_path, _image(1))                                # new image
+    fresh = load_map_bundle(yaml_path, connectivity=8)
+    assert fresh.rebuilt and fresh.key != again.key
+    assert np.array_equal(fresh.grid_map.grid, load_ros_yaml_map(yaml_path).grid)
+
+
+def test_corrupt_bundle_is_rebuilt(tmp_path):
+    yaml_path = _write_map(tmp_path, _image(0))
+    (tmp_path / "map.mapbundle").write_bytes(b"not a bundle")
+    assert read_bundle_header(tmp_path / "map.mapbundle") is None
+    assert load_map_bundle(yaml_path).rebuilt
@@ -0,0 +1,64 @@
+"""
+test_cost_to_go.py
+
+Cost-to-go fields agree with A* and are recomputed after map edits.
+"""
+
+import math
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .costs import make_cost_field, make_weighted_cost
+from .cost_to_go import CostToGoCache, cost_to_go, path_from_field
+from .heuristics import octile
+
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def _path_cost(path, cost_fn):
+    return sum(cost_fn(a, b) for a, b in zip(path, path[1:]))
+
+
+def test_field_matches_a_star_costs():
+    rng = np.random.default_rng(3)
+    for _ in range(30):
+        H, W = (int(x) for x in rng.integers(3, 20, size=2))
+        gm = GridMap(W, H)
+        gm.grid = (rng.random((H, W)) < 0.25).astype(np.uint8)
+        goal = (int(rng.integers(H)), int(rng.integers(W)))
+        for cost in (_cost8, make_cost_field(gm), make_weighted_cost(gm)):
+            field = cost_to_go(gm, goal, cost, connectivity=8)
+            for _ in range(5):
+                start = (int(rng.integers(H)), int(rng.integers(W)))
+                expected = a_star(gm, start, goal, heuristic=octile, cost_fn=cost, connectivity=8)
+                got = path_from_field(gm, field, start, cost, connectivity=8)
+                if expected is None:
+                    assert got is None and not np.isfinite(field[start])
+                else:
+                    assert got[0] == start and got[-1] == goal
+                    assert math.isclose(field[start], _path_cost(expected, cost), abs_tol=1e-6)
+                    assert math.isclose(_path_cost(got, cost), _path_cost(expected, cost), abs_tol=1e-6)
+
+
+def test_cache_reuses_fields_until_map_edit():
+    gm = GridMap(12, 12)
+    cache = CostToGoCache(maxsize=4)
+    f1 = cache.get(gm, (11, 11), _cost8)
+    assert cache.get(gm, (11, 11), _cost8) is f1
+    assert cache.plan(gm, (0, 0), (11, 11), _cost8)[-1] == (11, 11)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    for i in range(12):
+        gm.set_obstacle((i, 6))
+    f2 = cache.get(gm, (11, 11), _cost8)
+    assert f2 is not f1 and len(cache) == 1
+    assert cache.plan(gm, (0, 0), (11, 11), _cost8) is None
+
+    gm.clear_cell((5, 6))
+    assert cache.plan(gm, (0, 0), (11, 11), _cost8) is not None
+    cache.invalidate(gm)
+    assert len(cache) == 0
@@ -0,0 +1,83 @@
+"""
+test_dstar_lite.py
+
+D* Lite must keep returning A*-optimal paths while the map is edited and the
+start moves, and must repair small changes without a full search.
+"""
+
+import math
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .dstar_lite import DStarLite
+from .heuristics import manhattan, octile
+
+
+def _cost4(u, v):
+    return 1.0
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def _path_cost(path, cost_fn):
+    return sum(cost_fn(a, b) for a, b in zip(path, path[1:]))
+
+
+def test_replan_matches_a_star_under_edits():
+    rng = np.random.default_rng(11)
+    for trial in range(60):
+        H, W = (int(x) for x in rng.integers(3, 16, size=2))
+        gm = GridMap(W, H)
+        gm.grid = (rng.random((H, W)) < 0.25).astype(np.uint8)
+        conn, h, c = ((8, octile, _cost8), (4, manhattan, _cost4))[trial % 2]
+        start = (int(rng.integers(H)), int(rng.integers(W)))
+        goal = (int(rng.integers(H)), int(rng.integers(W)))
+        planner = DStarLite(gm, start, goal, heuristic=h, cost_fn=c, connectivity=conn)
+
+        path = planner.plan()
+        for _ in range(5):
+            expected = a_star(gm, planner.start, goal, heuristic=h, cost_fn=c, connectivity=conn)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert path[0] == planner.start and path[-1] == goal
+                assert math.isclose(_path_cost(path, c), _path_cost(expected, c))
+                if len(path) > 2:
+                    planner.update_start(path[1])
+            for _ in range(3):
+                cell = (int(rng.integers(H)), int(rng.integers(W)))
+                if cell != planner.start:
+                    (gm.set_obstacle if rng.random() < 0.5 else gm.clear_cell)(cell)
+            path = planner.replan()
+
+
+def test_small_edit_repairs_locally():
+    gm = GridMap(40, 40)
+    for i in range(35):
+        gm.set_obstacle((i, 20))
+    planner = DStarLite(gm, (0, 0), (0, 39), heuristic=octile, cost_fn=_cost8)
+    path = planner.plan()
+    full = planner.expansions
+
+    gm.set_obstacle((39, 0))         # off the path
+    assert planner.replan() == path
+    assert planner.expansions < full // 10
+
+    gm.set_obstacle(path[-5])        # on the path, near the goal
+    new_path = planner.replan()
+    assert path[-5] not in new_path
+    expected = a_star(gm, (0, 0), (0, 39), heuristic=octile, cost_fn=_cost8, connectivity=8)
+    assert math.isclose(_path_cost(new_path, _cost8), _path_cost(expected, _cost8))
+    assert planner.expansions < full // 10
+
+
+def test_bulk_grid_replacement_restarts():
+    gm = GridMap(10, 10)
+    planner = DStarLite(gm, (0, 0), (9, 9), heuristic=octile, cost_fn=_cost8)
+    assert planner.plan() is not None
+    wall = gm.grid.copy()
+    wall[:, 5] = 1
+    gm.grid = wall
+    assert planner.replan() is None
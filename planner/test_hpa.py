@@ -0,0 +1,79 @@
+"""
+test_hpa.py
+
+HPA* paths must be valid, agree with A* on reachability, stay within a
+bounded cost of the optimum, and follow map edits.
+"""
+
+import math
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .costs import make_cost_field
+from .hpa import HierarchicalMap, path_cost_ratio
+from .heuristics import manhattan, octile
+
+
+def _cost4(u, v):
+    return 1.0
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def _is_valid(gm, path, connectivity):
+    return all(b in gm.get_neighbors(a, connectivity) for a, b in zip(path, path[1:]))
+
+
+def test_paths_valid_and_complete_under_edits():
+    rng = np.random.default_rng(2)
+    for trial in range(40):
+        H, W = (int(x) for x in rng.integers(3, 40, size=2))
+        gm = GridMap(W, H)
+        gm.grid = (rng.random((H, W)) < 0.25).astype(np.uint8)
+        conn, h, c = ((8, octile, _cost8), (4, manhattan, _cost4))[trial % 2]
+        if trial % 3 == 0:
+            c = make_cost_field(gm)
+        hmap = HierarchicalMap(gm, heuristic=h, cost_fn=c, connectivity=conn,
+                               cluster_size=int(rng.integers(2, 10)))
+        for _ in range(6):
+            start = (int(rng.integers(H)), int(rng.integers(W)))
+            goal = (int(rng.integers(H)), int(rng.integers(W)))
+            expected = a_star(gm, start, goal, heuristic=h, cost_fn=c, connectivity=conn)
+            path = hmap.plan(start, goal)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert path[0] == start and path[-1] == goal
+                assert _is_valid(gm, path, conn)
+            for _ in range(3):
+                cell = (int(rng.integers(H)), int(rng.integers(W)))
+                (gm.set_obstacle if rng.random() < 0.5 else gm.clear_cell)(cell)
+
+
+def test_cost_penalty_is_bounded():
+    rng = np.random.default_rng(5)
+    gm = GridMap(64, 64)
+    gm.grid = (rng.random((64, 64)) < 0.2).astype(np.uint8)
+    hmap = HierarchicalMap(gm, heuristic=octile, cost_fn=_cost8, cluster_size=8)
+    hmap.build()
+    pairs = [((int(rng.integers(64)), int(rng.integers(64))),
+              (int(rng.integers(64)), int(rng.integers(64)))) for _ in range(30)]
+    mean, worst = path_cost_ratio(hmap, pairs)
+    assert 1.0 <= mean < 1.15 and worst < 1.5
+
+
+def test_edit_rebuilds_only_nearby_clusters():
+    gm = GridMap(64, 64)
+    hmap = HierarchicalMap(gm, heuristic=octile, cost_fn=_cost8, cluster_size=16)
+    hmap.build()
+    graphs = dict(hmap._graphs)
+
+    for i in range(0, 60):
+        gm.set_obstacle((i, 40))
+    path = hmap.plan((0, 0), (0, 63))
+    assert path is not None and all(cell[1] != 40 or cell[0] >= 60 for cell in path)
+    # the wall lies in cluster column 2: column 0 is never touched
+    assert all(hmap._graphs[(ci, 0)] is graphs[(ci, 0)] for ci in range(4))
+    assert hmap._graphs.get((1, 2)) is not graphs[(1, 2)]
@@ -0,0 +1,115 @@
+"""
+test_instrumentation.py
+
+SearchStats must not change a_star's result, must say why a search failed,
+and must reach every sink.
+"""
+
+import math
+import logging
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .costs import make_cost_field
+from .heuristics import octile
+from .instrumentation import (
+    FOUND, GOAL_BLOCKED, MAX_EXPANSIONS, START_BLOCKED, UNREACHABLE,
+    ListSink, LoggingSink, SearchStats,
+)
+
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def test_same_paths_and_consistent_counters():
+    rng = np.random.default_rng(12)
+    for trial in range(30):
+        gm = GridMap(20, 15)
+        gm.grid = (rng.random((15, 20)) < 0.3).astype(np.uint8)
+        cost = make_cost_field(gm) if trial % 2 else _cost8
+        start = (int(rng.integers(15)), int(rng.integers(20)))
+        goal = (int(rng.integers(15)), int(rng.integers(20)))
+        stats = SearchStats()
+        path = a_star(gm, start, goal, heuristic=octile, cost_fn=cost, connectivity=8, stats=stats)
+        assert path == a_star(gm, start, goal, heuristic=octile, cost_fn=cost, connectivity=8)
+        assert stats.path_length == (len(path) if path else 0)
+        if path is not None:
+            assert stats.outcome == FOUND
+            assert stats.expansions >= len(path) - 1
+        assert stats.stale_pops + stats.expansions <= stats.pushes
+        assert stats.peak_open <= stats.pushes
+        assert stats.time_total >= stats.time_neighbors + stats.time_cost + stats.time_heuristic
+
+
+def test_outcome_explains_none():
+    gm = GridMap(10, 10)
+    gm.set_obstacle((0, 0))
+    for i in range(10):
+        gm.set_obstacle((i, 5))
+    cases = [
+        ((0, 0), (9, 9), {}, START_BLOCKED),
+        ((1, 1), (5, 5), {}, GOAL_BLOCKED),
+        ((1, 1), (9, 9), {}, UNREACHABLE),
+        ((1, 1), (9, 1), {"max_expansions": 3}, MAX_EXPANSIONS),
+        ((1, 1), (9, 1), {}, FOUND),
+    ]
+    for start, goal, kwargs, outcome in cases:
+        stats = SearchStats()
+        a_star(gm, start, goal, heuristic=octile, cost_fn=_cost8, connectivity=8, stats=stats, **kwargs)
+        assert stats.outcome == outcome
+
+
+def test_sinks_receive_each_search(caplog):
+    sink = ListSink()
+    gm = GridMap(6, 6)
+    for goal in ((5, 5), (0, 5)):
+        a_star(gm, (0, 0), goal, heuristic=octile, cost_fn=_cost8, connectivity=8,
+               stats=SearchStats(sinks=[sink]))
+    assert [r["outcome"] for r in sink.records] == [FOUND, FOUND]
+    assert sink.records[0]["planner"] == "a_star" and "sinks" not in sink.records[0]
+
+    with caplog.at_level(logging.INFO, logger="planner.search"):
+        a_star(gm, (0, 0), (5, 5), heuristic=octile, cost_fn=_cost8, connectivity=8,
+               stats=SearchStats(sinks=[LoggingSink()]))
+    assert "a_star found" in caplog.text
+
+
+def test_as_dict_does_not_copy_sinks():
+    import threading
+
+    class LockedSink(ListSink):
+        def __init__(self):
+            super().__init__()
+            self.lock = threading.Lock()
+
+    sink = LockedSink()
+    stats = SearchStats(sinks=[sink])
+    a_star(GridMap(5, 5), (0, 0), (4, 4), heuristic=octile, cost_fn=_cost8, connectivity=8, stats=stats)
+    assert stats.as_dict()["expansions"] == stats.expansions > 0
+    assert sink.records[0]["outcome"] == FOUND
+
+
+def test_counters_without_timers():
+    gm = GridMap(30, 30)
+    for i in range(25):
+        gm.set_obstacle((i, 15))
+    timed, counted = SearchStats(), SearchStats(timing=False)
+    for stats in (timed, counted):
+        a_star(gm, (0, 0), (0, 29), heuristic=octile, cost_fn=_cost8, connectivity=8, stats=stats)
+    assert (counted.expansions, counted.pushes, counted.stale_pops, counted.peak_open) == \
+           (timed.expansions, timed.pushes, timed.stale_pops, timed.peak_open)
+    assert counted.time_neighbors == counted.time_cost == counted.time_heuristic == 0.0
+    assert "timing" not in counted.as_dict()
+
+
+def test_reused_stats_describe_the_last_search():
+    gm = GridMap(12, 12)
+    stats, fresh = SearchStats(), SearchStats()
+    a_star(gm, (0, 0), (11, 11), heuristic=octile, cost_fn=_cost8, connectivity=8, stats=stats)
+    for s in (stats, fresh):
+        a_star(gm, (0, 0), (0, 5), heuristic=octile, cost_fn=_cost8, connectivity=8, stats=s)
+    assert (stats.expansions, stats.pushes, stats.stale_pops, stats.peak_open) == \
+           (fresh.expansions, fresh.pushes, fresh.stale_pops, fresh.peak_open)
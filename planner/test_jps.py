@@ -0,0 +1,82 @@
+"""
+test_jps.py
+
+Jump Point Search must agree with 8-connected A* on path cost and follow
+the same corner-cutting rule.
+"""
+
+import math
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .heuristics import octile
+from .jps import jps
+
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+def _path_cost(path):
+    return sum(_cost8(u, v) for u, v in zip(path, path[1:]))
+
+
+def test_same_cost_as_a_star_on_random_maps():
+    rng = np.random.default_rng(11)
+    for _ in range(300):
+        H, W = (int(x) for x in rng.integers(2, 20, size=2))
+        gm = GridMap(W, H)
+        gm.grid = (rng.random((H, W)) < rng.uniform(0.0, 0.45)).astype(np.uint8)
+        start = (int(rng.integers(H)), int(rng.integers(W)))
+        goal = (int(rng.integers(H)), int(rng.integers(W)))
+
+        expected = a_star(gm, start, goal, heuristic=octile, cost_fn=_cost8, connectivity=8)
+        got = jps(gm, start, goal)
+        if expected is None:
+            assert got is None
+            continue
+        assert got is not None and got[0] == start and got[-1] == goal
+        for u, v in zip(got, got[1:]):
+            assert v in gm.get_neighbors(u, connectivity=8)
+        assert math.isclose(_path_cost(got), _path_cost(expected), abs_tol=1e-9)
+
+
+def test_open_map_straight_and_diagonal():
+    gm = GridMap(30, 30)
+    path = jps(gm, (0, 0), (29, 29))
+    assert path == [(k, k) for k in range(30)]
+    path = jps(gm, (3, 0), (3, 29))
+    assert path == [(3, j) for j in range(30)]
+
+
+def test_corner_cut_prevention_and_blocked_endpoints():
+    gm = GridMap(3, 3)
+    gm.set_obstacle((1, 0))
+    gm.set_obstacle((0, 1))
+    assert jps(gm, (0, 0), (1, 1)) is None
+    assert jps(gm, (1, 0), (2, 2)) is None
+
+
+def test_cached_map_state_follows_edits():
+    from .a_star_flat import get_buffers
+    from .jps import neighbor_patterns
+    rng = np.random.default_rng(12)
+    gm = GridMap(25, 20)
+    gm.grid = (rng.random((20, 25)) < 0.2).astype(np.uint8)
+    for step in range(40):
+        if step == 20:
+            gm = GridMap(25, 20)                 # same shape, different map
+        for _ in range(int(rng.integers(0, 6))):
+            cell = (int(rng.integers(20)), int(rng.integers(25)))
+            (gm.set_obstacle if rng.random() < 0.5 else gm.clear_cell)(cell)
+        start = (int(rng.integers(20)), int(rng.integers(25)))
+        goal = (int(rng.integers(20)), int(rng.integers(25)))
+        expected = a_star(gm, start, goal, heuristic=octile, cost_fn=_cost8, connectivity=8)
+        got = jps(gm, start, goal)
+        assert (got is None) == (expected is None)
+        if got is not None:
+            assert math.isclose(_path_cost(got), _path_cost(expected), abs_tol=1e-9)
+        buf = get_buffers(20, 25)
+        if buf.patterns is not None:
+            assert np.array_equal(buf.patterns, neighbor_patterns(buf))
@@ -0,0 +1,105 @@
+"""
+test_landmarks.py
+
+ALT landmark heuristic: admissible against exact costs, its table matches the
+scalar form, it cuts A* expansions on walled maps, and saved tables are only
+reused for the map they were built on.
+"""
+
+import math
+import numpy as np
+import pytest
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .costs import make_cost_field
+from .cost_to_go import cost_to_go
+from .heuristics import LandmarkHeuristic, octile
+from .instrumentation import SearchStats
+
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def _path_cost(path, cost_fn):
+    return sum(cost_fn(a, b) for a, b in zip(path, path[1:]))
+
+
+def _serpentine(n=40, gap=3):
+    """Horizontal walls every 5 rows, openings alternating left/right."""
+    gm = GridMap(n, n)
+    for k, i in enumerate(range(4, n - 1, 5)):
+        for j in range(n):
+            gm.set_obstacle((i, j))
+        lo = 0 if k % 2 else n - gap
+        for j in range(lo, lo + gap):
+            gm.clear_cell((i, j))
+    return gm
+
+
+def test_alt_is_admissible_and_table_matches():
+    rng = np.random.default_rng(0)
+    gm = GridMap(25, 20)
+    gm.grid = (rng.random((20, 25)) < 0.2).astype(np.uint8)
+    for cost in (_cost8, make_cost_field(gm)):
+        alt = LandmarkHeuristic.build(gm, cost, num_landmarks=4)
+        assert len(alt.landmarks) == 4 and all(gm.is_free(c) for c in alt.landmarks)
+        for _ in range(5):
+            goal = tuple(int(x) for x in np.argwhere(gm.grid == 0)[rng.integers((gm.grid == 0).sum())])
+            exact = cost_to_go(gm, goal, cost, connectivity=8)
+            table = alt.table((20, 25), goal)
+            for i in range(20):
+                for j in range(25):
+                    h = alt((i, j), goal)
+                    assert table[i, j] == h
+                    if np.isfinite(exact[i, j]):
+                        assert h <= exact[i, j] + 1e-9
+
+
+def test_alt_cuts_expansions_on_walled_map():
+    gm = GridMap(40, 40)               # long wall, open only at the bottom
+    for i in range(36):
+        gm.set_obstacle((i, 20))
+    start, goal = (5, 5), (5, 35)
+    alt = LandmarkHeuristic.build(gm, _cost8, num_landmarks=4)
+
+    runs = {}
+    for name, h in (("octile", octile), ("alt", alt)):
+        stats = SearchStats()
+        path = a_star(gm, start, goal, h, _cost8, connectivity=8, stats=stats)
+        runs[name] = (_path_cost(path, _cost8), stats.expansions)
+    assert math.isclose(runs["alt"][0], runs["octile"][0])
+    assert runs["alt"][1] < runs["octile"][1] / 2
+    # the table fast path finds the same cost
+    fast = a_star(gm, start, goal, alt, _cost8, 8, use_table=True)
+    assert math.isclose(_path_cost(fast, _cost8), runs["alt"][0])
+    # ... and so do the other planners reading it
+    from .a_star_flat import a_star_flat
+    from .ara_star import ara_star
+    from .bidirectional import bidirectional_a_star
+    from .jps import jps
+    for path in (a_star_flat(gm, start, goal, alt, _cost8, 8, use_table=True),
+                 bidirectional_a_star(gm, start, goal, alt, _cost8, 8, use_table=True),
+                 ara_star(gm, start, goal, alt, _cost8, 8, epsilon=1.0, use_table=True).path,
+                 jps(gm, start, goal, use_table=True)):
+        assert math.isclose(_path_cost(path, _cost8), runs["alt"][0])
+
+
+def test_saved_tables_are_tied_to_the_map(tmp_path):
+    gm = _serpentine(20)
+    path = tmp_path / "alt.npz"
+    with pytest.raises(ValueError):        # a plain cost function cannot be hashed
+        LandmarkHeuristic.load_or_build(path, gm, _cost8, num_landmarks=3)
+    alt = LandmarkHeuristic.load_or_build(path, gm, _cost8, num_landmarks=3, cost_key="octile")
+    again = LandmarkHeuristic.load_or_build(path, gm, _cost8, num_landmarks=3, cost_key="octile")
+    assert again.landmarks == alt.landmarks and np.array_equal(again.distances, alt.distances)
+    doubled = LandmarkHeuristic.load_or_build(path, gm, lambda u, v: 2 * _cost8(u, v),
+                                              num_landmarks=3, cost_key="octile x2")
+    assert doubled.key != alt.key and np.allclose(doubled.distances, 2 * alt.distances)
+
+    gm.clear_cell((4, 10))
+    rebuilt = LandmarkHeuristic.load_or_build(path, gm, _cost8, num_landmarks=3, cost_key="octile")
+    assert rebuilt.key != alt.key
+    assert LandmarkHeuristic.load(path, expected_key=rebuilt.key).key == rebuilt.key
@@ -0,0 +1,151 @@
+"""
+test_local_window.py
+
+Rolling window: after any sequence of moves it shows exactly the global
+cells under it (outside the map reads occupied), refreshes only the strips
+that came into view, follows global edits, and A* on it matches A* on a
+cropped copy of the map.
+"""
+
+import numpy as np
+
+from .a_star import a_star
+from .grid_map import GridMap
+from .heuristics import octile
+from .local_window import RollingWindow
+
+
+def _random_map(seed=0, h=60, w=80):
+    rng = np.random.default_rng(seed)
+    gm = GridMap(w, h, resolution=0.05, origin=(1.0, -2.0))
+    gm.grid = (rng.random((h, w)) < 0.2).astype(np.uint8)
+    return gm
+
+
+def _expected(gm, win):
+    out = np.ones((win.height, win.width), dtype=np.uint8)
+    for a in range(win.height):
+        for b in range(win.width):
+            gi, gj = a + win.row0, b + win.col0
+            if gm.in_bounds((gi, gj)):
+                out[a, b] = gm.grid[gi, gj]
+    return out
+
+
+def test_window_tracks_global_map_through_moves():
+    gm = _random_map()
+    win = RollingWindow(gm, width=21, height=15, center=(30, 40))
+    assert np.array_equal(win.grid, _expected(gm, win))
+
+    rng = np.random.default_rng(1)
+    for _ in range(40):
+        center = (win.row0 + 7 + int(rng.integers(-4, 5)), win.col0 + 10 + int(rng.integers(-4, 5)))
+        win.recenter(center)
+        assert np.array_equal(win.grid, _expected(gm, win))
+
+    win.recenter((-30, 200))       # jump off the map: everything reloaded
+    assert win.grid.all()
+    win.recenter((30, 40))
+    assert np.array_equal(win.grid, _expected(gm, win))
+
+
+def test_move_refreshes_only_exposed_cells():
+    gm = _random_map()
+    win = RollingWindow(gm, width=21, height=15, center=(30, 40))
+    before = win.cells_refreshed
+    win.recenter((31, 40))          # one row down
+    assert win.cells_refreshed - before == 21
+    before = win.cells_refreshed
+    win.recenter((31, 38))          # two columns left
+    assert win.cells_refreshed - before == 2 * 15
+    before = win.cells_refreshed
+    win.recenter((32, 39))          # diagonal: the corner cell is read once
+    assert win.cells_refreshed - before == 21 + 15 - 1
+    before = win.cells_refreshed
+    win.recenter((31, 38))
+    assert win.cells_refreshed - before == 21 + 15 - 1
+    assert np.array_equal(win.grid, _expected(gm, win))
+    before = win.cells_refreshed
+    win.recenter((31, 38))
+    assert win.cells_refreshed == before
+
+
+def test_global_edits_and_world_coordinates():
+    gm = _random_map()
+    gm.set_obstacle((30, 40))
+    win = RollingWindow(gm, width=21, height=15, center=(30, 40))
+    seen = win.version
+    gm.clear_cell((30, 40))
+    gm.clear_cell((31, 41))
+    gm.set_obstacle((31, 41))
+    gm.set_obstacle((0, 0))         # outside the window
+    win.refresh()
+    assert win.is_free(win.to_local((30, 40)))
+    assert win.is_occupied(win.to_local((31, 41)))
+    assert win.changes_since(seen) == [win.to_local((30, 40)), win.to_local((31, 41))]
+
+    win.clear_cell(win.to_local((31, 41)))   # edits go to the global map
+    assert not gm.is_occupied((31, 41))
+
+    gm.grid = np.zeros((gm.height, gm.width), dtype=np.uint8)
+    win.refresh()
+    assert not win.grid.any()
+
+    x, y = gm.grid_to_world((33, 45))
+    assert win.world_to_grid(x, y) == win.to_local((33, 45))
+    assert win.grid_to_world(win.to_local((33, 45))) == (x, y)
+
+
+def test_window_edits_write_through_to_global_map():
+    gm = _random_map(3)
+    win = RollingWindow(gm, width=11, height=9, center=(2, 3))     # hangs over the corner
+    win.set_obstacles([(4, 4), (4, 6), (50, 50)])
+    win.clear_cells([(5, 5), (0, 0)])                              # (0, 0) is off the map
+    assert gm.is_occupied((2, 2)) and gm.is_occupied((2, 4)) and not gm.is_occupied((3, 3))
+    assert np.array_equal(win.grid, _expected(gm, win))
+
+    inflated = win.inflate(1)
+    assert np.array_equal(win.grid, inflated)
+    assert np.array_equal(win.grid, _expected(gm, win))
+    win.grid = np.zeros((9, 11), dtype=np.uint8)
+    assert not gm.grid[:7, :9].any() and win.grid[:2].all()      # in-map cells cleared
+    assert np.array_equal(win.grid, _expected(gm, win))
+
+
+def test_a_star_on_window_matches_cropped_map():
+    gm = _random_map(seed=3)
+    gm.clear_cell((30, 40))
+    win = RollingWindow(gm, width=31, height=25, center=(30, 40))
+    crop = GridMap(win.width, win.height)
+    crop.grid = np.array(win.grid)
+
+    def step(u, v):
+        return 1.4142135623730951 if u[0] != v[0] and u[1] != v[1] else 1.0
+
+    start = win.to_local((30, 40))
+    free = np.argwhere(crop.grid == 0)
+    for goal in map(tuple, free[::37]):
+        got = a_star(win, start, goal, octile, step, connectivity=8)
+        want = a_star(crop, start, goal, octile, step, connectivity=8)
+        assert (got is None) == (want is None)
+        if got is not None:
+            assert sum(step(u, v) for u, v in zip(got, got[1:])) == \
+                   sum(step(u, v) for u, v in zip(want, want[1:]))
+
+    cost = win.global_cost(lambda u, v: float(u[0]))
+    assert cost((0, 0), (0, 1)) == float(win.row0)
+
+
+def test_region_reads_match_grid_for_every_storage():
+    from .grid_map import PackedGridMap
+    from .io.tiled import TiledGridMap
+    grid = np.asarray(_random_map(3).grid)
+    for gm in (GridMap(80, 60), PackedGridMap(80, 60), TiledGridMap(80, 60, tile_size=16)):
+        gm.grid = grid
+        for r0, r1, c0, c1 in ((0, 60, 0, 80), (5, 6, 3, 77), (17, 44, 9, 10), (31, 59, 13, 70)):
+            assert np.array_equal(gm.occupied_region(r0, r1, c0, c1), grid[r0:r1, c0:c1] != 0)
+        win = RollingWindow(gm, 21, 15, (30, 40))
+        win.recenter((33, 47))
+        assert np.array_equal(win.grid, _expected(gm, win))
+        assert np.array_equal(win.occupied_region(2, 9, 4, 20), win.grid[2:9, 4:20] != 0)
+        assert win.buffer[33 % 15, 47 % 21] == grid[33, 47]
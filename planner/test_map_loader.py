@@ -13,7 +13,7 @@ import numpy as np
 from PIL import Image
 
 from .io.map_loader import load_ros_yaml_map
-from .grid_map import GridMap
+from .grid_map import GridMap, PackedGridMap
 from .a_star import a_star
 from .heuristics import octile
 import math
@@ -61,4 +61,9 @@ free_thresh: 0.196
         start = (0, 0)            # bottom-left in GridMap indexing
         goal  = (4, 4)            # top-right
         path = a_star(gm, start, goal, heuristic=octile, cost_fn=_cost8, connectivity=8)
-        assert path is not None and path[0] == start and path[-1] == goal
\ No newline at end of file
+        assert path is not None and path[0] == start and path[-1] == goal
+
+        # Bit-packed storage holds the same cells
+        packed = load_ros_yaml_map(yaml_path, packed=True)
+        assert isinstance(packed, PackedGridMap)
+        assert (packed.grid == gm.grid).all() and packed.is_occupied((3, 2))
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+test_occupancy.py
+
+Log-odds mapping: scans simulated on a known map rebuild its walls, carve
+free space through stale obstacles, and publishing is throttled and
+journaled.
+"""
+
+import numpy as np
+
+from .grid_map import GridMap
+from .occupancy import OccupancyLayer
+from .raycast import cast_rays, scan_angles
+
+
+def _room():
+    truth = GridMap(40, 30, resolution=0.1, origin=(-2.0, -1.5))
+    grid = np.zeros((30, 40), dtype=np.uint8)
+    grid[0, :] = grid[-1, :] = grid[:, 0] = grid[:, -1] = 1
+    grid[10:20, 25] = 1
+    truth.grid = grid
+    return truth
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_scans_rebuild_walls_and_clear_stale_cells():
+    truth = _room()
+    poses = np.array([[-1.0, -0.5, 0.0], [0.5, 0.8, 1.0], [-0.5, 1.0, -2.0]])
+    angles = scan_angles(360)
+    ranges = cast_rays(truth, poses, angles, max_range=6.0)
+
+    gm = GridMap(40, 30, resolution=0.1, origin=(-2.0, -1.5))
+    gm.set_obstacle((15, 10))           # stale obstacle in the middle of the room
+    layer = OccupancyLayer(gm)
+    for _ in range(3):
+        layer.integrate(poses, angles, ranges, max_range=6.0)
+    assert layer.publish(force=True)
+
+    seen = gm.grid != 0
+    assert not gm.is_occupied((15, 10))
+    assert (seen <= (truth.grid != 0)).all()          # nothing marked that is free
+    assert seen[10:20, 25].sum() >= 8                 # the inner wall is found
+    assert layer.log_odds.max() <= layer.l_max and layer.log_odds.min() >= layer.l_min
+    assert 0.0 < layer.probability().min() < 0.5 < layer.probability().max() < 1.0
+
+
+def test_publish_is_throttled_and_journaled():
+    gm = GridMap(20, 20)
+    clock = _Clock()
+    layer = OccupancyLayer(gm, publish_interval=0.5, clock=clock)
+    layer.integrate([(10.5, 10.5, 0.0)], [0.0], [[4.0]], max_range=8.0)
+    layer.integrate([(10.5, 10.5, 0.0)], [0.0], [[4.0]], max_range=8.0)
+
+    v0 = gm.version
+    assert layer.publish()
+    assert gm.changes_since(v0) == [(10, 14)]
+    clock.now = 0.2
+    assert not layer.publish()
+    clock.now = 0.6
+    assert layer.publish()
+
+    # misses clear free space but mark nothing
+    layer.integrate([(0.5, 0.5, 0.0)], [0.0], [[np.inf]], max_range=5.0)
+    assert (layer.log_odds[0, :5] < 0).all() and layer.log_odds[0, 5:].max() == 0
+
+
+def test_beams_update_every_crossed_cell_once():
+    import math
+    rng = np.random.default_rng(5)
+    gm = GridMap(30, 25, resolution=0.2, origin=(-1.0, 0.5))
+    layer = OccupancyLayer(gm)
+    for _ in range(100):
+        ox, oy = rng.uniform(-2.0, 6.0), rng.uniform(0.0, 6.0)
+        theta, r, hit = rng.uniform(-math.pi, math.pi), rng.uniform(0.1, 4.0), rng.random() < 0.5
+        free, ends = layer._beam_cells(np.array([ox]), np.array([oy]), np.array([theta]),
+                                       np.array([r]), np.array([hit]))
+        # dense marching: every cell the segment passes through
+        ts = np.linspace(0.0, r + 1e-6 * gm.resolution, 20000)
+        i = np.floor((oy + ts * math.sin(theta) - gm.origin[1]) / gm.resolution).astype(int)
+        j = np.floor((ox + ts * math.cos(theta) - gm.origin[0]) / gm.resolution).astype(int)
+        on = (i >= 0) & (i < gm.height) & (j >= 0) & (j < gm.width)
+        marched = set((i[on] * gm.width + j[on]).tolist())
+        end = {int(i[-1] * gm.width + j[-1])} if hit and on[-1] else set()
+        assert set(ends.tolist()) == end
+        assert marched - end <= set(free.tolist()) and len(set(free.tolist())) == free.size
+
+
+def test_integrate_memory_is_bounded_by_chunks():
+    import tracemalloc
+    gm = GridMap(200, 200, resolution=0.05)
+    poses = np.array([[5.0, 5.0, 0.0], [2.0, 7.0, 1.0], [8.0, 3.0, 2.0]])
+    angles = scan_angles(360)
+    ranges = np.full((3, 360), 20.0)                 # all misses, beams cross the map
+    whole, chunked = OccupancyLayer(gm), OccupancyLayer(GridMap(200, 200, resolution=0.05))
+    whole.integrate(poses, angles, ranges, max_range=20.0)
+    tracemalloc.start()
+    try:
+        chunked.integrate(poses, angles, ranges, max_range=20.0, max_cells=20000)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert np.allclose(whole.log_odds, chunked.log_odds)
+    assert peak < 2 * 1024 * 1024        # unchunked, these beams take ~4 MB
@@ -5,9 +5,11 @@ Provides sanity check for map methods and ensures that
 GridMap and A* are working correctly.
 """
 
-from .grid_map import GridMap
+from .grid_map import GridMap, PackedGridMap
 from .a_star import a_star
 from typing import List, Tuple, Optional
+import numpy as np
+import pytest
 from .heuristics import manhattan, octile
 
 # -------------------
@@ -142,4 +144,206 @@ def test_inflation_blocks_narrow_corridor():
     # Inflate obstacles -> corridor closes
     gm.inflate(radius_cells=1)
     p_infl = a_star(gm, start, goal, heuristic=manhattan, cost_fn=_cost4, connectivity=4)
-    assert p_infl is None, "Inflation should have closed the corridor"
\ No newline at end of file
+    assert p_infl is None, "Inflation should have closed the corridor"
+
+def test_disc_inflation_keeps_diagonal_gaps():
+    """
+    A disc footprint of radius 1 only blocks the 4 orthogonal neighbors,
+    while the square footprint also blocks the diagonals.
+    """
+    gm = GridMap(width=5, height=5, resolution=1.0)
+    gm.set_obstacle((2, 2))
+
+    disc = gm.inflate(radius_cells=1, footprint="disc", layer="disc")
+    square = gm.inflate(radius_cells=1, footprint="square", layer="square")
+
+    assert disc.sum() == 5 and square.sum() == 9
+    assert disc[1, 1] == 0 and square[1, 1] == 1
+    assert disc[1, 2] == 1 and disc[2, 3] == 1
+
+
+def test_inflation_into_layer_leaves_grid_untouched():
+    gm = GridMap(width=7, height=5, resolution=1.0)
+    gm.set_obstacle((2, 3))
+    before = gm.grid.copy()
+
+    layer = gm.inflate(radius_cells=2, layer="robot")
+    assert (gm.grid == before).all()
+    assert gm.layers["robot"] is layer
+    assert layer[0:5, 1:6].all() and layer.sum() == 25
+
+
+def test_octile_is_exact_on_empty_grid():
+    """Octile must equal the true 8-connected cost (never overestimate)."""
+    for di in range(6):
+        for dj in range(6):
+            diag = min(di, dj)
+            exact = diag * math.sqrt(2.0) + (max(di, dj) - diag)
+            assert math.isclose(octile((0, 0), (di, dj)), exact)
+
+
+def test_changes_since_reports_edited_cells():
+    gm = GridMap(width=6, height=6, resolution=1.0)
+    v0 = gm.version
+    gm.set_obstacle((1, 1))
+    gm.set_obstacle((1, 1))          # no-op: already occupied
+    gm.clear_cell((4, 4))            # no-op: already free
+    gm.set_obstacle((2, 3))
+    gm.clear_cell((1, 1))
+    assert gm.version == v0 + 3
+    assert gm.changes_since(v0) == [(1, 1), (2, 3)]
+    assert gm.changes_since(gm.version) == []
+
+    gm.inflate(radius_cells=1)       # bulk edit: history is gone
+    assert gm.changes_since(v0) is None
+    assert gm.changes_since(gm.version) == []
+
+
+def test_packed_grid_map_matches_grid_map():
+    rng = np.random.default_rng(0)
+    grid = (rng.random((13, 21)) < 0.3).astype(np.uint8)
+    gm, pm = GridMap(21, 13), PackedGridMap(21, 13)
+    gm.grid = grid
+    pm.grid = grid
+    assert pm.nbytes == 13 * 3 and (pm.grid == grid).all()
+
+    v0 = pm.version
+    for cell in [(0, 0), (5, 8), (12, 20), (3, 7)]:
+        for m in (gm, pm):
+            m.clear_cell(cell) if m.is_occupied(cell) else m.set_obstacle(cell)
+    assert pm.changes_since(v0) == [(0, 0), (5, 8), (12, 20), (3, 7)]
+    assert (pm.grid == gm.grid).all()
+    for i in range(13):
+        for j in range(21):
+            assert pm.is_occupied((i, j)) == gm.is_occupied((i, j))
+            assert pm.get_neighbors((i, j), 8) == gm.get_neighbors((i, j), 8)
+
+    start, goal = (0, 1), (12, 19)
+    gm.clear_cell(start); gm.clear_cell(goal); pm.clear_cell(start); pm.clear_cell(goal)
+    cost = lambda u, v: 1.0
+    assert a_star(pm, start, goal, manhattan, cost) == a_star(gm, start, goal, manhattan, cost)
+    pm.inflate(1)
+    gm.inflate(1)
+    assert (pm.grid == gm.grid).all() and pm.nbytes == 13 * 3
+
+
+def test_move_masks_track_edits():
+    rng = np.random.default_rng(1)
+    gm = GridMap(17, 11)
+    gm.grid = (rng.random((11, 17)) < 0.3).astype(np.uint8)
+    ref = PackedGridMap(17, 11)          # no move masks: per-cell checks
+    ref.grid = gm.grid
+
+    def check():
+        for i in range(-1, 12):
+            for j in range(-1, 18):
+                for conn in (4, 8):
+                    for through in (False, True):
+                        assert gm.get_neighbors((i, j), conn, through) == \
+                            ref.get_neighbors((i, j), conn, through)
+
+    check()
+    masks = gm.move_masks()
+    for _ in range(40):
+        cell = (int(rng.integers(11)), int(rng.integers(17)))
+        for m in (gm, ref):
+            m.clear_cell(cell) if m.is_occupied(cell) else m.set_obstacle(cell)
+    assert gm.move_masks() is masks      # updated in place, not rebuilt
+    check()
+    gm.inflate(1)
+    ref.inflate(1)
+    check()
+
+
+def test_grid_is_read_only_so_move_masks_stay_current():
+    gm = GridMap(5, 1)
+    gm.move_masks()
+    with pytest.raises(ValueError):
+        gm.grid[0, 2] = 1                  # would bypass versioning and the masks
+    gm.set_obstacle((0, 2))
+    assert a_star(gm, (0, 0), (0, 4), manhattan, lambda u, v: 1.0) is None
+
+    other = GridMap(5, 1)
+    other.grid = gm.grid                   # read-only source: copied, still editable
+    other.clear_cell((0, 2))
+    assert gm.is_occupied((0, 2)) and not other.is_occupied((0, 2))
+
+    g = np.zeros((1, 5), dtype=np.uint8)
+    gm.grid = g                            # the map takes a copy
+    assert a_star(gm, (0, 0), (0, 4), manhattan, lambda u, v: 1.0) is not None
+    g[0, 2] = 1                            # so the caller's array is no back door
+    assert not gm.is_occupied((0, 2))
+    assert a_star(gm, (0, 0), (0, 4), manhattan, lambda u, v: 1.0) == [(0, k) for k in range(5)]
+    gm.grid = g
+    assert a_star(gm, (0, 0), (0, 4), manhattan, lambda u, v: 1.0) is None
+
+
+def test_heuristic_tables_match_scalar_functions():
+    from .heuristics import REGISTRY, HeuristicTable, weighted
+    shape, goal = (9, 14), (3, 11)
+    hs = list(REGISTRY.values()) + [weighted(manhattan, 1.5), weighted(octile, 2.25)]
+    for h in hs:
+        table = h.table(shape, goal)
+        assert table.shape == shape
+        for i in range(shape[0]):
+            for j in range(shape[1]):
+                assert table[i, j] == h((i, j), goal)
+
+    cache = HeuristicTable(maxsize=2)
+    first = cache.get(weighted(octile, 2.0), shape, goal)
+    assert cache.get(weighted(octile, 2.0), shape, goal) is first    # same weighting, shared
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.get(lambda a, b: 0.0, shape, goal) is None          # no table: caller calls it
+    assert HeuristicTable(max_bytes=8 * 10).get(octile, shape, goal) is None
+
+    cache = HeuristicTable(max_bytes=2 * 8 * 9 * 14)    # room for two tables
+    tables = [cache.get(octile, shape, g) for g in [(0, 0), (1, 1), (2, 2)]]
+    assert cache.get(octile, shape, (0, 0), build=False) is None      # evicted for the third
+    assert cache.get(octile, shape, (2, 2), build=False) is tables[2]
+
+
+def test_heuristic_tables_are_opt_in_and_do_not_keep_heuristics_alive():
+    import gc
+    import weakref
+    from .heuristics import TABLES, HeuristicTable, LandmarkHeuristic
+    gm = GridMap(12, 9)
+    TABLES.clear()
+    hits, misses = TABLES.hits, TABLES.misses
+    expected = a_star(gm, (0, 0), (8, 11), octile, _cost8, connectivity=8)
+    assert TABLES.misses == misses + 1 and len(TABLES._tables) == 0    # looked up, not built
+    assert a_star(gm, (0, 0), (8, 11), octile, _cost8, connectivity=8, use_table=True) == expected
+    assert a_star(gm, (0, 0), (8, 11), octile, _cost8, connectivity=8) == expected
+    assert TABLES.hits == hits + 1                                     # built once, then reused
+    TABLES.clear()
+
+    with pytest.warns(RuntimeWarning, match="has no table"):
+        assert a_star(gm, (0, 0), (8, 11), lambda a, b: 0.0, _cost8, 8, use_table=True) is not None
+
+    cache = HeuristicTable()
+    alt = LandmarkHeuristic.build(gm, _cost8, num_landmarks=2)
+    assert cache.get(alt, (9, 12), (4, 4), build=False) is None
+    assert cache.get(alt, (9, 12), (4, 4)) is not None
+    ref = weakref.ref(alt)
+    del alt
+    gc.collect()
+    assert ref() is None                       # the cached table does not hold it
+    cache.get(octile, (9, 12), (4, 4))         # next build drops the dead entry
+    assert len(cache._tables) == 1
+
+
+def test_batch_edits_match_single_cell_edits():
+    from .io.tiled import TiledGridMap
+    cells = [(1, 2), (30, 30), (4, 4), (1, 2), (-1, 0), (7, 9)]
+    for cls in (GridMap, PackedGridMap, TiledGridMap):
+        gm = cls(12, 10) if cls is not TiledGridMap else cls(12, 10, tile_size=4)
+        gm.set_obstacle((4, 4))
+        if gm.use_move_masks:
+            gm.move_masks()           # built, so the batch edit must keep it current
+        v0 = gm.version
+        gm.set_obstacles(cells)
+        assert gm.changes_since(v0) == [(1, 2), (7, 9)]
+        assert gm.is_occupied((1, 2)) and gm.is_occupied((7, 9)) and gm.grid.sum() == 3
+        gm.clear_cells(np.array([(4, 4), (0, 0)]))
+        assert not gm.is_occupied((4, 4)) and gm.changes_since(v0)[-1] == (4, 4)
+        if gm.use_move_masks:
+            assert gm.get_neighbors((4, 5), 4) == [(3, 5), (5, 5), (4, 4), (4, 6)]
@@ -0,0 +1,134 @@
+"""
+test_pyramid.py
+
+Map pyramid: levels are conservative max-pools with consistent world
+coordinates and follow base edits incrementally; coarse-to-fine paths are
+valid, agree with A* on reachability and stay near the optimum.
+"""
+
+import math
+import numpy as np
+import pytest
+
+from .a_star import a_star
+from .grid_map import GridMap, PackedGridMap
+from .heuristics import octile
+from .pyramid import CoarseToFinePlanner, MapPyramid, max_pool
+
+
+def _cost8(u, v):
+    return math.sqrt(2.0) if u[0] != v[0] and u[1] != v[1] else 1.0
+
+
+def _path_cost(path):
+    return sum(_cost8(u, v) for u, v in zip(path, path[1:]))
+
+
+def _pool_reference(grid, f):
+    H, W = grid.shape
+    out = np.zeros((-(-H // f), -(-W // f)), dtype=np.uint8)
+    for i in range(H):
+        for j in range(W):
+            if grid[i, j]:
+                out[i // f, j // f] = 1
+    return out
+
+
+def test_levels_are_max_pools_with_matching_coordinates():
+    rng = np.random.default_rng(0)
+    gm = GridMap(37, 22, resolution=0.05, origin=(-1.0, 2.0))
+    gm.grid = (rng.random((22, 37)) < 0.05).astype(np.uint8)
+    pyr = gm.pyramid((2, 4))
+    assert pyr is gm.pyramid((2, 4))
+    for f in (2, 4):
+        level = pyr.level(f)
+        assert np.array_equal(level.grid, _pool_reference(gm.grid, f))
+        assert level.resolution == pytest.approx(0.05 * f) and level.origin == gm.origin
+        for cell in [(0, 0), (21, 36), (13, 9)]:
+            x, y = gm.grid_to_world(cell)
+            assert level.world_to_grid(x, y) == (cell[0] // f, cell[1] // f)
+    assert np.array_equal(max_pool(gm.grid, 8), _pool_reference(gm.grid, 8))
+
+    with pytest.raises(ValueError):
+        MapPyramid(gm, (2, 3))
+
+
+@pytest.mark.parametrize("cls", [GridMap, PackedGridMap])
+def test_pyramid_follows_edits(cls):
+    rng = np.random.default_rng(1)
+    gm = cls(30, 26)
+    gm.grid = (rng.random((26, 30)) < 0.1).astype(np.uint8)
+    pyr = gm.pyramid((2, 4))
+    coarse = pyr.level(4)
+    for _ in range(5):
+        seen, before = coarse.version, coarse.grid.copy()
+        for _ in range(10):
+            cell = (int(rng.integers(26)), int(rng.integers(30)))
+            (gm.set_obstacle if rng.random() < 0.5 else gm.clear_cell)(cell)
+        assert gm.pyramid((2, 4)) is pyr
+        for f in (2, 4):
+            assert np.array_equal(pyr.level(f).grid, _pool_reference(gm.grid, f))
+        # levels are journaled: the changed coarse cells are exactly the diff
+        diff = {tuple(c) for c in np.argwhere(coarse.grid != before)}
+        assert set(coarse.changes_since(seen)) == diff
+
+    gm.grid = np.zeros((26, 30), dtype=np.uint8)      # bulk replacement: rebuild
+    gm.pyramid((2, 4))
+    assert not pyr.level(2).grid.any() and not pyr.level(4).grid.any()
+
+
+def test_coarse_to_fine_matches_a_star():
+    rng = np.random.default_rng(2)
+    ratios = []
+    for trial in range(30):
+        H, W = (int(x) for x in rng.integers(8, 60, size=2))
+        gm = GridMap(W, H)
+        gm.grid = (rng.random((H, W)) < 0.03 + 0.01 * (trial % 10)).astype(np.uint8)
+        planner = CoarseToFinePlanner(gm, octile, _cost8, factors=(2, 4))
+        for _ in range(4):
+            start = (int(rng.integers(H)), int(rng.integers(W)))
+            goal = (int(rng.integers(H)), int(rng.integers(W)))
+            expected = a_star(gm, start, goal, octile, _cost8, connectivity=8)
+            path = planner.plan(start, goal)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert path[0] == start and path[-1] == goal
+                assert all(b in gm.get_neighbors(a, 8) for a, b in zip(path, path[1:]))
+                if len(expected) > 1:
+                    ratios.append(_path_cost(path) / _path_cost(expected))
+            gm.set_obstacle((int(rng.integers(H)), int(rng.integers(W))))
+    assert max(ratios) < 1.5
+
+
+def test_narrow_passage_falls_back_to_finer_levels():
+    gm = GridMap(40, 40)
+    # wall with a one-cell door at (21, 20): closed at every coarse level
+    gm.set_obstacles([(i, 20) for i in range(40) if i != 21])
+    planner = CoarseToFinePlanner(gm, octile, _cost8, factors=(2, 4))
+    path = planner.plan((5, 5), (35, 35))
+    assert path is not None and (21, 20) in path
+    assert planner.levels_used == [4, 2, 1]
+
+    open_map = GridMap(64, 64)
+    planner = CoarseToFinePlanner(open_map, octile, _cost8, factors=(2, 4))
+    path = planner.plan((1, 1), (60, 62))
+    assert planner.levels_used == [4, 2, 1] and planner.fallbacks == 0
+    assert _path_cost(path) == pytest.approx(_path_cost(a_star(open_map, (1, 1), (60, 62), octile, _cost8, 8)))
+
+
+def test_corridor_search_expands_fewer_nodes_than_a_star():
+    from .costs import make_cost_field
+    from .instrumentation import SearchStats
+    rng = np.random.default_rng(7)
+    gm = GridMap(120, 120)
+    grid = (rng.random((120, 120)) < 0.05).astype(np.uint8)
+    grid[:8, :8] = grid[-8:, -8:] = 0          # start and goal blocks clear at every level
+    gm.grid = grid
+    cost = make_cost_field(gm)
+    planner = CoarseToFinePlanner(gm, octile, cost, factors=(2, 4))
+    path = planner.plan((2, 2), (117, 117))
+    stats = SearchStats(timing=False)
+    expected = a_star(gm, (2, 2), (117, 117), octile, cost, connectivity=8, stats=stats)
+    assert path is not None and expected is not None
+    assert planner.levels_used == [4, 2, 1] and planner.fallbacks == 0
+    assert planner.expansions < stats.expansions
@@ -0,0 +1,96 @@
+"""
+test_raycast.py
+
+Batched raycasting: ranges agree with dense ray marching in world
+coordinates, misses return max_range, and line of sight / path smoothing
+never cross obstacles.
+"""
+
+import math
+import numpy as np
+
+from .grid_map import GridMap
+from .a_star import a_star
+from .heuristics import octile
+from .raycast import cast_rays, line_of_sight, line_of_sight_many, scan_angles, smooth_path
+
+
+def _cost8(u, v):
+    di = abs(u[0] - v[0]); dj = abs(u[1] - v[1])
+    return math.sqrt(2.0) if di == 1 and dj == 1 else 1.0
+
+
+def _march(gm, x, y, theta, max_range, step=1e-3):
+    """Reference: sample the ray densely and stop in the first occupied cell."""
+    for k in range(int(max_range / step) + 1):
+        t = k * step
+        # world_to_grid, but flooring so points just outside the map stay outside
+        i = math.floor((y + t * math.sin(theta) - gm.origin[1]) / gm.resolution)
+        j = math.floor((x + t * math.cos(theta) - gm.origin[0]) / gm.resolution)
+        if not gm.in_bounds((i, j)):
+            return max_range
+        if gm.is_occupied((i, j)):
+            return t
+    return max_range
+
+
+def test_ranges_match_ray_marching():
+    rng = np.random.default_rng(0)
+    gm = GridMap(30, 20, resolution=0.1, origin=(-1.0, 2.0))
+    gm.grid = (rng.random((20, 30)) < 0.08).astype(np.uint8)
+    free = np.argwhere(gm.grid == 0)
+    poses = []
+    for i, j in free[rng.choice(len(free), 4, replace=False)]:
+        x, y = gm.grid_to_world((int(i), int(j)))
+        poses.append((x + rng.uniform(-0.04, 0.04), y + rng.uniform(-0.04, 0.04), rng.uniform(-3, 3)))
+    angles = scan_angles(36)
+    ranges = cast_rays(gm, np.array(poses), angles, max_range=1.5)
+    assert ranges.shape == (4, 36)
+    for p, (x, y, th) in enumerate(poses):
+        for b, a in enumerate(angles):
+            assert abs(ranges[p, b] - _march(gm, x, y, th + a, 1.5)) < 2e-3
+
+
+def test_known_wall_misses_and_noise():
+    gm = GridMap(20, 20, resolution=0.5)
+    for i in range(20):
+        gm.set_obstacle((i, 15))                      # wall at x = 7.5 m
+    pose = (4.25, 5.25, 0.0)
+    r = cast_rays(gm, pose, [0.0, math.pi, math.pi / 2], max_range=4.5)
+    assert r.shape == (3,)
+    assert math.isclose(r[0], 7.5 - 4.25)
+    assert r[1] == 4.5                                        # leaves the map at x = 0
+    assert r[2] == 4.5                                        # nothing within range
+    noisy = cast_rays(gm, np.tile(pose, (50, 1)), [0.0], max_range=10.0,
+                      noise_std=0.05, rng=np.random.default_rng(1))
+    assert noisy.std() > 0 and abs(noisy.mean() - 3.25) < 0.05
+
+
+def test_line_of_sight_and_smoothing():
+    gm = GridMap(30, 30)
+    for i in range(25):
+        gm.set_obstacle((i, 15))
+    assert line_of_sight(gm, (2, 2), (20, 12))
+    assert not line_of_sight(gm, (2, 2), (2, 20))
+    # diagonal through two touching corners is blocked
+    gm2 = GridMap(4, 4)
+    gm2.set_obstacle((0, 1)); gm2.set_obstacle((1, 0))
+    assert not line_of_sight(gm2, (0, 0), (1, 1))
+    assert line_of_sight_many(gm, [(5, 5), (5, 5)], [(5, 5), (29, 29)]).tolist() == [True, False]
+
+    path = a_star(gm, (2, 2), (2, 28), octile, _cost8, connectivity=8)
+    smooth = smooth_path(gm, path)
+    assert smooth[0] == path[0] and smooth[-1] == path[-1]
+    assert len(smooth) < len(path) / 5
+    assert all(line_of_sight(gm, a, b) for a, b in zip(smooth, smooth[1:]))
+
+
+def test_rays_from_off_the_map_start_where_they_enter():
+    gm = GridMap(10, 10)
+    gm.set_obstacle((5, 7))
+    r = cast_rays(gm, [(5.0, 15.0, 0.0), (5.0, 15.0, -math.pi / 2), (-5.0, 5.5, 0.0), (-5.0, 5.5, math.pi)],
+                  [0.0], max_range=30.0)
+    assert r[:, 0].tolist() == [30.0, 30.0, 12.0, 30.0]    # misses, exits, hits (5, 7), faces away
+    assert cast_rays(gm, (-5.0, 5.5, 0.0), [0.0], max_range=10.0)[0] == 10.0   # out of range
+    assert not line_of_sight(gm, (0, 0), (12, 12)) and not line_of_sight(gm, (-1, 3), (2, 3))
+    assert line_of_sight(gm, (0, 0), (9, 9))
@@ -0,0 +1,194 @@
+"""
+test_server.py
+
+Planning server: answers match a_star on the resident map in both frames,
+identical concurrent queries share one search, deadlines and bad requests
+come back as errors, and the socket protocol works with thread and process
+pools.
+"""
+
+import asyncio
+import json
+
+import numpy as np
+
+from .a_star import a_star
+from .grid_map import GridMap
+from .heuristics import octile
+from .server import PlanningServer
+
+
+def _map():
+    rng = np.random.default_rng(4)
+    gm = GridMap(60, 40, resolution=0.1, origin=(-1.0, 0.5))
+    grid = (rng.random((40, 60)) < 0.15).astype(np.uint8)
+    grid[2, 2] = grid[37, 57] = 0
+    gm.grid = grid
+    return gm
+
+
+def test_plan_matches_a_star_in_both_frames():
+    async def run():
+        server = PlanningServer(workers=2, executor="thread")
+        entry = server.add_map("lab", _map(), inflate=0)
+        expected = a_star(entry.plan_map, (2, 2), (37, 57), octile, entry.cost, connectivity=8)
+
+        grid = await server.handle({"id": 1, "op": "plan", "map": "lab", "frame": "grid",
+                                    "start": [2, 2], "goal": [37, 57]})
+        assert grid["ok"] and grid["id"] == 1
+        assert [tuple(c) for c in grid["path"]] == expected
+        assert grid["cost"] > 0 and grid["seconds"] >= 0
+
+        gm = entry.plan_map
+        world = await server.handle({"op": "plan", "map": "lab",
+                                     "start": gm.grid_to_world((2, 2)), "goal": gm.grid_to_world((37, 57))})
+        assert world["path"] == [list(gm.grid_to_world(c)) for c in expected]
+
+        maps = await server.handle({"op": "maps"})
+        assert maps["maps"][0]["name"] == "lab" and maps["maps"][0]["width"] == 60
+        server.close()
+    asyncio.run(run())
+
+
+def test_inflated_map_and_errors():
+    async def run():
+        server = PlanningServer(workers=1, executor="thread")
+        gm = GridMap(30, 30)
+        # wall with a 3-cell gap, closed by inflation
+        gm.set_obstacles([(i, 15) for i in range(30) if not 10 <= i < 13])
+        server.add_map("open", gm)
+        version = gm.version
+        server.add_map("tight", gm, inflate=2)
+        assert gm.version == version and not gm.layers          # caller's map untouched
+        req = {"op": "plan", "frame": "grid", "start": [5, 5], "goal": [25, 25]}
+        assert (await server.handle(dict(req, map="open")))["path"] is not None
+        tight = await server.handle(dict(req, map="tight"))
+        assert tight["ok"] and tight["path"] is None
+
+        for bad in ({"op": "plan", "map": "nope", "start": [0, 0], "goal": [1, 1]},
+                    {"op": "fly"},
+                    dict(req, map="open", connectivity=6),
+                    dict(req, map="open", frame="polar")):
+            reply = await server.handle(bad)
+            assert not reply["ok"] and reply["error"]
+        assert (await server.handle({"op": "unload_map", "name": "open"}))["unloaded"]
+        server.close()
+    asyncio.run(run())
+
+
+def test_identical_queries_share_one_search_and_deadlines():
+    async def run():
+        server = PlanningServer(workers=1, executor="thread", max_pending=1)
+        big = GridMap(300, 300)
+        big.set_obstacles([(200, j) for j in range(290)])   # long wall: reaching (299, 0) takes a while
+        server.add_map("big", big)
+        far = {"op": "plan", "map": "big", "frame": "grid", "start": [0, 0], "goal": [299, 299]}
+        replies = await asyncio.gather(*[server.handle(dict(far, id=k)) for k in range(5)])
+        assert server.searches == 1 and server.merged == 4
+        assert all(r["path"] == replies[0]["path"] for r in replies)
+        assert sorted(r["merged"] for r in replies) == [False] + [True] * 4
+
+        # the only slot is busy: a short deadline expires before the search starts
+        # and the abandoned search is dropped
+        slow = asyncio.ensure_future(server.handle(dict(far, goal=[299, 0])))
+        await asyncio.sleep(0.01)
+        late = await server.handle(dict(far, goal=[0, 299], deadline=0.001))
+        assert late == {"id": None, "ok": False, "error": "deadline exceeded"}
+        assert (await slow)["ok"]
+        await asyncio.sleep(0)
+        assert server.searches == 2
+        server.close()
+    asyncio.run(run())
+
+
+def test_abandoned_search_queued_on_the_pool_is_dropped(monkeypatch):
+    from . import server as srv
+    ran, original = [], srv._plan_on
+
+    def plan_on(gm, cost, start, goal, *args):
+        ran.append(goal)
+        return original(gm, cost, start, goal, *args)
+
+    monkeypatch.setattr(srv, "_plan_on", plan_on)
+
+    async def run():
+        server = PlanningServer(workers=1, executor="thread", max_pending=2)
+        big = GridMap(300, 300)
+        big.set_obstacles([(200, j) for j in range(290)])
+        server.add_map("big", big)
+        far = {"op": "plan", "map": "big", "frame": "grid", "start": [0, 0]}
+        slow = asyncio.ensure_future(server.handle(dict(far, goal=[299, 0])))
+        await asyncio.sleep(0.01)
+        # a slot is free but the only worker is busy: the search waits in the pool
+        late = await server.handle(dict(far, goal=[0, 299], deadline=0.001))
+        assert late["error"] == "deadline exceeded"
+        assert (await slow)["ok"]
+        again = await server.handle(dict(far, goal=[0, 299]))     # not merged into the dropped one
+        assert again["ok"] and not again["merged"]
+        assert ran == [(299, 0), (0, 299)] and server.searches == 3
+        server.close()
+    asyncio.run(run())
+
+
+async def _exchange(reader, writer, requests):
+    for req in requests:
+        writer.write(json.dumps(req).encode() + b"\n")
+    writer.write(b"not json\n")
+    await writer.drain()
+    replies = [json.loads(await reader.readline()) for _ in range(len(requests) + 1)]
+    writer.close()
+    return replies
+
+
+def test_socket_protocol_with_thread_and_process_pools(tmp_path):
+    gm = _map()
+    requests = [{"id": k, "op": "plan", "map": "lab", "frame": "grid", "start": [2, 2], "goal": list(goal)}
+                for k, goal in enumerate([(37, 57), (20, 30), (37, 57)])]
+
+    async def run(executor):
+        server = PlanningServer(workers=1, executor=executor, max_per_connection=2)
+        entry = server.add_map("lab", gm)
+        if executor == "thread":
+            listener = await server.serve_tcp("127.0.0.1", 0)
+            reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+        else:
+            path = str(tmp_path / "planner.sock")
+            listener = await server.serve_unix(path)
+            reader, writer = await asyncio.open_unix_connection(path)
+        try:
+            replies = await _exchange(reader, writer, requests)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+        by_id = {r["id"]: r for r in replies}
+        assert not by_id[None]["ok"] and "bad request" in by_id[None]["error"]
+        for req in requests:
+            expected = a_star(entry.plan_map, (2, 2), tuple(req["goal"]), octile, entry.cost, connectivity=8)
+            assert [tuple(c) for c in by_id[req["id"]]["path"]] == expected
+
+    asyncio.run(run("thread"))
+    asyncio.run(run("process"))
+
+
+def test_workers_let_go_of_unloaded_maps():
+    from . import server as srv
+    server = PlanningServer(workers=1, executor="process")
+    a, b = server.add_map("a", _map()), server.add_map("b", _map())
+    try:
+        def plan(entry):
+            live = frozenset(m.generation for m in server.maps.values())
+            return srv._plan_in_worker(entry.name, entry.generation, entry.spec, (2, 2), (37, 57), 8, None, live)
+
+        assert plan(a)["path"] == plan(b)["path"] is not None
+        assert set(srv._attached) == {"a", "b"}
+        server.unload_map("a")
+        b2 = server.add_map("b", _map())             # reload: new generation
+        plan(b2)
+        assert set(srv._attached) == {"b"} and srv._attached["b"][0] == b2.generation
+    finally:
+        for _, handles, _, _ in srv._attached.values():
+            for shm in handles:
+                shm.close()
+        srv._attached.clear()
+        server.close()
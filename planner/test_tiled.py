@@ -0,0 +1,86 @@
+# planner/test_tiled.py
+"""
+Tiled maps: write/load round trip, lazy tile reads with a bounded LRU, edits
+that survive eviction, and A* on a TiledGridMap matching A* on a GridMap.
+"""
+
+import numpy as np
+import pytest
+
+from .a_star import a_star
+from .grid_map import GridMap
+from .heuristics import manhattan
+from .io.tiled import TiledGridMap, load_tiled_map, write_tiled_map
+
+
+def _unit(u, v):
+    return 1.0
+
+
+def _random_grid(seed, shape=(70, 90), density=0.2):
+    rng = np.random.default_rng(seed)
+    return (rng.random(shape) < density).astype(np.uint8)
+
+
+def test_round_trip_and_neighbors(tmp_path):
+    grid = _random_grid(0)
+    write_tiled_map(tmp_path / "m.yaml", grid, resolution=0.1, origin=(2.0, -1.0), tile_size=16)
+    tm = load_tiled_map(tmp_path / "m.yaml", max_tiles=4)
+    assert (tm.width, tm.height, tm.resolution, tm.origin) == (90, 70, 0.1, (2.0, -1.0))
+    assert tm.tiles_loaded == 0
+
+    gm = GridMap(90, 70)
+    gm.grid = grid
+    for i in range(70):
+        for j in range(90):
+            assert tm.get_neighbors((i, j), 8) == gm.get_neighbors((i, j), 8)
+    assert tm.resident_tiles <= 4
+    assert (tm.grid == grid).all()
+
+
+def test_search_reads_only_touched_tiles(tmp_path):
+    grid = np.zeros((256, 256), dtype=np.uint8)
+    grid[10:20, 15] = 1
+    write_tiled_map(tmp_path / "m.yaml", grid, tile_size=32)
+    tm = load_tiled_map(tmp_path / "m.yaml")
+
+    gm = GridMap(256, 256)
+    gm.grid = grid
+    path = a_star(tm, (12, 5), (14, 30), manhattan, _unit)
+    assert path == a_star(gm, (12, 5), (14, 30), manhattan, _unit)
+    assert tm.tiles_loaded <= 4          # of 64 tiles
+
+
+def test_edits_are_pinned_and_journaled(tmp_path):
+    write_tiled_map(tmp_path / "m.yaml", np.zeros((40, 40), dtype=np.uint8), tile_size=8)
+    tm = load_tiled_map(tmp_path / "m.yaml", max_tiles=1)
+    v0 = tm.version
+    tm.set_obstacle((3, 3))
+    tm.set_obstacle((3, 3))
+    for i in range(40):                  # cycle every tile through the LRU
+        tm.is_occupied((i, i))
+    assert tm.is_occupied((3, 3))
+    assert tm.changes_since(v0) == [(3, 3)]
+    # the file is untouched
+    assert not load_tiled_map(tmp_path / "m.yaml").is_occupied((3, 3))
+
+    tm.grid = np.ones((40, 40), dtype=np.uint8)
+    assert tm.is_occupied((0, 0)) and tm.changes_since(v0) is None
+
+
+def test_reads_see_edits_after_eviction(tmp_path):
+    write_tiled_map(tmp_path / "m.yaml", np.zeros((16, 16), dtype=np.uint8), tile_size=8)
+    tm = load_tiled_map(tmp_path / "m.yaml", max_tiles=1)
+    assert not tm.is_occupied((0, 0))
+    tm.set_obstacle((0, 8))              # loads tile (0, 1), evicting the last-read tile
+    tm.set_obstacle((1, 1))              # reloads tile (0, 0) and pins it
+    assert tm.is_occupied((1, 1)) and tm.is_occupied((0, 8))
+
+
+def test_in_memory_map_and_bad_tiles():
+    tm = TiledGridMap(10, 5, tile_size=4)
+    assert not tm.grid.any()
+    tm.set_obstacle((4, 9))
+    assert tm.grid[4, 9] == 1 and tm.grid.shape == (5, 10)
+    with pytest.raises(ValueError):
+        TiledGridMap(10, 5, tile_size=4, tiles=np.zeros((1, 1, 4, 4), dtype=np.uint8))
@@ -6,7 +6,7 @@ from planner.a_star import a_star
 def manhattan(a, b): return abs(a[0]-b[0]) + abs(a[1]-b[1])
 def octile(a, b):
     di, dj = abs(a[0]-b[0]), abs(a[1]-b[1])
-    return (di + dj) - (math.sqrt(2) - 1) * min(di, dj)
+    return (di + dj) + (math.sqrt(2) - 2) * min(di, dj)
 
 def cost4(u, v): return 1.0
 def cost8(u, v):
@@ -1,11 +1,30 @@
 # scripts/run_on_map.py
-import sys, math
+"""
+Plan on a ROS map from the command line.
+
+Single query (prints the path on an ASCII canvas):
+
+    python scripts/run_on_map.py map.yaml <start_x> <start_y> <goal_x> <goal_y>
+
+Batch: load the map once and plan a stream of world start/goal pairs, one per
+line ("sx sy gx gy", commas allowed, or a JSON object {"start": [x, y],
+"goal": [x, y], "id": ...}), from a file or stdin ("-"). One JSON line per
+query (cells, path, cost, expansions, outcome, seconds) is written as soon
+as that query finishes; rendering is off unless --render (canvases go to
+stderr so stdout stays JSONL).
+
+    python scripts/run_on_map.py map.yaml --batch queries.txt --no-path > results.jsonl
+"""
+import sys, math, json, time, argparse
 from pathlib import Path
 
+import numpy as np
+
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from planner.a_star import a_star
 from planner.heuristics import manhattan, octile
+from planner.instrumentation import SearchStats
 from planner.io.map_loader import load_ros_yaml_map
 from planner.grid_map import GridMap
 
@@ -14,40 +33,116 @@ def cost8(u, v):
     di = abs(u[0]-v[0]); dj = abs(u[1]-v[1])
     return math.sqrt(2.0) if di==1 and dj==1 else 1.0
 
-def print_ascii(gm: GridMap, path, start, goal):
-    H, W = gm.height, gm.width
-    canvas = [['#' if gm.is_occupied((i,j)) else '.' for j in range(W)] for i in range(H)]
+def print_ascii(gm: GridMap, path, start, goal, out=None):
+    canvas = np.where(np.asarray(gm.grid) != 0, '#', '.')
     if path:
-        for (i,j) in path: canvas[i][j] = '*'
-    si,sj = start; gi,gj = goal
-    canvas[si][sj] = 'S'; canvas[gi][gj] = 'G'
-    for row in canvas[::-1]:
-        print(''.join(row))
-
-def main():
-    if len(sys.argv) < 6:
+        ii, jj = np.array(path).T
+        canvas[ii, jj] = '*'
+    for cell, mark in ((start, 'S'), (goal, 'G')):
+        if gm.in_bounds(cell):
+            canvas[cell] = mark
+    print('\n'.join(''.join(row) for row in canvas[::-1]), file=out or sys.stdout)
+
+def parse_query(line: str):
+    """(start_xy, goal_xy, id) from one input line."""
+    if line.lstrip().startswith('{'):
+        q = json.loads(line)
+        (sx, sy), (gx, gy) = q["start"], q["goal"]
+        return (float(sx), float(sy)), (float(gx), float(gy)), q.get("id")
+    vals = [float(v) for v in line.replace(',', ' ').split()]
+    if len(vals) != 4:
+        raise ValueError(f"expected 4 numbers, got {len(vals)}")
+    return (vals[0], vals[1]), (vals[2], vals[3]), None
+
+def plan_query(gm: GridMap, start, goal, connectivity: int, with_path: bool = True):
+    """Plan one cell query; returns the JSON-ready result record."""
+    heuristic, cost_fn = (octile, cost8) if connectivity == 8 else (manhattan, cost4)
+    stats = SearchStats(timing=False)       # counters only: no per-edge clock reads
+    t0 = time.perf_counter()
+    path = a_star(gm, start, goal, heuristic=heuristic, cost_fn=cost_fn,
+                  connectivity=connectivity, stats=stats)
+    seconds = time.perf_counter() - t0
+    record = {
+        "start": list(start), "goal": list(goal),
+        "found": path is not None,
+        "cost": None if path is None else sum(cost_fn(u, v) for u, v in zip(path, path[1:])),
+        "expansions": stats.expansions,
+        "outcome": stats.outcome,
+        "seconds": seconds,
+    }
+    if with_path:
+        record["path"] = None if path is None else [list(c) for c in path]
+    return record, path
+
+def run_batch(gm: GridMap, lines, out, connectivity: int = 8, with_path: bool = True,
+              render: bool = False) -> int:
+    """Plan every query line, writing one JSON line each; returns the query count."""
+    n = 0
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        try:
+            (sx, sy), (gx, gy), qid = parse_query(line)
+        except (ValueError, KeyError, TypeError) as e:
+            record = {"query": n, "error": f"bad query: {e}"}
+        else:
+            start, goal = gm.world_to_grid(sx, sy), gm.world_to_grid(gx, gy)
+            record, path = plan_query(gm, start, goal, connectivity, with_path)
+            record = {"query": n, **({"id": qid} if qid is not None else {}), **record}
+            if render:
+                print_ascii(gm, path, start, goal, out=sys.stderr)
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        n += 1
+    return n
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("map", help="ROS map YAML")
+    ap.add_argument("coords", nargs="*", type=float, help="start_x start_y goal_x goal_y (single query)")
+    ap.add_argument("--batch", metavar="FILE", help="query file, '-' for stdin")
+    ap.add_argument("--out", type=Path, help="batch results file (default stdout)")
+    ap.add_argument("--no-path", action="store_true", help="omit paths from batch results")
+    ap.add_argument("--render", action=argparse.BooleanOptionalAction, default=None,
+                    help="draw the ASCII canvas (default: on for a single query, off for --batch)")
+    ap.add_argument("--connectivity", type=int, choices=[4, 8], default=8)
+    args = ap.parse_args(argv)
+
+    if args.batch is None and len(args.coords) != 4:
         print("Usage: python scripts/run_on_map.py <map.yaml> <start_x> <start_y> <goal_x> <goal_y>")
-        sys.exit(1)
+        print("       python scripts/run_on_map.py <map.yaml> --batch <queries|->")
+        return 1
+
+    gm = load_ros_yaml_map(args.map)
 
-    yaml_path = sys.argv[1]
-    sx, sy = float(sys.argv[2]), float(sys.argv[3])
-    gx, gy = float(sys.argv[4]), float(sys.argv[5])
+    if args.batch is not None:
+        src = sys.stdin if args.batch == '-' else open(args.batch, 'r')
+        out = open(args.out, 'w') if args.out else sys.stdout
+        try:
+            run_batch(gm, src, out, args.connectivity, not args.no_path, bool(args.render))
+        finally:
+            if src is not sys.stdin: src.close()
+            if out is not sys.stdout: out.close()
+        return 0
 
-    gm = load_ros_yaml_map(yaml_path)
+    sx, sy, gx, gy = args.coords
     start = gm.world_to_grid(sx, sy)
     goal  = gm.world_to_grid(gx, gy)
 
-    print(f"Map: {yaml_path}  size={gm.width}x{gm.height} res={gm.resolution} origin={gm.origin}")
+    print(f"Map: {args.map}  size={gm.width}x{gm.height} res={gm.resolution} origin={gm.origin}")
     print(f"Start: world=({sx:.2f},{sy:.2f}) -> grid={start}")
     print(f"Goal:  world=({gx:.2f},{gy:.2f}) -> grid={goal}")
 
-    path = a_star(gm, start, goal, heuristic=octile, cost_fn=cost8, connectivity=8)
+    heuristic, cost_fn = (octile, cost8) if args.connectivity == 8 else (manhattan, cost4)
+    path = a_star(gm, start, goal, heuristic=heuristic, cost_fn=cost_fn, connectivity=args.connectivity)
     if path is None:
         print("No path found.")
-        sys.exit(2)
+        return 2
 
     print(f"Path length (cells): {len(path)}")
-    print_ascii(gm, path, start, goal)
+    if args.render is not False:
+        print_ascii(gm, path, start, goal)
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+test_benchmarks.py
+
+Checks that the benchmark map generators are deterministic per seed and that
+the baseline comparison flags slowdowns.
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.generators import GENERATORS, make_map, query_pairs
+from benchmarks.run import _timed, bench_a_star, bench_load, compare, cost8
+from planner.a_star import a_star
+from planner.heuristics import octile
+from planner.io.map_loader import load_ros_yaml_map
+
+def test_generators_are_seeded():
+    for kind, gen in GENERATORS.items():
+        a = gen(120, 80, seed=3)
+        assert a.shape == (120, 80) and a.dtype == np.uint8, kind
+        assert np.array_equal(a, gen(120, 80, seed=3)), kind
+        assert not np.array_equal(a, gen(120, 80, seed=4)), kind
+
+def test_query_pairs_are_free_and_connected():
+    for kind in GENERATORS:
+        gm = make_map(kind, 100, seed=1)
+        pairs = query_pairs(gm, 3, seed=1)
+        assert pairs, kind
+        for start, goal in pairs:
+            assert gm.is_free(start) and gm.is_free(goal)
+            assert a_star(gm, start, goal, heuristic=octile, cost_fn=cost8, connectivity=8) is not None
+
+def test_make_map_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        make_map("cave", 100)
+
+def test_load_bench_round_trips_the_map(tmp_path):
+    gm = make_map("rooms", 100, seed=0)
+    bench_load(gm, 1, tmp_path)
+    loaded = load_ros_yaml_map(tmp_path / "map_100x100.yaml")
+    assert np.array_equal(loaded.grid, gm.grid)
+
+def test_compare_flags_p50_regressions():
+    baseline = {"results": [{"name": "a/x/1", "seconds": {"p50": 1.0}},
+                            {"name": "b/x/1", "seconds": {"p50": 1.0}}]}
+    report = {"results": [{"name": "a/x/1", "seconds": {"p50": 1.1}},
+                          {"name": "b/x/1", "seconds": {"p50": 2.0}},
+                          {"name": "c/x/1", "seconds": {"p50": 9.0}}]}
+    rows = {r["name"]: r for r in compare(report, baseline, tolerance=0.25)}
+    assert set(rows) == {"a/x/1", "b/x/1"}
+    assert not rows["a/x/1"]["regression"]
+    assert rows["b/x/1"]["regression"]
+
+    tiny = {"results": [{"name": "a/x/1", "seconds": {"p50": 1e-4}}]}
+    assert not compare(tiny, {"results": [{"name": "a/x/1", "seconds": {"p50": 5e-5}}]})[0]["regression"]
+
+def test_compare_normalizes_by_calibration():
+    baseline = {"results": [{"name": "a/x/1", "seconds": {"p50": 1.0}, "calibration_seconds": 0.02},
+                            {"name": "b/x/1", "seconds": {"p50": 1.0}, "calibration_seconds": 0.02}]}
+    # machine twice as slow: 2x timings are no regression, 3x still is
+    report = {"results": [{"name": "a/x/1", "seconds": {"p50": 2.0}, "calibration_seconds": 0.04},
+                          {"name": "b/x/1", "seconds": {"p50": 3.0}, "calibration_seconds": 0.04}]}
+    rows = {r["name"]: r for r in compare(report, baseline, tolerance=0.25)}
+    assert rows["a/x/1"]["ratio"] == pytest.approx(1.0) and not rows["a/x/1"]["regression"]
+    assert rows["b/x/1"]["ratio"] == pytest.approx(1.5) and rows["b/x/1"]["regression"]
+
+def test_committed_baseline_is_calibrated():
+    import json
+    from benchmarks.run import BASELINE, calibrate
+    results = json.loads(BASELINE.read_text())["results"]
+    assert results and all(r["calibration_seconds"] > 0 for r in results)
+    assert calibrate(1) > 0
+
+def test_fast_operations_get_enough_samples():
+    assert len(_timed(lambda: None, 3)) == 3
+    assert len(_timed(lambda: None, 3, min_seconds=0.01, max_samples=50)) == 50
+    assert len(_timed(lambda: sum(range(10)), 3, min_seconds=0.005)) > 3
+    out = bench_a_star(make_map("rooms", 100, seed=0), 3, 0, repeats=4)
+    assert out["seconds"]["n"] >= 4 * out["queries"] and out["expansions_per_sec"] > 0
@@ -5,10 +5,16 @@ Checks that the weighted cost function from planner.costs
 produces paths that avoid obstacles more than the uniform cost.
 """
 
+from collections import deque
+
+import numpy as np
+import pytest
+
 from planner.grid_map import GridMap
 from planner.a_star import a_star
+from planner.a_star_flat import a_star_flat
 from planner.heuristics import octile
-from planner.costs import make_weighted_cost
+from planner.costs import compute_obstacle_distance, make_cost_field, make_weighted_cost
 
 def test_weighted_path_is_longer_or_equal():
     # Map: 20x20 with a vertical wall at col=10, gap at (10,10)
@@ -45,6 +51,133 @@ def test_weighted_path_is_longer_or_equal():
         f"Expected weighted path length >= uniform ({steps_weighted} vs {steps_uniform})"
     )
 
+
+# ------------------------
+# Distance transform
+# ------------------------
+
+def _bfs_distance(grid, connectivity):
+    """Reference: the original multi-source BFS."""
+    H, W = grid.shape
+    dist = np.full((H, W), np.inf)
+    q = deque()
+    for i, j in np.argwhere(grid):
+        dist[i, j] = 0.0
+        q.append((i, j))
+    steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if connectivity == 8:
+        steps += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+    while q:
+        i, j = q.popleft()
+        for di, dj in steps:
+            ni, nj = i + di, j + dj
+            if 0 <= ni < H and 0 <= nj < W and dist[i, j] + 1.0 < dist[ni, nj]:
+                dist[ni, nj] = dist[i, j] + 1.0
+                q.append((ni, nj))
+    return dist
+
+
+def _random_map(rng):
+    H, W = (int(x) for x in rng.integers(1, 25, size=2))
+    gm = GridMap(W, H)
+    gm.grid = (rng.random((H, W)) < rng.uniform(0.01, 0.3)).astype(np.uint8)
+    return gm
+
+
+def test_grid_metric_matches_bfs():
+    rng = np.random.default_rng(3)
+    for _ in range(100):
+        gm = _random_map(rng)
+        for conn in (4, 8):
+            got = compute_obstacle_distance(gm, connectivity=conn)
+            assert got.dtype == np.float64
+            assert np.array_equal(got, _bfs_distance(gm.grid, conn))
+
+
+def test_euclidean_metric_matches_brute_force():
+    rng = np.random.default_rng(4)
+    for _ in range(60):
+        gm = _random_map(rng)
+        got = compute_obstacle_distance(gm, metric="euclidean")
+        occ = np.argwhere(gm.grid)
+        if occ.size == 0:
+            assert np.isinf(got).all()
+            continue
+        ii, jj = np.indices(gm.grid.shape)
+        expected = np.min(
+            np.hypot(ii[..., None] - occ[:, 0], jj[..., None] - occ[:, 1]), axis=-1
+        )
+        assert np.allclose(got, expected)
+
+
+def test_unknown_metric_rejected():
+    gm = GridMap(3, 3)
+    gm.set_obstacle((1, 1))
+    with pytest.raises(ValueError):
+        compute_obstacle_distance(gm, metric="manhattan")
+
+
+def test_compact_distance_dtypes():
+    rng = np.random.default_rng(6)
+    for _ in range(30):
+        gm = _random_map(rng)
+        for conn in (4, 8):
+            ref = compute_obstacle_distance(gm, connectivity=conn)
+            small = compute_obstacle_distance(gm, connectivity=conn, dtype=np.uint16)
+            assert small.dtype == np.uint16
+            finite = np.isfinite(ref)
+            assert np.array_equal(small[finite], ref[finite])
+            assert (small[~finite] == np.iinfo(np.uint16).max).all()
+        got = compute_obstacle_distance(gm, metric="euclidean", dtype=np.float32)
+        assert got.dtype == np.float32
+        assert np.allclose(got, compute_obstacle_distance(gm, metric="euclidean"))
+    with pytest.raises(ValueError):
+        compute_obstacle_distance(gm, metric="euclidean", dtype=np.uint16)
+
+
+# ------------------------
+# Precompiled cost field
+# ------------------------
+
+def _path_cost(path, cost_fn):
+    return sum(cost_fn(u, v) for u, v in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("falloff", ["linear", "quadratic"])
+def test_cost_field_matches_weighted_cost(falloff):
+    rng = np.random.default_rng(5)
+    gm = GridMap(30, 30)
+    gm.grid = (rng.random((30, 30)) < 0.1).astype(np.uint8)
+    cost_fn = make_weighted_cost(gm, penalty=6.0, cutoff_cells=4, falloff=falloff)
+    field = make_cost_field(gm, penalty=6.0, cutoff_cells=4, falloff=falloff)
+    assert field.multiplier.dtype == np.float32
+
+    for i in range(1, 29):
+        for j in range(1, 29):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                u, v = (i, j), (i + di, j + dj)
+                assert field(u, v) == pytest.approx(cost_fn(u, v), rel=1e-6)
+
+    gm.clear_cell((0, 0))
+    gm.clear_cell((29, 29))
+    expected = a_star(gm, (0, 0), (29, 29), heuristic=octile, cost_fn=cost_fn, connectivity=8)
+    assert expected is not None
+    for planner in (a_star, a_star_flat):
+        path = planner(gm, (0, 0), (29, 29), heuristic=octile, cost_fn=field, connectivity=8)
+        assert path is not None
+        assert _path_cost(path, cost_fn) == pytest.approx(_path_cost(expected, cost_fn), rel=1e-6)
+
+
+def test_cost_field_with_zero_cutoff_has_no_penalty():
+    gm = GridMap(8, 8)
+    gm.set_obstacle((3, 3))
+    cost_fn = make_weighted_cost(gm, cutoff_cells=0)
+    with np.errstate(divide="raise", invalid="raise"):
+        field = make_cost_field(gm, cutoff_cells=0)
+    assert np.all(field.multiplier == 1.0)
+    assert field((2, 2), (2, 3)) == cost_fn((2, 2), (2, 3)) == 1.0
+
+
 if __name__ == "__main__":
     test_weighted_path_is_longer_or_equal()
-    print("test_weighted_path_is_longer_or_equal passed.")
\ No newline at end of file
+    print("test_weighted_path_is_longer_or_equal passed.")
@@ -0,0 +1,66 @@
+"""
+test_run_on_map.py
+
+Batch mode of scripts/run_on_map.py: one JSON line per query, in order,
+matching single-query planning; bad lines are reported without stopping
+the stream.
+"""
+
+import io
+import json
+
+import numpy as np
+from PIL import Image
+
+from planner.a_star import a_star
+from planner.heuristics import octile
+from planner.io.map_loader import load_ros_yaml_map
+from scripts.run_on_map import cost8, main, run_batch
+
+
+def _write_map(tmp_path):
+    grid = np.zeros((20, 30), dtype=np.uint8)
+    grid[:15, 12] = 1
+    Image.fromarray(np.where(grid[::-1] != 0, 0, 254).astype(np.uint8)).save(tmp_path / "m.pgm")
+    (tmp_path / "m.yaml").write_text(
+        "image: m.pgm\nresolution: 0.5\norigin: [-1.0, 0.0, 0.0]\nnegate: 0\n"
+        "occupied_thresh: 0.65\nfree_thresh: 0.196\n")
+    return tmp_path / "m.yaml"
+
+
+def test_batch_streams_one_record_per_query(tmp_path):
+    yaml_path = _write_map(tmp_path)
+    gm = load_ros_yaml_map(yaml_path)
+    lines = [
+        "# start_x start_y goal_x goal_y",
+        "0.0 1.0 12.0 1.0",
+        "",
+        '{"start": [0.0, 9.0], "goal": [12.0, 9.0], "id": "q2"}',
+        "1, 2, 3",
+        "5.25 1.0 12.0 1.0",           # starts inside the wall
+    ]
+    out = io.StringIO()
+    assert run_batch(gm, lines, out) == 4
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["query"] for r in records] == [0, 1, 2, 3]
+
+    first = records[0]
+    expected = a_star(gm, tuple(first["start"]), tuple(first["goal"]), octile, cost8, connectivity=8)
+    assert [tuple(c) for c in first["path"]] == expected
+    assert first["found"] and first["expansions"] > 0 and first["seconds"] >= 0
+    assert first["cost"] == sum(cost8(u, v) for u, v in zip(expected, expected[1:]))
+    assert records[1]["id"] == "q2" and records[1]["found"]
+    assert "bad query" in records[2]["error"]
+    assert not records[3]["found"] and records[3]["outcome"] == "start_blocked"
+
+
+def test_batch_cli_reads_file_and_skips_paths(tmp_path, capsys):
+    yaml_path = _write_map(tmp_path)
+    queries = tmp_path / "q.txt"
+    queries.write_text("0.0 1.0 12.0 1.0\n0.0 1.0 0.5 1.0\n")
+    assert main([str(yaml_path), "--batch", str(queries), "--no-path"]) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(records) == 2 and all("path" not in r and r["found"] for r in records)
+
+    assert main([str(yaml_path), "0.0", "1.0", "12.0", "1.0"]) == 0
+    assert "S" in capsys.readouterr().out